@@ -52,3 +52,9 @@ class ConfigLoader:
         self.cnf_botones = self.config.get("cnf_botones", {})
         self.cnf_mensajes = self.config.get("cnf_mensajes", {})
         self.cnf_columnas_data = self.config.get("cnf_columnas_data", {})
+        self.cnf_ingesta = self.config.get("cnf_ingesta", {})
+        self.cnf_pipeline = self.config.get("cnf_pipeline", {})
+        self.cnf_sensibilidad = self.config.get("cnf_sensibilidad", {})
+        self.cnf_montecarlo = self.config.get("cnf_montecarlo", {})
+        self.cnf_optimizador = self.config.get("cnf_optimizador", {})
+        self.cnf_estacionalidad = self.config.get("cnf_estacionalidad", {})
@@ -5,8 +5,11 @@ from ui_components.ui_components import (
     TextInputManager,
     ButtonTracker,
     FileUploaderManager,
+    leer_archivos_concurrentes,
 )
 
+from services.pipeline_service import filtros_lectura
+
 from pandas import DataFrame
 from typing import Tuple, Optional, Dict, Any
 
@@ -14,12 +17,68 @@ from typing import Tuple, Optional, Dict, Any
 class ControladorBarraLateral:
     """Clase que gestiona todos los componentes de la barra lateral"""
 
-    def __init__(self, config_lv: Dict[str, Any]):
+    def __init__(
+        self,
+        config_lv: Dict[str, Any],
+        config_ingesta: Optional[Dict[str, Any]] = None,
+        config_pipeline: Optional[Dict[str, Any]] = None,
+    ):
         """
         Args:
             config (Dict): Configuración cargada desde el archivo de configuración
+            config_ingesta (Dict): Sección `cnf_ingesta` con opciones de lectura y cache
+            config_pipeline (Dict): Sección `cnf_pipeline`; sus filtros iniciales se
+                aplican durante la lectura
         """
         self.config_lv = config_lv
+        self.config_ingesta = config_ingesta or {}
+        self.config_pipeline = config_pipeline or {}
+        # Huella y número de filas de cada archivo de ventas combinado, en orden
+        self.particiones_ventas = ()
+        # Digests de contenido de los archivos cargados (clave del catálogo en disco)
+        self.digests_insumos = {}
+        # Huellas de carga de los archivos (clave del catálogo dentro de la sesión)
+        self.huellas_insumos = {}
+
+    def _obtener_dir_cache(self) -> Optional[str]:
+        """Retorna el directorio del cache de snapshots en disco, o None si está deshabilitado."""
+        cfg_cache = self.config_ingesta.get("cache_snapshots", {})
+        if not cfg_cache.get("habilitado", False):
+            return None
+        return cfg_cache.get("directorio")
+
+    def _obtener_opciones_lectura(self, insumo: str) -> Dict[str, Any]:
+        """Retorna columnas, filtros, esquema y modo de lectura configurados para un insumo.
+
+        Args:
+            insumo (str): Nombre del insumo dentro de `cnf_ingesta` ("ventas" o "precios").
+
+        Returns:
+            Dict: Argumentos de lectura para FileUploaderManager.
+        """
+        cfg_insumo = self.config_ingesta.get(insumo, {})
+        filtros = (cfg_insumo.get("filtros") or []) + filtros_lectura(
+            self.config_pipeline, insumo
+        )
+        return {
+            "use_cols": cfg_insumo.get("columnas"),
+            "filtros": filtros or None,
+            "streaming": cfg_insumo.get("streaming", False),
+            "esquema": cfg_insumo.get("esquema"),
+            "usar_digest": self.config_ingesta.get("huella", {}).get("usar_digest", True),
+            "opciones_csv": self.config_ingesta.get("csv"),
+            "compactacion": self._obtener_compactacion(),
+        }
+
+    def _obtener_compactacion(self) -> Optional[Dict[str, Any]]:
+        """Retorna los argumentos de `utils.compactar_dataframe`, o None si está deshabilitada."""
+        cfg_compactacion = self.config_ingesta.get("compactacion", {})
+        if not cfg_compactacion.get("habilitado", False):
+            return None
+        return {
+            "umbral_categoria": cfg_compactacion.get("umbral_categoria", 0.5),
+            "excluir": cfg_compactacion.get("excluir") or None,
+        }
 
     def _renderizar_seccion_descuentos(self) -> str:
         """Renderiza los componentes para selección de rango de descuentos
@@ -105,6 +164,8 @@ class ControladorBarraLateral:
         # cfg_archivo = self.config_lv["seccion_archivo"]["file_uploader"]
         cfg_archivo_vtas = self.config_lv["seccion_archivo"]["file_uploader_vtas"]
         cfg_archivo_precios = self.config_lv["seccion_archivo"]["file_uploader_precios"]
+        dir_cache = self._obtener_dir_cache()
+        max_mb_cache = self.config_ingesta.get("cache_snapshots", {}).get("max_mb")
 
         """gestor_archivos = FileUploaderManager(
             titulo=cfg_archivo["titulo"],
@@ -126,6 +187,9 @@ class ControladorBarraLateral:
             tipo_archivos=cfg_archivo_precios["tipo_archivos"],
             icon=cfg_archivo_precios["icon"],
             usar_sidebar=True,
+            dir_cache=dir_cache,
+            max_mb_cache=max_mb_cache,
+            **self._obtener_opciones_lectura("precios"),
         )
 
         gestor_vtas = FileUploaderManager(
@@ -137,14 +201,36 @@ class ControladorBarraLateral:
             tipo_archivos=cfg_archivo_vtas["tipo_archivos"],
             icon=cfg_archivo_vtas["icon"],
             usar_sidebar=True,
+            dir_cache=dir_cache,
+            max_mb_cache=max_mb_cache,
+            **self._obtener_opciones_lectura("ventas"),
         )
 
         # df_archivos = gestor_archivos.leer_archivos()
-        df_precios = gestor_precios.leer_archivos()
-        df_ventas = gestor_vtas.leer_archivos()
+        # Ambos insumos se interpretan en paralelo (ver cnf_ingesta.concurrencia)
+        cfg_concurrencia = self.config_ingesta.get("concurrencia", {})
+        df_precios, df_ventas = leer_archivos_concurrentes(
+            [gestor_precios, gestor_vtas],
+            usar_procesos=cfg_concurrencia.get("usar_procesos", True),
+            max_procesos=cfg_concurrencia.get("max_procesos", 2),
+        )
 
-        if df_precios and df_ventas:
-            return df_precios[0], df_ventas[0]
+        # Las ventas pueden llegar en varios archivos (uno por mes o por formato)
+        df_ventas_combinado = gestor_vtas.combinar_dataframes(df_ventas)
+        self.particiones_ventas = tuple(
+            zip(gestor_vtas.huellas_actuales, (len(df) for df in df_ventas))
+        )
+        self.digests_insumos = {
+            "precios": gestor_precios.digests_actuales[:1],
+            "ventas": gestor_vtas.digests_actuales,
+        }
+        self.huellas_insumos = {
+            "precios": gestor_precios.huellas_actuales[:1],
+            "ventas": gestor_vtas.huellas_actuales,
+        }
+
+        if df_precios and df_ventas_combinado is not None:
+            return df_precios[0], df_ventas_combinado
         else:
             return None, None
 
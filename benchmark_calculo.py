@@ -0,0 +1,154 @@
+"""
+Paridad y benchmark del cálculo de la simulación (`utils.procesar_insumo`).
+
+Compara `utils.procesar_insumo`, que calcula todo con el núcleo de NumPy
+`utils.calcular_simulacion`, con la cadena de pasos original (`actualizar_dias`,
+`calcular_unidades`, `calcular_totales`, `calcular_venta`, `preparar_df_materiales`,
+`reemplazar_mes` y `calcular_descuento`) sobre selecciones de distintos tamaños. Los
+materiales se toman al azar del catálogo de `Insumos`, con rangos y fechas aleatorios
+(incluye fechas invertidas y horas distintas de medianoche).
+
+Imprime el tiempo de cada versión por tamaño y si los resultados son idénticos
+(contenido, tipos y orden de columnas). Termina con código 1 si alguno difiere.
+
+Uso:
+    python benchmark_calculo.py [--dir-insumos Insumos/] [--ventas Base_vtas.xlsx]
+                                [--precios Precios.xlsx]
+                                [--tamanos 100 10000 100000 1000000]
+                                [--crecimiento 17.5]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from Controllers.config_loader import ConfigLoader
+from Controllers.sidebar_controller import ControladorBarraLateral
+from precalentar_cache import preparar_insumo
+from services.data_service import GestorDatos
+
+
+def procesar_por_pasos(
+    df_insumo: pd.DataFrame, porcentaje_crecimiento: float, dict_cols: dict
+) -> pd.DataFrame:
+    """Cadena de pasos original de `procesar_insumo`, como referencia de paridad."""
+    df = df_insumo.copy(deep=False)
+    df = utils.actualizar_dias(df, dict_cols)
+    df = utils.calcular_unidades(df, dict_cols)
+    df = utils.calcular_totales(df, porcentaje_crecimiento)
+    df = utils.calcular_venta(df, dict_cols)
+    df = utils.preparar_df_materiales(df)
+    df = utils.reemplazar_mes(df)
+    df["Costo del descuento"] = utils.calcular_descuento(df)
+    return df
+
+
+def seleccion_aleatoria(
+    df_catalogo: pd.DataFrame, columnas: list, n_materiales: int, semilla: int = 0
+) -> pd.DataFrame:
+    """Selección de `n_materiales` registros como la que arma la aplicación."""
+    generador = np.random.default_rng(semilla)
+    inicio = pd.Timestamp("2025-01-01") + pd.to_timedelta(
+        generador.integers(0, 365, n_materiales), unit="D"
+    )
+    # Algunas fechas con hora y algunos rangos invertidos (fin antes del inicio).
+    fin = inicio + pd.to_timedelta(generador.integers(-5, 45 * 24, n_materiales), unit="h")
+    df_seleccion = pd.DataFrame(
+        {
+            "concat_plu_producto": df_catalogo["concat_plu_producto"].to_numpy()[
+                generador.integers(0, len(df_catalogo), n_materiales)
+            ],
+            "rango": generador.integers(1, 51, n_materiales).astype(str),
+            "Herramienta": "Oferta",
+            "Concepto": "Evento",
+            # Fechas datetime64, como las guarda la aplicación; el mes en inglés es el
+            # que traduce `reemplazar_mes` en la cadena de pasos.
+            "fecha_inicio": inicio,
+            "fecha_fin": fin,
+            "mes": inicio.strftime("%B"),
+        }
+    )
+    catalogo = df_catalogo[columnas].drop_duplicates("concat_plu_producto")
+    return utils.left_merge_on_columns(
+        df1=df_seleccion, df2=catalogo, key_columns=["concat_plu_producto"]
+    )
+
+
+def medir(funcion) -> tuple:
+    """Resultado y segundos de una ejecución."""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compara el núcleo de cálculo de la simulación con la cadena de pasos."
+    )
+    parser.add_argument("--dir-insumos", default="Insumos/")
+    parser.add_argument("--ventas", default="Base_vtas.xlsx")
+    parser.add_argument("--precios", default="Precios.xlsx")
+    parser.add_argument(
+        "--tamanos", type=int, nargs="+", default=[100, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--crecimiento", type=float, default=17.5)
+    args = parser.parse_args()
+
+    # Fuera de `streamlit run` el session_state solo emite advertencias.
+    logging.disable(logging.WARNING)
+    logger.remove()
+
+    cargador_config = ConfigLoader(utils=utils)
+    cnf_ingesta = cargador_config.cnf_ingesta
+    cnf_ingesta.get("catalogo", {})["habilitado"] = False
+    cnf_ingesta.get("agregacion", {})["persistir"] = False
+    utils.configurar_copy_on_write(cnf_ingesta.get("copy_on_write", False))
+    barra_lateral = ControladorBarraLateral(
+        cargador_config.cnf_lateral_var, cnf_ingesta, cargador_config.cnf_pipeline
+    )
+
+    dir_insumos = os.path.join(args.dir_insumos, "")
+    insumos = {}
+    for insumo, nom_archivo in (("precios", args.precios), ("ventas", args.ventas)):
+        df = utils.lectura_simple_excel(dir_insumos, nom_archivo, nom_hoja=0)
+        insumos[insumo] = preparar_insumo(df, barra_lateral._obtener_opciones_lectura(insumo))
+    gestor_datos = GestorDatos(cargador_config)
+    gestor_datos.procesar_dfs_insumos(insumos["precios"], insumos["ventas"])
+
+    print(f"{'Materiales':>11}{'Pasos s':>10}{'Núcleo s':>10}{'Aceleración':>13}  Resultado")
+    diferencias = 0
+    for n_materiales in args.tamanos:
+        df_seleccion = seleccion_aleatoria(
+            gestor_datos.df_prec_vtas_procesado, cargador_config.cols_df_insumo, n_materiales
+        )
+        esperado, s_pasos = medir(
+            lambda: procesar_por_pasos(df_seleccion, args.crecimiento, cargador_config.dict_cols)
+        )
+        obtenido, s_nucleo = medir(
+            lambda: utils.procesar_insumo(
+                df_seleccion, args.crecimiento, cargador_config.dict_cols
+            )
+        )
+        try:
+            pd.testing.assert_frame_equal(esperado, obtenido, check_exact=True)
+            detalle = "idéntico"
+        except AssertionError as e:
+            diferencias += 1
+            detalle = str(e).splitlines()[0]
+        print(
+            f"{n_materiales:>11}{s_pasos:>10.3f}{s_nucleo:>10.3f}"
+            f"{s_pasos / s_nucleo:>12.1f}x  {detalle}"
+        )
+
+    sys.exit(1 if diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark de memoria pico del preprocesamiento.
+
+Mide con tracemalloc el pico de memoria de dos pasos:
+
+- `GestorDatos`: de los insumos leídos al catálogo de productos.
+- `utils.procesar_insumo`: cálculo de unidades, ventas y descuentos sobre una
+  selección de materiales (todo el catálogo, como un evento masivo).
+
+Los dos efectos se reportan por separado:
+
+- "Sin CoW": pico con el modo copy-on-write de pandas desactivado (el de la app por
+  defecto). Es el número que cambia con los helpers del procesamiento; para medir un
+  cambio en ellos se corre el benchmark antes y después del cambio y se compara esta
+  columna.
+- "Efecto CoW": diferencia del pico al activar `cnf_ingesta.copy_on_write` sobre el
+  mismo código (negativa si el modo ahorra memoria).
+
+La base de ventas se replica `--factor` veces para simular un archivo de tamaño
+realista. Los caches en disco se desactivan para medir el procesamiento completo.
+
+Uso:
+    python benchmark_memoria.py [--dir-insumos Insumos/] [--ventas Base_vtas.xlsx]
+                                [--precios Precios.xlsx] [--factor 20]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from Controllers.config_loader import ConfigLoader
+from Controllers.sidebar_controller import ControladorBarraLateral
+from precalentar_cache import preparar_insumo
+from services.data_service import GestorDatos
+
+
+def medir_pico(funcion: Callable[[], object]) -> Tuple[object, int, float]:
+    """
+    Ejecuta una función midiendo el pico de memoria asignada durante la ejecución.
+
+    Returns:
+        tuple: Resultado, bytes del pico (sobre la memoria previa) y segundos.
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, pico, segundos
+
+
+def seleccion_simulada(df_catalogo: pd.DataFrame, columnas: list) -> pd.DataFrame:
+    """Selección de todos los materiales del catálogo con un rango y fechas fijos."""
+    df_seleccion = pd.DataFrame(
+        {
+            "concat_plu_producto": df_catalogo["concat_plu_producto"].unique(),
+            "rango": "10",
+            "Herramienta": "Oferta",
+            "Concepto": "Evento",
+            "fecha_inicio": "2025-03-01",
+            "fecha_fin": "2025-03-15",
+            "mes": "March",
+        }
+    )
+    return utils.left_merge_on_columns(
+        df1=df_seleccion, df2=df_catalogo[columnas], key_columns=["concat_plu_producto"]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Mide el pico de memoria del preprocesamiento con y sin copy-on-write."
+    )
+    parser.add_argument("--dir-insumos", default="Insumos/")
+    parser.add_argument("--ventas", default="Base_vtas.xlsx")
+    parser.add_argument("--precios", default="Precios.xlsx")
+    parser.add_argument("--factor", type=int, default=20)
+    args = parser.parse_args()
+
+    # Fuera de `streamlit run` el session_state solo emite advertencias.
+    logging.disable(logging.WARNING)
+    logger.remove()
+
+    cargador_config = ConfigLoader(utils=utils)
+    cnf_ingesta = cargador_config.cnf_ingesta
+    cnf_ingesta.get("catalogo", {})["habilitado"] = False
+    cnf_ingesta.get("agregacion", {})["persistir"] = False
+    barra_lateral = ControladorBarraLateral(
+        cargador_config.cnf_lateral_var, cnf_ingesta, cargador_config.cnf_pipeline
+    )
+
+    dir_insumos = os.path.join(args.dir_insumos, "")
+    insumos = {}
+    for insumo, nom_archivo in (("precios", args.precios), ("ventas", args.ventas)):
+        df = utils.lectura_simple_excel(dir_insumos, nom_archivo, nom_hoja=0)
+        insumos[insumo] = preparar_insumo(df, barra_lateral._obtener_opciones_lectura(insumo))
+    df_vtas = pd.concat([insumos["ventas"]] * args.factor, ignore_index=True)
+    mb_vtas = utils.memoria_dataframe(df_vtas) / 1024**2
+    print(f"Ventas: {len(df_vtas)} filas, {mb_vtas:.1f} MB en memoria\n")
+
+    # Paso -> modo copy-on-write -> (pico MB, MB de entrada, segundos)
+    resultados = {"GestorDatos": {}, "procesar_insumo": {}}
+    for copy_on_write in (False, True):
+        utils.configurar_copy_on_write(copy_on_write)
+
+        gestor_datos = GestorDatos(cargador_config)
+        _, pico, segundos = medir_pico(
+            lambda: gestor_datos.procesar_dfs_insumos(insumos["precios"], df_vtas)
+        )
+        resultados["GestorDatos"][copy_on_write] = (pico / 1024**2, mb_vtas, segundos)
+
+        df_seleccion = seleccion_simulada(
+            gestor_datos.df_prec_vtas_procesado, cargador_config.cols_df_insumo
+        )
+        mb_seleccion = utils.memoria_dataframe(df_seleccion) / 1024**2
+        _, pico, segundos = medir_pico(
+            lambda: utils.procesar_insumo(df_seleccion, 10, cargador_config.dict_cols)
+        )
+        resultados["procesar_insumo"][copy_on_write] = (
+            pico / 1024**2,
+            mb_seleccion,
+            segundos,
+        )
+    utils.configurar_copy_on_write(False)
+
+    print(
+        f"{'Paso':<18}{'Sin CoW MB':>12}{'x insumo':>10}{'Segundos':>10}"
+        f"{'Con CoW MB':>12}{'Efecto CoW':>12}"
+    )
+    for paso, por_modo in resultados.items():
+        pico_sin, mb_entrada, segundos_sin = por_modo[False]
+        pico_con = por_modo[True][0]
+        print(
+            f"{paso:<18}{pico_sin:>12.1f}{pico_sin / mb_entrada:>10.2f}{segundos_sin:>10.2f}"
+            f"{pico_con:>12.1f}{pico_con - pico_sin:>+12.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
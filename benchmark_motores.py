@@ -0,0 +1,84 @@
+"""
+Benchmark de los motores de cálculo del pipeline (`cnf_pipeline.motor`).
+
+Construye el catálogo de productos con cada motor disponible (pandas, pyarrow y, si
+está instalado, polars) y reporta el mejor tiempo de varias repeticiones. Que todos
+entreguen el mismo catálogo y los mismos resultados en los casos borde se verifica en
+`tests/test_motor_service.py`.
+
+La base de ventas se replica `--factor` veces para simular un archivo grande. Los
+caches en disco se desactivan para medir el procesamiento completo.
+
+Uso:
+    python benchmark_motores.py [--dir-insumos Insumos/] [--ventas Base_vtas.xlsx]
+                                [--precios Precios.xlsx] [--factor 20] [--repeticiones 3]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from Controllers.config_loader import ConfigLoader
+from Controllers.sidebar_controller import ControladorBarraLateral
+from precalentar_cache import preparar_insumo
+from services.data_service import GestorDatos
+from services.motor_service import MOTORES, obtener_motor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compara el tiempo de los motores de cálculo del pipeline."
+    )
+    parser.add_argument("--dir-insumos", default="Insumos/")
+    parser.add_argument("--ventas", default="Base_vtas.xlsx")
+    parser.add_argument("--precios", default="Precios.xlsx")
+    parser.add_argument("--factor", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    # Fuera de `streamlit run` el session_state solo emite advertencias.
+    logging.disable(logging.WARNING)
+    logger.remove()
+
+    cargador_config = ConfigLoader(utils=utils)
+    cnf_ingesta = cargador_config.cnf_ingesta
+    cnf_ingesta.get("catalogo", {})["habilitado"] = False
+    cnf_ingesta.get("agregacion", {})["persistir"] = False
+    utils.configurar_copy_on_write(cnf_ingesta.get("copy_on_write", False))
+    barra_lateral = ControladorBarraLateral(
+        cargador_config.cnf_lateral_var, cnf_ingesta, cargador_config.cnf_pipeline
+    )
+
+    dir_insumos = os.path.join(args.dir_insumos, "")
+    insumos = {}
+    for insumo, nom_archivo in (("precios", args.precios), ("ventas", args.ventas)):
+        df = utils.lectura_simple_excel(dir_insumos, nom_archivo, nom_hoja=0)
+        insumos[insumo] = preparar_insumo(df, barra_lateral._obtener_opciones_lectura(insumo))
+    df_vtas = pd.concat([insumos["ventas"]] * args.factor, ignore_index=True)
+    print(f"Ventas: {len(df_vtas)} filas\n")
+    print(f"{'Motor':<10}{'Segundos':>10}{'Filas':>8}")
+
+    for nombre in MOTORES:
+        try:
+            obtener_motor(nombre)
+        except ImportError as e:
+            print(f"{nombre:<10}{'-':>10}{'-':>8}  no disponible ({e})")
+            continue
+
+        cargador_config.cnf_pipeline["motor"] = nombre
+        segundos = []
+        for _ in range(args.repeticiones):
+            gestor_datos = GestorDatos(cargador_config)
+            inicio = time.perf_counter()
+            gestor_datos.procesar_dfs_insumos(insumos["precios"], df_vtas)
+            segundos.append(time.perf_counter() - inicio)
+        catalogo = gestor_datos.df_prec_vtas_procesado
+        print(f"{nombre:<10}{min(segundos):>10.3f}{len(catalogo):>8}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
-from pandas import DataFrame
+from typing import Optional
+
+import pandas as pd
+from pandas import DataFrame, Series
 import streamlit as st
 from ui_components.ui_components import (
     ButtonTracker,
+    SliderManager,
     add_key_ss_st,
     clean_key_ss_st,
     set_key_ss_st,
@@ -11,6 +15,19 @@ import ui_components.utils as utils
 from Controllers.sidebar_controller import ControladorBarraLateral
 from Controllers.main_content_controller import GestorContenidoPrincipal
 from services.data_service import GestorDatos
+from services.montecarlo_service import SimulacionMonteCarlo
+from services.optimizador_service import (
+    OptimizadorDescuentos,
+    curvas_respuesta,
+    proyectar_plan,
+)
+from services.resultados_service import ResultadosSimulacion
+from services.sensibilidad_service import (
+    MEDIDA_COSTO,
+    MEDIDA_VENTA,
+    CuboSensibilidad,
+    descuentos_de_rangos,
+)
 from Controllers.config_loader import ConfigLoader
 
 
@@ -23,9 +40,14 @@ class Aplicacion:
         incluyendo la carga de configuración, la barra lateral, los datos y el contenido principal.
         """
         self.cargador_config = ConfigLoader(utils=utils)
+        utils.configurar_copy_on_write(
+            self.cargador_config.cnf_ingesta.get("copy_on_write", False)
+        )
 
         self.barra_lateral = ControladorBarraLateral(
-            config_lv=self.cargador_config.cnf_lateral_var
+            config_lv=self.cargador_config.cnf_lateral_var,
+            config_ingesta=self.cargador_config.cnf_ingesta,
+            config_pipeline=self.cargador_config.cnf_pipeline,
         )
         self.gestor_datos = GestorDatos(self.cargador_config)
         self.contenido_principal = GestorContenidoPrincipal(self.gestor_datos)
@@ -52,7 +74,14 @@ class Aplicacion:
 
         # Bnadera para archivos cargados
         add_key_ss_st(clave="archivos_cargados", valor_inicial=False)
-        self.gestor_datos.procesar_dfs_insumos(df_precios, df_vtas)
+        self.gestor_datos.procesar_dfs_insumos(
+            df_precios,
+            df_vtas,
+            particiones_vtas=self.barra_lateral.particiones_ventas,
+            digests_insumos=self.barra_lateral.digests_insumos,
+            huellas_insumos=self.barra_lateral.huellas_insumos,
+        )
+        self._mostrar_estado_catalogo()
 
         df_procesado_prec_vtas = self.gestor_datos.df_prec_vtas_procesado
         set_key_ss_st(clave="archivos_cargados", valor=True)
@@ -67,12 +96,15 @@ class Aplicacion:
 
         # Si se confirmó la edición, calcular y mostrar resultados
         if st.session_state.get("edicion_confirmada", False):
-            df_procesado_final = self._calcular_resultados(
+            resultados = self._calcular_resultados(
                 df_procesado_prec_vtas, portje_cremto_act
             )
-            self._mostrar_promedios(df_procesado_final)
+            self._mostrar_promedios(resultados.resultado, resultados.totales)
 
-            utils.crear_boton_exportar(df=df_procesado_final)
+            utils.crear_boton_exportar(df=resultados.resultado)
+            self._mostrar_sensibilidad(resultados.resultado)
+            self._mostrar_montecarlo(resultados.resultado, portje_cremto_act)
+            self._mostrar_optimizador(resultados, portje_cremto_act)
 
         # Si no hay insumos cargados, mostrar advertencia
         elif st.session_state["archivos_cargados"] == False:
@@ -88,6 +120,17 @@ class Aplicacion:
         ).items():
             add_key_ss_st(clave, opciones["valor_inicial"])
 
+    def _mostrar_estado_catalogo(self) -> None:
+        """
+        Indica en la barra lateral si el catálogo de productos se reutilizó (sesión, otra
+        sesión o cache en disco) o se reconstruyó, y el tiempo que tomó.
+        """
+        estado = self.gestor_datos.estado_catalogo
+        if estado is None:
+            return
+        plantilla = self.cargador_config.cnf_mensajes["catalogo_" + estado["origen"]]
+        st.sidebar.caption(plantilla.format(segundos=estado["segundos"]))
+
     def _procesar_barra_lateral(self) -> tuple[str, float, DataFrame]:
         """
         Llama al controlador de la barra lateral para obtener:
@@ -170,6 +213,7 @@ class Aplicacion:
         col_eliminar = self.cargador_config.cnf_columnas_data["eliminar_col"]
         col_bloqueada = self.cargador_config.cnf_columnas_data["concat_col"]
         editor_key = self.cargador_config.cnf_session_keys["editor_df_key"]
+        cols_fecha = self.cargador_config.cnf_columnas_data.get("fecha_cols", [])
 
         # Crear una copia editable del DataFrame actual
         df_edicion = st.session_state["df_final"].copy()
@@ -182,6 +226,9 @@ class Aplicacion:
             use_container_width=True,
             disabled=[col_bloqueada],
             num_rows="fixed",
+            column_config={
+                col: st.column_config.DateColumn(format="YYYY-MM-DD") for col in cols_fecha
+            },
         )
 
         # Botón: Confirmar edición
@@ -205,6 +252,16 @@ class Aplicacion:
 
         # Confirmar edición si fue activada
         if st.session_state["confirmar_edicion_pendiente"]:
+            # Filas que cambiaron en el editor, para recalcular solo esas
+            # (ver `_calcular_resultados`).
+            filas_editadas = st.session_state.get(editor_key, {}).get("edited_rows", {})
+            set_key_ss_st(
+                "edicion_incremental",
+                {
+                    "base": st.session_state["df_final"],
+                    "filas": [df_edicion.index[int(pos)] for pos in filas_editadas],
+                },
+            )
             set_key_ss_st("df_final", df_editado)
             set_key_ss_st("edicion_confirmada", True)
             st.success(self.cargador_config.cnf_mensajes["edicion_exitosa"])
@@ -213,36 +270,56 @@ class Aplicacion:
 
     def _calcular_resultados(
         self, df_procesado_prec_vtas: DataFrame, portje_cremto_act: float
-    ) -> DataFrame:
+    ) -> ResultadosSimulacion:
         """
         Realiza el cálculo final del DataFrame procesado:
         - Hace merge con columnas relevantes
         - Aplica transformación usando el porcentaje de crecimiento
+        - Ajusta el promedio mensual al mes de cada evento, si hay perfiles estacionales
+
+        El resultado se conserva en session_state. Si los materiales registrados no
+        cambiaron se reutiliza tal cual; si solo se editaron algunas filas en la tabla
+        editable, se recalculan esas filas y se corrigen los totales.
 
         Args:
             df_procesado_prec_vtas (DataFrame): Datos base procesados
             portje_cremto_act (float): Porcentaje de crecimiento
 
         Returns:
-            DataFrame: Resultado final procesado
+            ResultadosSimulacion: Resultado final procesado y sus totales
         """
-        columnas = self.cargador_config.cols_df_insumo
-
-        df_merge = utils.left_merge_on_columns(
-            df1=st.session_state["df_final"],
-            df2=df_procesado_prec_vtas[columnas],
-            key_columns=["concat_plu_producto"],
-        )
-
-        df_procesado_final = utils.procesar_insumo(
-            df_insumo=df_merge,
+        df_final = st.session_state["df_final"]
+        resultados = st.session_state.get("resultados_memo")
+        edicion = st.session_state.get("edicion_incremental")
+        perfiles = self.gestor_datos.perfiles_estacionales()
+        if resultados is not None and resultados.vigente(
+            df_procesado_prec_vtas, portje_cremto_act, perfiles
+        ):
+            if resultados.df_final is df_final:
+                return resultados
+            if (
+                edicion is not None
+                and edicion["base"] is resultados.df_final
+                and resultados.actualizar_filas(df_final, edicion["filas"])
+            ):
+                set_key_ss_st("edicion_incremental", None)
+                return resultados
+
+        resultados = ResultadosSimulacion(
+            df_final=df_final,
+            df_catalogo=df_procesado_prec_vtas,
+            columnas_catalogo=self.cargador_config.cols_df_insumo,
             porcentaje_crecimiento=portje_cremto_act,
             dict_cols=self.cargador_config.dict_cols,
+            perfiles=perfiles,
         )
+        set_key_ss_st("resultados_memo", resultados)
+        set_key_ss_st("edicion_incremental", None)
+        return resultados
 
-        return df_procesado_final
-
-    def _mostrar_promedios(self, df_procesado_final: DataFrame) -> None:
+    def _mostrar_promedios(
+        self, df_procesado_final: DataFrame, sumatoria: Optional[Series] = None
+    ) -> None:
         """
         Muestra en pantalla:
         - La tabla final procesada
@@ -251,15 +328,18 @@ class Aplicacion:
 
         Args:
             df_procesado_final (DataFrame): DataFrame ya procesado con insumos y cálculos aplicados
+            sumatoria (Series, opcional): Totales ya calculados; si no se entregan se
+                calculan sobre `df_procesado_final`.
         """
         set_key_ss_st("df_procesado_final", df_procesado_final)
         st.dataframe(df_procesado_final.set_index("producto"), use_container_width=True)
 
         # Mostrar promedios de columnas clave
         st.markdown("### Promedios actuales:")
-        sumatoria = utils.calcular_vtas_totales(
-            df_procesado_final, ["Venta de la actividad", "Costo del descuento"]
-        )
+        if sumatoria is None:
+            sumatoria = utils.calcular_vtas_totales(
+                df_procesado_final, ["Venta de la actividad", "Costo del descuento"]
+            )
 
         # Mostrar métricas en columnas separadas
         col1, col2 = st.columns(2)
@@ -271,6 +351,314 @@ class Aplicacion:
             "🔻📉 Total. Costo del descuento", f"${sumatoria['Costo del descuento']:,}"
         )
 
+    def _obtener_cubo_sensibilidad(self, df_procesado_final: DataFrame) -> CuboSensibilidad:
+        """
+        Construye el cubo de sensibilidad de los materiales registrados, o reutiliza el
+        de session_state si los materiales no cambiaron desde el último rerun.
+
+        Args:
+            df_procesado_final (DataFrame): Materiales registrados ya procesados.
+
+        Returns:
+            CuboSensibilidad: Cubo de venta y costo por crecimiento y descuento.
+        """
+        cnf_lateral = self.cargador_config.cnf_lateral_var
+        cnf_crecimiento = cnf_lateral["seccion_crecimiento"]["text_input_crec"]
+        crecimientos = range(cnf_crecimiento["minimo"], cnf_crecimiento["maximo"] + 1)
+        descuentos_rango = descuentos_de_rangos(
+            cnf_lateral["seccion_rango_descuento"]["select_box_rng"]["list_rng_dctos"]
+        )
+        todos = [d for descuentos in descuentos_rango.values() for d in descuentos]
+        descuentos = range(min(todos), max(todos) + 1)
+
+        dict_cols = self.cargador_config.dict_cols
+        columnas = [
+            "fecha_inicio",
+            "fecha_fin",
+            dict_cols["Promedio Mes Und"],
+            dict_cols["Precio de venta"],
+        ]
+        if utils.COLUMNA_PROMEDIO_ESTACIONAL in df_procesado_final.columns:
+            columnas.append(utils.COLUMNA_PROMEDIO_ESTACIONAL)
+        huella = (
+            int(pd.util.hash_pandas_object(df_procesado_final[columnas]).sum()),
+            tuple(crecimientos),
+            tuple(descuentos),
+        )
+        memo = st.session_state.get("cubo_sensibilidad")
+        if memo is not None and memo["huella"] == huella:
+            return memo["cubo"]
+
+        cubo = CuboSensibilidad(
+            df_procesado_final,
+            dict_cols,
+            crecimientos,
+            descuentos,
+            max_celdas=self.cargador_config.cnf_sensibilidad.get("max_celdas"),
+        )
+        set_key_ss_st("cubo_sensibilidad", {"huella": huella, "cubo": cubo})
+        return cubo
+
+    def _mostrar_sensibilidad(self, df_procesado_final: DataFrame) -> None:
+        """
+        Modo de sensibilidad: muestra la venta y el costo del descuento de todos los
+        materiales para cualquier combinación de crecimiento y descuento, y la tabla de
+        costos totales por escenario, sin recalcular al mover los sliders.
+
+        Args:
+            df_procesado_final (DataFrame): Materiales registrados ya procesados.
+        """
+        cnf = self.cargador_config.cnf_sensibilidad
+        if not cnf or not st.toggle(cnf["toggle"]["etiqueta"], key=cnf["toggle"]["clave"]):
+            return
+
+        try:
+            cubo = self._obtener_cubo_sensibilidad(df_procesado_final)
+        except ValueError as e:
+            st.warning(str(e))
+            return
+
+        col1, col2 = st.columns(2)
+        with col1:
+            slider_crecimiento = SliderManager(
+                **cnf["slider_crecimiento"],
+                rango=(int(cubo.crecimientos[0]), int(cubo.crecimientos[-1])),
+                usar_sidebar=False,
+            )
+        with col2:
+            slider_descuento = SliderManager(
+                **cnf["slider_descuento"],
+                rango=(int(cubo.descuentos[0]), int(cubo.descuentos[-1])),
+                usar_sidebar=False,
+            )
+        escenario = cubo.corte(slider_crecimiento.get(), slider_descuento.get())
+
+        col1, col2 = st.columns(2)
+        col1.metric(
+            "💸 Total. Venta de la actividad", f"${int(escenario[MEDIDA_VENTA].sum()):,}"
+        )
+        col2.metric(
+            "🔻📉 Total. Costo del descuento", f"${int(escenario[MEDIDA_COSTO].sum()):,}"
+        )
+
+        st.markdown(f"### {cnf['titulo_totales']}")
+        st.dataframe(cubo.totales(MEDIDA_COSTO), use_container_width=True)
+
+    def _obtener_montecarlo(
+        self, df_procesado_final: DataFrame, portje_cremto_act: float
+    ) -> Optional[SimulacionMonteCarlo]:
+        """
+        Ejecuta la simulación Monte Carlo de los materiales registrados, o reutiliza la
+        de session_state si no cambiaron los materiales, el crecimiento ni el historial.
+
+        Args:
+            df_procesado_final (DataFrame): Materiales registrados ya procesados.
+            portje_cremto_act (float): Porcentaje de crecimiento.
+
+        Returns:
+            Optional[SimulacionMonteCarlo]: Simulación, o None si no hay ventas cargadas.
+        """
+        historial = self.gestor_datos.historial_demanda()
+        if historial is None:
+            return None
+
+        cnf = self.cargador_config.cnf_montecarlo
+        dict_cols = self.cargador_config.dict_cols
+        columnas = [
+            "concat_plu_producto",
+            "rango",
+            "fecha_inicio",
+            "fecha_fin",
+            dict_cols["Promedio Mes Und"],
+            dict_cols["Precio de venta"],
+        ]
+        if utils.COLUMNA_PROMEDIO_ESTACIONAL in df_procesado_final.columns:
+            columnas.append(utils.COLUMNA_PROMEDIO_ESTACIONAL)
+        huella = (
+            int(pd.util.hash_pandas_object(df_procesado_final[columnas]).sum()),
+            id(historial),
+            portje_cremto_act,
+            cnf.get("n_simulaciones"),
+            cnf.get("semilla"),
+        )
+        memo = st.session_state.get("montecarlo")
+        if memo is not None and memo["huella"] == huella:
+            return memo["simulacion"]
+
+        simulacion = SimulacionMonteCarlo(
+            df_procesado_final,
+            historial,
+            dict_cols,
+            portje_cremto_act,
+            n_simulaciones=cnf.get("n_simulaciones", 10000),
+            semilla=cnf.get("semilla"),
+            max_celdas_bloque=cnf.get("max_celdas_bloque", 2_000_000),
+        )
+        set_key_ss_st("montecarlo", {"huella": huella, "simulacion": simulacion})
+        return simulacion
+
+    def _mostrar_montecarlo(
+        self, df_procesado_final: DataFrame, portje_cremto_act: float
+    ) -> None:
+        """
+        Modo Monte Carlo: percentiles P10, P50 y P90 de la venta y el costo del descuento
+        por material registrado y del total, simulando la demanda con la historia de ventas.
+
+        Args:
+            df_procesado_final (DataFrame): Materiales registrados ya procesados.
+            portje_cremto_act (float): Porcentaje de crecimiento.
+        """
+        cnf = self.cargador_config.cnf_montecarlo
+        if not cnf or not st.toggle(cnf["toggle"]["etiqueta"], key=cnf["toggle"]["clave"]):
+            return
+
+        simulacion = self._obtener_montecarlo(df_procesado_final, portje_cremto_act)
+        if simulacion is None:
+            st.warning(self.cargador_config.cnf_mensajes["sin_insumos"])
+            return
+
+        st.markdown(f"### {cnf['titulo_totales']}")
+        col1, col2 = st.columns(2)
+        for col, medida, etiqueta in (
+            (col1, MEDIDA_VENTA, "💸 Venta de la actividad"),
+            (col2, MEDIDA_COSTO, "🔻📉 Costo del descuento"),
+        ):
+            p10, p50, p90 = simulacion.totales[medida]
+            col.metric(
+                f"{etiqueta} (P50)",
+                f"${int(p50):,}",
+                help=f"P10: ${int(p10):,} · P90: ${int(p90):,}",
+            )
+        st.dataframe(simulacion.totales.round(0), use_container_width=True)
+
+        st.markdown(f"### {cnf['titulo_eventos']}")
+        columnas_evento = ["producto", "fecha_inicio", "fecha_fin", "rango"]
+        st.dataframe(
+            pd.concat(
+                [df_procesado_final[columnas_evento], simulacion.por_evento.round(0)], axis=1
+            ).set_index("producto"),
+            use_container_width=True,
+        )
+
+    def _obtener_optimizador(
+        self, df_procesado_final: DataFrame, portje_cremto_act: float, elasticidad: float
+    ) -> OptimizadorDescuentos:
+        """
+        Construye el optimizador de descuentos para el rango de la barra lateral, o
+        reutiliza el de session_state si no cambiaron sus insumos. Resolver un presupuesto
+        con el optimizador ya construido no recalcula las curvas.
+
+        Args:
+            df_procesado_final (DataFrame): Materiales registrados ya procesados.
+            portje_cremto_act (float): Porcentaje de crecimiento.
+            elasticidad (float): Puntos de crecimiento por punto de descuento.
+
+        Returns:
+            OptimizadorDescuentos: Optimizador.
+        """
+        dict_cols = self.cargador_config.dict_cols
+        minimo, maximo = self.gestor_datos.rango_valido
+        descuentos = range(minimo, maximo + 1)
+        columnas = [
+            "fecha_inicio",
+            "fecha_fin",
+            dict_cols["Promedio Mes Und"],
+            dict_cols["Precio de venta"],
+        ]
+        if utils.COLUMNA_PROMEDIO_ESTACIONAL in df_procesado_final.columns:
+            columnas.append(utils.COLUMNA_PROMEDIO_ESTACIONAL)
+        huella = (
+            int(pd.util.hash_pandas_object(df_procesado_final[columnas]).sum()),
+            tuple(descuentos),
+            portje_cremto_act,
+            elasticidad,
+        )
+        memo = st.session_state.get("optimizador")
+        if memo is not None and memo["huella"] == huella:
+            return memo["optimizador"]
+
+        venta, costo = curvas_respuesta(
+            df_procesado_final, dict_cols, descuentos, portje_cremto_act, elasticidad
+        )
+        optimizador = OptimizadorDescuentos(venta, costo, descuentos)
+        set_key_ss_st("optimizador", {"huella": huella, "optimizador": optimizador})
+        return optimizador
+
+    def _mostrar_optimizador(
+        self, resultados: ResultadosSimulacion, portje_cremto_act: float
+    ) -> None:
+        """
+        Optimizador de descuentos: dado un presupuesto de costo del descuento, muestra el
+        descuento de cada material que maximiza la venta proyectada y la compara con la
+        de los descuentos registrados.
+
+        Args:
+            resultados (ResultadosSimulacion): Resultado de los materiales registrados.
+            portje_cremto_act (float): Porcentaje de crecimiento.
+        """
+        cnf = self.cargador_config.cnf_optimizador
+        if not cnf or not st.toggle(cnf["toggle"]["etiqueta"], key=cnf["toggle"]["clave"]):
+            return
+
+        df_procesado_final = resultados.resultado
+        col1, col2 = st.columns(2)
+        elasticidad = col2.number_input(
+            cnf["elasticidad"]["etiqueta"],
+            min_value=0.0,
+            value=float(cnf["elasticidad"]["valor_inicial"]),
+            step=0.1,
+            key=cnf["elasticidad"]["clave"],
+        )
+        # Plan con los descuentos registrados, con la misma respuesta al descuento; su
+        # costo es el presupuesto por defecto.
+        venta_actual, costo_actual = proyectar_plan(
+            df_procesado_final, self.cargador_config.dict_cols, portje_cremto_act, elasticidad
+        )
+        presupuesto = col1.number_input(
+            cnf["presupuesto"]["etiqueta"],
+            min_value=0,
+            value=int(costo_actual.sum()),
+            step=1_000_000,
+            key=cnf["presupuesto"]["clave"],
+        )
+
+        optimizador = self._obtener_optimizador(
+            df_procesado_final, portje_cremto_act, elasticidad
+        )
+        solucion = optimizador.resolver(presupuesto)
+        if not solucion["factible"]:
+            st.warning(
+                cnf["infactible"].format(
+                    minimo=self.gestor_datos.rango_valido[0], costo=optimizador.costo_minimo
+                )
+            )
+            return
+
+        col1, col2 = st.columns(2)
+        col1.metric(
+            "💸 Venta óptima",
+            f"${solucion['venta_total']:,}",
+            delta=f"{solucion['venta_total'] - int(venta_actual.sum()):,}",
+        )
+        col2.metric(
+            "🔻📉 Costo del descuento",
+            f"${solucion['costo_total']:,}",
+            delta=f"{solucion['costo_total'] - int(costo_actual.sum()):,}",
+            delta_color="inverse",
+        )
+
+        st.markdown(f"### {cnf['titulo_materiales']}")
+        st.dataframe(
+            pd.concat(
+                [
+                    df_procesado_final[["producto", "rango"]],
+                    optimizador.tabla(solucion, df_procesado_final.index),
+                ],
+                axis=1,
+            ).set_index("producto"),
+            use_container_width=True,
+        )
+
 
 if __name__ == "__main__":
     utils.setup_ui()
@@ -0,0 +1,143 @@
+"""
+Precalentamiento de caches sin interfaz.
+
+Lee los insumos de la carpeta `Insumos`, ejecuta el mismo preprocesamiento que la
+aplicación y deja en disco:
+
+- Los snapshots de lectura de cada archivo (ver `cnf_ingesta.cache_snapshots`).
+- El catálogo de productos ya procesado (ver `cnf_ingesta.catalogo`).
+
+Cuando un usuario carga luego esos mismos archivos en la aplicación, ambos se
+recuperan del disco en lugar de interpretar los .xlsx y reprocesarlos.
+
+Uso:
+    python precalentar_cache.py [--dir-insumos Insumos/] [--ventas Base_vtas.xlsx]
+                                [--precios Precios.xlsx]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from Controllers.config_loader import ConfigLoader
+from Controllers.sidebar_controller import ControladorBarraLateral
+from services.cache_service import CacheSnapshots, calcular_digest
+from services.data_service import GestorDatos
+from ui_components.ui_components import clave_snapshot_lectura
+
+
+def preparar_insumo(df: pd.DataFrame, opciones: dict) -> pd.DataFrame:
+    """
+    Aplica a un insumo leído completo (como texto) las columnas, filtros, esquema y
+    compactación con que lo lee la aplicación, obteniendo el mismo DataFrame que produce
+    el cargador.
+
+    Args:
+        df (pd.DataFrame): Insumo leído con `utils.lectura_simple_excel`.
+        opciones (dict): Opciones de lectura de la barra lateral
+            (`ControladorBarraLateral._obtener_opciones_lectura`).
+
+    Returns:
+        pd.DataFrame: Insumo listo para `GestorDatos`.
+    """
+    if opciones.get("use_cols"):
+        df = df[opciones["use_cols"]]
+    df = utils.aplicar_filtros(df, opciones.get("filtros")).reset_index(drop=True)
+    df = utils.aplicar_esquema(df, opciones.get("esquema"))
+    if opciones.get("compactacion") is not None:
+        df = utils.compactar_dataframe(df, **opciones["compactacion"])
+    return df
+
+
+def precalentar(dir_insumos: str, nom_ventas: str, nom_precios: str) -> None:
+    """
+    Lee los insumos, guarda sus snapshots de lectura y el catálogo procesado.
+
+    Args:
+        dir_insumos (str): Carpeta de los insumos (terminada en separador).
+        nom_ventas (str): Nombre del archivo de ventas.
+        nom_precios (str): Nombre del archivo de precios.
+    """
+    cargador_config = ConfigLoader(utils=utils)
+    cnf_ingesta = cargador_config.cnf_ingesta
+    utils.configurar_copy_on_write(cnf_ingesta.get("copy_on_write", False))
+    # Mismas opciones de lectura que usa la barra lateral de la aplicación
+    barra_lateral = ControladorBarraLateral(
+        cargador_config.cnf_lateral_var, cnf_ingesta, cargador_config.cnf_pipeline
+    )
+    cnf_snapshots = cnf_ingesta.get("cache_snapshots", {})
+    cache_lectura = (
+        CacheSnapshots(cnf_snapshots["directorio"], max_mb=cnf_snapshots.get("max_mb"))
+        if cnf_snapshots.get("habilitado", False)
+        else None
+    )
+
+    insumos = {}
+    digests = {}
+    for insumo, nom_archivo in (("precios", nom_precios), ("ventas", nom_ventas)):
+        inicio = time.perf_counter()
+        opciones = barra_lateral._obtener_opciones_lectura(insumo)
+        with open(os.path.join(dir_insumos, nom_archivo), "rb") as archivo:
+            digests[insumo] = [calcular_digest(archivo.read())]
+
+        df = utils.lectura_simple_excel(dir_insumos, nom_archivo, nom_hoja=0)
+        insumos[insumo] = preparar_insumo(df, opciones)
+
+        if cache_lectura is not None:
+            cache_lectura.guardar(
+                clave_snapshot_lectura(
+                    digests[insumo][0],
+                    nom_archivo.split(".")[-1].lower(),
+                    opciones["use_cols"],
+                    opciones["filtros"],
+                    opciones["esquema"],
+                    compactacion=opciones["compactacion"],
+                ),
+                insumos[insumo],
+            )
+        logger.info(
+            f"{nom_archivo}: {len(insumos[insumo])} filas en "
+            f"{time.perf_counter() - inicio:.2f} s"
+        )
+
+    inicio = time.perf_counter()
+    gestor_datos = GestorDatos(cargador_config)
+    if gestor_datos._obtener_cache_catalogo() is None:
+        logger.warning("cnf_ingesta.catalogo está deshabilitado: no se guarda el catálogo.")
+    gestor_datos.procesar_dfs_insumos(
+        insumos["precios"], insumos["ventas"], digests_insumos=digests
+    )
+    logger.success(
+        f"Catálogo de {len(gestor_datos.df_prec_vtas_procesado)} productos listo en "
+        f"{time.perf_counter() - inicio:.2f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Precalienta los caches en disco del simulador a partir de los insumos."
+    )
+    parser.add_argument("--dir-insumos", default="Insumos/")
+    parser.add_argument("--ventas", default="Base_vtas.xlsx")
+    parser.add_argument("--precios", default="Precios.xlsx")
+    args = parser.parse_args()
+
+    # Fuera de `streamlit run` el session_state solo emite advertencias.
+    logging.disable(logging.WARNING)
+
+    dir_insumos = os.path.join(args.dir_insumos, "")
+    try:
+        precalentar(dir_insumos, args.ventas, args.precios)
+    except Exception as e:
+        logger.critical(f"Precalentamiento fallido: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from services.cache_service import CacheSnapshots
+from services.motor_service import MotorDatos
+
+SUFIJO_SUMA = "__suma"
+SUFIJO_CONTEO = "__conteo"
+# Se incrementa cuando cambia el formato persistido del estado.
+VERSION_ESTADO = 3
+
+
+class EstadoAgregacion:
+    """
+    Estado incremental de un promedio agrupado.
+
+    En lugar de guardar solo el promedio, conserva por grupo la suma y el conteo de cada
+    columna de valor, de modo que la media se reconstruye exactamente (suma / conteo) y un
+    nuevo lote de filas se incorpora en tiempo proporcional al lote y no al histórico.
+
+    Antes de agrupar se aplica un remapeo columna_destino <- columna_referencia (en ventas,
+    Cod. SAP Unificado <- EAN Unificado cuando difieren). El remapeo se deriva de una tabla
+    de identidades (combinaciones distintas de códigos, p. ej. EAN/SAP/PLU), por lo que su
+    costo depende de los códigos distintos y no de las filas de ventas. Depende solo de la
+    columna de referencia, que también es llave de agrupación, así que puede volver a
+    aplicarse sobre los grupos ya agregados cuando un lote nuevo lo modifica.
+
+    Con `columna_periodo` (en ventas, el mes) las sumas y conteos se guardan por grupo y
+    periodo, y la media de cada grupo se obtiene sumando sus periodos. Los agregados por
+    periodo (ver `por_periodo`) sirven para los perfiles estacionales sin volver a
+    recorrer las filas.
+    """
+
+    def __init__(
+        self,
+        columnas_grupo: List[str],
+        columnas_valor: List[str],
+        columna_destino: str,
+        columna_referencia: str,
+        columnas_identidad: Optional[List[str]] = None,
+        agregados: Optional[pd.DataFrame] = None,
+        identidades: Optional[pd.DataFrame] = None,
+        huellas: Tuple[str, ...] = (),
+        motor: Optional[MotorDatos] = None,
+        columna_periodo: Optional[str] = None,
+    ):
+        """
+        Args:
+            columnas_grupo (list[str]): Llaves de agrupación.
+            columnas_valor (list[str]): Columnas a promediar.
+            columna_destino (str): Columna cuyo valor se reemplaza según el mapeo.
+            columna_referencia (str): Columna que define el reemplazo.
+            columnas_identidad (list[str], opcional): Códigos que forman la tabla de
+                identidades; por defecto referencia y destino.
+            agregados (pd.DataFrame, opcional): Sumas y conteos por grupo ya calculados.
+            identidades (pd.DataFrame, opcional): Tabla de identidades acumulada.
+            huellas (tuple[str], opcional): Archivos ya incorporados, en orden.
+            motor (MotorDatos, opcional): Motor que calcula las agrupaciones; por
+                defecto pandas.
+            columna_periodo (str, opcional): Columna adicional por la que se separan las
+                sumas y conteos de cada grupo.
+        """
+        self.columnas_grupo = columnas_grupo
+        self.columnas_valor = columnas_valor
+        self.columna_destino = columna_destino
+        self.columna_referencia = columna_referencia
+        self.columnas_identidad = columnas_identidad or [columna_referencia, columna_destino]
+        self.agregados = agregados
+        self.identidades = identidades
+        self.mapeo = self._mapeo()
+        self.huellas = tuple(huellas)
+        self.motor = motor or MotorDatos()
+        self.columna_periodo = columna_periodo
+        # Llaves de los agregados guardados: los grupos y, si hay, el periodo
+        self.llaves_agregados = columnas_grupo + ([columna_periodo] if columna_periodo else [])
+
+    def _mapeo(self) -> pd.Series:
+        """Mapeo referencia -> destino vigente según la tabla de identidades."""
+        if self.identidades is None:
+            return pd.Series(dtype=object)
+        return utils.mapeo_desde_identidades(
+            self.identidades, self.columna_referencia, self.columna_destino
+        )
+
+    def _resolver(self, df: pd.DataFrame, mapeo: pd.Series) -> pd.DataFrame:
+        return utils.resolver_columna_por_mapeo(
+            df, mapeo, self.columna_referencia, self.columna_destino
+        )
+
+    def _columnas_acumuladas(self) -> List[str]:
+        return [c + SUFIJO_SUMA for c in self.columnas_valor] + [
+            c + SUFIJO_CONTEO for c in self.columnas_valor
+        ]
+
+    def _agrupar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Calcula suma y conteo por grupo (y periodo) de un DataFrame ya remapeado."""
+        # Las sumas se acumulan en float64 aunque la columna llegue compactada a float32.
+        df = utils.asignar_columnas(
+            df,
+            {c: df[c].astype(np.float64) for c in self.columnas_valor if df[c].dtype == np.float32},
+        )
+        # Los grupos se agregan sin ordenar; el orden final se fija una sola vez en
+        # `medias`, sobre los grupos ya agregados.
+        return self.motor.agrupar(
+            df,
+            self.llaves_agregados,
+            {
+                **{c + SUFIJO_SUMA: (c, "sum") for c in self.columnas_valor},
+                **{c + SUFIJO_CONTEO: (c, "count") for c in self.columnas_valor},
+            },
+        )
+
+    def incorporar(self, delta: pd.DataFrame, huellas: Tuple[str, ...] = ()) -> None:
+        """
+        Incorpora un lote de filas (ya filtrado y sin nulos en las llaves) al estado.
+
+        Args:
+            delta (pd.DataFrame): Filas nuevas.
+            huellas (tuple[str], opcional): Archivos a los que corresponde el lote.
+        """
+        # Las identidades del lote van después de las acumuladas: la última fila gana,
+        # igual que si se construyera el mapeo sobre el histórico completo.
+        identidades_delta = utils.construir_tabla_identidad(delta, self.columnas_identidad)
+        if self.identidades is not None:
+            identidades_delta = utils.construir_tabla_identidad(
+                utils.concatenar_mismo_esquema([self.identidades, identidades_delta]),
+                self.columnas_identidad,
+            )
+        self.identidades = identidades_delta
+
+        mapeo_anterior = self.mapeo
+        self.mapeo = self._mapeo()
+        mapeo_cambio = not self.mapeo.sort_index().equals(mapeo_anterior.sort_index())
+
+        delta = self._resolver(delta, self.mapeo)
+        agregados_delta = self._agrupar(delta)
+
+        if self.agregados is None:
+            self.agregados = agregados_delta
+        else:
+            agregados = self.agregados
+            if mapeo_cambio:
+                agregados = self._resolver(agregados, self.mapeo)
+            combinado = utils.concatenar_mismo_esquema([agregados, agregados_delta])
+            self.agregados = self.motor.agrupar(
+                combinado,
+                self.llaves_agregados,
+                {c: (c, "sum") for c in self._columnas_acumuladas()},
+            )
+
+        self.huellas += tuple(huellas)
+        logger.info(
+            f"Lote de {len(delta)} filas incorporado: {len(self.agregados)} grupos acumulados."
+        )
+
+    def medias(self) -> pd.DataFrame:
+        """
+        Reconstruye el promedio por grupo a partir de las sumas y conteos.
+
+        Returns:
+            pd.DataFrame: Llaves de agrupación y columnas de valor promediadas, con la
+            misma forma que `groupby(columnas_grupo)[columnas_valor].mean().reset_index()`.
+        """
+        agregados = self.agregados
+        if self.columna_periodo is not None:
+            agregados = self.motor.agrupar(
+                agregados,
+                self.columnas_grupo,
+                {c: (c, "sum") for c in self._columnas_acumuladas()},
+            )
+        # Orden por el texto de las llaves (no por los códigos de las categorías, que
+        # dependen del orden en que llegaron los lotes): mismo orden en cualquier caso.
+        agregados = agregados.sort_values(
+            self.columnas_grupo, ignore_index=True, key=lambda serie: serie.astype(str)
+        )
+        medias = {
+            c: agregados[c + SUFIJO_SUMA] / agregados[c + SUFIJO_CONTEO]
+            for c in self.columnas_valor
+        }
+        return utils.asignar_columnas(agregados[self.columnas_grupo], medias)
+
+    def por_periodo(self) -> pd.DataFrame:
+        """
+        Sumas y conteos por grupo y periodo (columnas con sufijos `__suma` y `__conteo`).
+
+        Returns:
+            pd.DataFrame: Llaves de agrupación, periodo y columnas acumuladas.
+
+        Raises:
+            ValueError: Si el estado no se construyó con `columna_periodo`.
+        """
+        if self.columna_periodo is None:
+            raise ValueError("El estado de agregación no separa las sumas por periodo.")
+        return self.agregados
+
+    def guardar(self, cache: CacheSnapshots, clave: str) -> None:
+        """
+        Persiste el estado (agregados e identidades) en el cache de snapshots.
+
+        Args:
+            cache (CacheSnapshots): Cache en disco.
+            clave (str): Clave del estado.
+        """
+        cache.guardar(clave, self.agregados)
+        cache.guardar(f"{clave}_identidades", self.identidades)
+
+    def cargar(self, cache: CacheSnapshots, clave: str, huellas: Tuple[str, ...]) -> bool:
+        """
+        Recupera un estado persistido con `guardar`.
+
+        Args:
+            cache (CacheSnapshots): Cache en disco.
+            clave (str): Clave del estado.
+            huellas (tuple[str]): Archivos que cubre el estado persistido.
+
+        Returns:
+            bool: True si el estado se encontró y se cargó.
+        """
+        agregados = cache.leer(clave)
+        identidades = cache.leer(f"{clave}_identidades")
+        if agregados is None or identidades is None:
+            return False
+        self.agregados = agregados
+        self.identidades = identidades
+        self.mapeo = self._mapeo()
+        self.huellas = tuple(huellas)
+        return True
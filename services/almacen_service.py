@@ -0,0 +1,125 @@
+import threading
+import weakref
+from collections import deque
+from typing import Dict, Optional
+
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+
+
+class ManejadorDataFrame:
+    """
+    Referencia liviana de una sesión a un DataFrame del `AlmacenDataFrames`.
+
+    Es lo único que la sesión guarda en session_state. Mientras exista el manejador el
+    DataFrame permanece en el almacén; cuando la sesión lo descarta (cambia de archivo
+    o la sesión termina) se libera su referencia.
+
+    El DataFrame es compartido entre sesiones y no debe modificarse en el lugar.
+    """
+
+    __slots__ = ("clave", "_almacen", "__weakref__")
+
+    def __init__(self, clave: str, almacen: "AlmacenDataFrames"):
+        """
+        Args:
+            clave (str): Clave del DataFrame en el almacén.
+            almacen (AlmacenDataFrames): Almacén que lo contiene.
+        """
+        self.clave = clave
+        self._almacen = almacen
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """DataFrame referenciado."""
+        return self._almacen._entradas[self.clave]["df"]
+
+
+class AlmacenDataFrames:
+    """
+    Almacén de DataFrames compartido por todas las sesiones del proceso, direccionado por
+    contenido (digest del archivo más la especificación de lectura, o clave del catálogo).
+
+    Cada DataFrame se guarda una sola vez junto con un conteo de referencias: cada
+    sesión que lo usa recibe un `ManejadorDataFrame`, y cuando ya no queda ninguno el
+    DataFrame se descarta. Así la memoria crece con los insumos distintos y no con el
+    número de usuarios que cargan los mismos archivos.
+    """
+
+    def __init__(self):
+        self._entradas: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # Los manejadores se liberan desde el recolector de basura, que puede correr en
+        # cualquier hilo y momento; solo encolan la clave y el almacén la procesa en su
+        # siguiente operación, con el lock tomado.
+        self._liberaciones = deque()
+
+    def _nuevo_manejador(self, clave: str) -> ManejadorDataFrame:
+        manejador = ManejadorDataFrame(clave, self)
+        self._entradas[clave]["referencias"] += 1
+        weakref.finalize(manejador, self._liberaciones.append, clave)
+        return manejador
+
+    def _procesar_liberaciones(self) -> None:
+        while self._liberaciones:
+            clave = self._liberaciones.popleft()
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                continue
+            entrada["referencias"] -= 1
+            if entrada["referencias"] <= 0:
+                del self._entradas[clave]
+                logger.info(f"Almacén: DataFrame {clave} liberado (sin sesiones que lo usen).")
+
+    def obtener(self, clave: str) -> Optional[ManejadorDataFrame]:
+        """
+        Retorna un manejador nuevo para un DataFrame ya almacenado.
+
+        Args:
+            clave (str): Clave del DataFrame.
+
+        Returns:
+            Optional[ManejadorDataFrame]: Manejador, o None si la clave no está almacenada.
+        """
+        with self._lock:
+            self._procesar_liberaciones()
+            if clave not in self._entradas:
+                return None
+            return self._nuevo_manejador(clave)
+
+    def registrar(self, clave: str, df: pd.DataFrame) -> ManejadorDataFrame:
+        """
+        Almacena un DataFrame (si la clave no existía) y retorna un manejador.
+
+        Si otra sesión registró la misma clave entretanto se conserva el DataFrame ya
+        almacenado, de modo que todas las sesiones comparten el mismo objeto.
+
+        Args:
+            clave (str): Clave del DataFrame.
+            df (pd.DataFrame): DataFrame a almacenar.
+
+        Returns:
+            ManejadorDataFrame: Manejador del DataFrame almacenado.
+        """
+        with self._lock:
+            self._procesar_liberaciones()
+            if clave not in self._entradas:
+                self._entradas[clave] = {"df": df, "referencias": 0}
+            return self._nuevo_manejador(clave)
+
+    def estadisticas(self) -> dict:
+        """
+        Resumen del contenido del almacén.
+
+        Returns:
+            dict: Número de DataFrames, referencias totales y bytes ocupados.
+        """
+        with self._lock:
+            self._procesar_liberaciones()
+            return {
+                "dataframes": len(self._entradas),
+                "referencias": sum(e["referencias"] for e in self._entradas.values()),
+                "bytes": sum(utils.memoria_dataframe(e["df"]) for e in self._entradas.values()),
+            }
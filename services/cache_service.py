@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+import pandas as pd
+from loguru import logger
+
+# Se incrementa cuando cambia la forma en que se construyen los snapshots,
+# invalidando automáticamente los archivos escritos por versiones anteriores.
+VERSION_SNAPSHOT = 1
+DIR_SNAPSHOTS_DEFECTO = "Cache/snapshots"
+
+
+def calcular_digest(bytes_archivo: bytes) -> str:
+    """
+    Calcula un digest de contenido para un archivo cargado.
+
+    Args:
+        bytes_archivo (bytes): Contenido completo del archivo.
+
+    Returns:
+        str: Digest hexadecimal (blake2b de 128 bits).
+    """
+    return hashlib.blake2b(bytes_archivo, digest_size=16).hexdigest()
+
+
+def calcular_huella_rapida(
+    nombre: str,
+    contenido: bytes,
+    id_carga: Optional[str] = None,
+    tamano_muestra: int = 65536,
+    digest: Optional[str] = None,
+) -> str:
+    """
+    Calcula una huella barata de un archivo cargado sin recorrer todo su contenido.
+
+    Combina el id de carga, el nombre, el tamaño y una muestra del inicio y del final
+    del archivo. En un .xlsx (zip) el final contiene el directorio central con el CRC de
+    cada hoja, por lo que la muestra cambia si cambia cualquier dato.
+
+    Sin id de carga (el uploader no asigna uno) la muestra no basta: un CSV editado en
+    el medio sin cambiar de tamaño tendría la misma huella. En ese caso la huella se
+    deriva del digest de todo el contenido (`calcular_digest`), que puede pasarse en
+    `digest` si ya se calculó para no recorrer el contenido dos veces.
+
+    Args:
+        nombre (str): Nombre del archivo.
+        contenido (bytes): Contenido del archivo (solo se leen los extremos si hay
+            `id_carga`).
+        id_carga (str, opcional): Identificador de la carga asignado por el uploader.
+        tamano_muestra (int): Bytes muestreados en cada extremo.
+        digest (str, opcional): `calcular_digest(contenido)`, si ya se calculó (solo se
+            usa sin `id_carga`).
+
+    Returns:
+        str: Huella hexadecimal.
+    """
+    vista = memoryview(contenido)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{id_carga}|{nombre}|{len(vista)}".encode("utf-8"))
+    if id_carga is None:
+        hasher.update((digest or calcular_digest(vista)).encode("utf-8"))
+    else:
+        hasher.update(vista[:tamano_muestra])
+        hasher.update(vista[-tamano_muestra:])
+    return hasher.hexdigest()
+
+
+def construir_clave_snapshot(digest: str, **especificacion: Any) -> str:
+    """
+    Construye la clave de un snapshot a partir del digest del archivo y de la
+    especificación de lectura (usecols, dtype, tipo de archivo, etc.).
+
+    Dos lecturas del mismo archivo con distinta especificación generan claves distintas.
+
+    Args:
+        digest (str): Digest del contenido del archivo.
+        **especificacion: Parámetros de lectura que afectan el DataFrame resultante.
+
+    Returns:
+        str: Clave hexadecimal del snapshot.
+    """
+    espec = {"version": VERSION_SNAPSHOT, "digest": digest, **especificacion}
+    serializado = json.dumps(espec, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(serializado.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CacheSnapshots:
+    """
+    Cache persistente en disco de DataFrames en formato Parquet, direccionado por contenido.
+
+    Permite que un archivo ya procesado se recupere en milisegundos incluso después de
+    reiniciar el servidor, evitando volver a interpretar el XLSX con openpyxl.
+
+    Con `max_mb` la carpeta se mantiene bajo ese tamaño: al guardar un snapshot se
+    eliminan los usados hace más tiempo (cada lectura actualiza la fecha de
+    modificación del archivo, de modo que el orden es el del último uso).
+    """
+
+    EXTENSION = ".parquet"
+
+    def __init__(self, directorio: str = DIR_SNAPSHOTS_DEFECTO, max_mb: Optional[float] = None):
+        """
+        Args:
+            directorio (str): Carpeta donde se almacenan los snapshots.
+            max_mb (float, opcional): Tamaño máximo de la carpeta en MB; sin límite si es
+                None.
+        """
+        self.directorio = directorio
+        self.max_mb = max_mb
+
+    def ruta(self, clave: str) -> str:
+        """Retorna la ruta del archivo asociado a una clave."""
+        return os.path.join(self.directorio, f"{clave}{self.EXTENSION}")
+
+    def leer(self, clave: str) -> Optional[pd.DataFrame]:
+        """
+        Lee un snapshot si existe.
+
+        Args:
+            clave (str): Clave del snapshot.
+
+        Returns:
+            Optional[pd.DataFrame]: DataFrame almacenado o None si no existe o está corrupto.
+        """
+        ruta = self.ruta(clave)
+        if not os.path.exists(ruta):
+            return None
+        try:
+            df = pd.read_parquet(ruta)
+            logger.info(f"Snapshot recuperado desde disco: {ruta}")
+        except Exception as e:
+            logger.warning(f"Snapshot ilegible en {ruta}, se descarta: {e}")
+            return None
+        try:
+            # Marca el uso para que `podar` elimine primero los menos usados
+            os.utime(ruta)
+        except OSError:
+            pass
+        return df
+
+    def guardar(self, clave: str, df: pd.DataFrame) -> None:
+        """
+        Escribe un snapshot de forma atómica (archivo temporal + reemplazo).
+
+        Un fallo al escribir no interrumpe la aplicación: el cache es solo una optimización.
+        Con `max_mb` se podan después los snapshots usados hace más tiempo.
+
+        Args:
+            clave (str): Clave del snapshot.
+            df (pd.DataFrame): DataFrame a almacenar.
+        """
+        ruta = self.ruta(clave)
+        ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            df.to_parquet(ruta_tmp, index=False)
+            os.replace(ruta_tmp, ruta)
+            logger.info(f"Snapshot almacenado en disco: {ruta}")
+        except Exception as e:
+            logger.warning(f"No fue posible almacenar el snapshot {ruta}: {e}")
+            if os.path.exists(ruta_tmp):
+                os.remove(ruta_tmp)
+            return
+        if self.max_mb is not None:
+            self.podar(conservar=ruta)
+
+    def podar(self, conservar: Optional[str] = None) -> int:
+        """
+        Elimina los snapshots usados hace más tiempo (fecha de modificación más antigua)
+        hasta que la carpeta ocupe a lo sumo `max_mb`.
+
+        Un snapshot que no se puede eliminar (p. ej. abierto por otro proceso en Windows)
+        se omite; otro proceso que lo busque después de eliminado simplemente no lo
+        encuentra y vuelve a calcularlo.
+
+        Args:
+            conservar (str, opcional): Ruta que no se elimina (el snapshot recién guardado).
+
+        Returns:
+            int: Número de snapshots eliminados.
+        """
+        if self.max_mb is None:
+            return 0
+        archivos = []
+        try:
+            with os.scandir(self.directorio) as entradas:
+                for entrada in entradas:
+                    if not entrada.name.endswith(self.EXTENSION):
+                        continue
+                    try:
+                        estado = entrada.stat()
+                    except OSError:
+                        # Eliminado por otro proceso mientras se recorría la carpeta
+                        continue
+                    archivos.append((estado.st_mtime, estado.st_size, entrada.path))
+        except OSError as e:
+            logger.warning(f"No fue posible revisar el tamaño de {self.directorio}: {e}")
+            return 0
+
+        limite = self.max_mb * 1024**2
+        total = sum(tamano for _, tamano, _ in archivos)
+        eliminados = 0
+        for _, tamano, ruta in sorted(archivos):
+            if total <= limite:
+                break
+            if ruta == conservar:
+                continue
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+            eliminados += 1
+        if eliminados:
+            logger.info(
+                f"Cache {self.directorio}: {eliminados} snapshots eliminados por superar "
+                f"{self.max_mb} MB."
+            )
+        return eliminados
@@ -1,9 +1,31 @@
+import time
+
+import numpy as np
 import pandas as pd
+import streamlit as st
+from loguru import logger
 from pandas import DataFrame
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from Controllers.config_loader import ConfigLoader
-from ui_components.ui_components import add_key_ss_st
+from ui_components.ui_components import obtener_almacen_dataframes, set_key_ss_st
 import ui_components.utils as utils
+from services.agregacion_service import (
+    SUFIJO_CONTEO,
+    SUFIJO_SUMA,
+    VERSION_ESTADO,
+    EstadoAgregacion,
+)
+from services.cache_service import CacheSnapshots, construir_clave_snapshot
+from services.estacionalidad_service import PerfilesEstacionales
+from services.montecarlo_service import HistorialDemanda
+from services.pipeline_service import (
+    OPERACION_AGREGACION,
+    PipelineDatos,
+    nuevo_estado_agregacion,
+)
+
+# Se incrementa cuando cambia el preprocesamiento, invalidando los catálogos en disco.
+VERSION_CATALOGO = 2
 
 
 class GestorDatos:
@@ -21,120 +43,360 @@ class GestorDatos:
         self.df_vtas_copy = None
         self.df_prec_vtas_procesado = None
         self.rango_valido = (1, 50)
+        # Bytes ocupados por los datos en cada etapa del procesamiento
+        self.bytes_por_etapa = {}
+        # Origen del catálogo en la última ejecución ("sesion", "compartido", "disco"
+        # o "reconstruido") y segundos que tomó obtenerlo
+        self.estado_catalogo = None
+        # Digests (o huellas) de los archivos de insumo de la última ejecución
+        self.ids_insumos = {}
+        # Ventas recibidas en la última ejecución (sin copiar), para el historial de demanda
+        self.df_vtas_recibidas = None
+        # Huella y filas de cada archivo de ventas de la última ejecución
+        self.particiones_vtas = None
+        # Estado de la agregación de ventas (sumas y conteos por grupo y mes) y perfiles
+        # estacionales derivados de él, obtenidos solo cuando se piden
+        self.estado_agregacion = None
+        self.perfiles = None
+        # Etapas de preprocesamiento de ventas declaradas en config (cnf_pipeline)
+        cnf_pipeline = self.config.get("cnf_pipeline", {})
+        self.pipeline_vtas = PipelineDatos(
+            cnf_pipeline.get("ventas"),
+            optimizar=cnf_pipeline.get("optimizar", True),
+            motor=cnf_pipeline.get("motor"),
+        )
 
     def procesar_dfs_insumos(
         self,
         df_precios: Optional[pd.DataFrame],
         df_vtas: Optional[pd.DataFrame],
+        particiones_vtas: Optional[Sequence[Tuple[str, int]]] = None,
+        digests_insumos: Optional[Dict[str, List[str]]] = None,
+        huellas_insumos: Optional[Dict[str, List[str]]] = None,
     ):
         """Carga y procesa los datos de entrada
 
+        El catálogo procesado se guarda en el almacén de DataFrames del proceso y la
+        sesión conserva su manejador junto con la huella de sus insumos: en los reruns
+        en que no cambió ningún archivo ni la configuración se reutiliza sin ejecutar
+        ninguna etapa, y otra sesión que cargue los mismos archivos (mismos digests)
+        comparte el mismo catálogo.
+
         Args:
             df (Optional[pd.DataFrame]): DataFrame con datos crudos
+            particiones_vtas (Sequence[Tuple[str, int]], opcional): Huella y número de filas
+                de cada archivo de ventas, en el orden en que se concatenaron. Permite
+                agregar solo los archivos nuevos.
+            digests_insumos (Dict[str, List[str]], opcional): Digests de contenido de los
+                archivos de "precios" y "ventas". Si el catálogo de esos archivos ya está en
+                el cache en disco (p. ej. precalentado con `precalentar_cache.py`), se
+                recupera sin volver a procesar.
+            huellas_insumos (Dict[str, List[str]], opcional): Huellas de carga de los
+                archivos de "precios" y "ventas", usadas para reutilizar el catálogo entre reruns.
         """
         # Filtrar solo los años 2024 y 2025
 
         if df_precios is not None and not df_precios.empty:
-            #add_key_ss_st(clave="df_insumo", valor_inicial=df)
-            add_key_ss_st(clave="df_precios", valor_inicial=df_precios)
-            add_key_ss_st(clave="df_vtas", valor_inicial=df_vtas)
-
-            #self.df_copy = df.copy()
-            self.df_prec_copy = df_precios.copy()
-            self.df_vtas_copy = df_vtas.copy()
-
-            self._procesar_datos()
-            self._procesar_dfs_vtas_y_precios()
-
-    def _procesar_dfs_vtas_y_precios(self):
-        """Tranformaciones necesarias sobre la el dataframe de vtas"""
-        df_fil_an = utils.filtrar_por_valores(
-            df=self.df_vtas_copy, columna="Año", valores=["2024", "2025"]
-        )
-
-        # Filtrar Fabricante distinto de "Otros Oper Cciales"
-        df_fil_final = utils.filtrar_por_valores(
-            df=df_fil_an,
-            columna="Fabricante",
-            valores=["Otros Oper Cciales"],
-            incluir=False,
-        )
-
-        df_fil_final = utils.Cambiar_tipo_dato_multiples_columnas_pd(
-            base=df_fil_final, list_columns=["Ventas_COP", "Ventas_Un"], type_data=float
-        )
-        # Tramiento básico nulos previo a agrupación.
-        df_fil_final = df_fil_final.fillna("-")
-
-        # Agrupar y sacar promedio
-        group_cols = [
-            "Agrupación Formatos",
-            "Marca",
-            "Cod. SAP Unificado",
-            "PLU",
-            "EAN Unificado",
-            "Fabricante",
-            "Categoría",
-            "Subcategoría",
-            "Producto Unificado",
-        ]
-        dict_sap_ean_diferentes = {
-            k: v
-            for k, v in zip(
-                df_fil_final["EAN Unificado"], df_fil_final["Cod. SAP Unificado"]
+            # Los insumos no se copian a session_state: viven en el almacén de
+            # DataFrames y la sesión solo guarda sus manejadores (ver FileUploaderManager).
+            inicio = time.perf_counter()
+            self.ids_insumos = digests_insumos or huellas_insumos or {}
+            self.df_vtas_recibidas = df_vtas
+            self.particiones_vtas = particiones_vtas
+            self.estado_agregacion = None
+            self.perfiles = None
+            clave_sesion = self.clave_catalogo(huellas_insumos or {})
+            memo = st.session_state.get("catalogo_memo")
+            if clave_sesion is not None and memo is not None and memo["clave"] == clave_sesion:
+                self.df_prec_vtas_procesado = memo["manejador"].df
+                origen = "sesion"
+            else:
+                almacen = obtener_almacen_dataframes()
+                clave_almacen = self.clave_catalogo(digests_insumos or {}) or clave_sesion
+                manejador = almacen.obtener(clave_almacen) if clave_almacen else None
+                if manejador is not None:
+                    origen = "compartido"
+                else:
+                    origen = self._construir_catalogo(
+                        df_precios, df_vtas, particiones_vtas, digests_insumos
+                    )
+                    if clave_almacen is not None:
+                        manejador = almacen.registrar(
+                            clave_almacen, self.df_prec_vtas_procesado
+                        )
+                if manejador is not None:
+                    self.df_prec_vtas_procesado = manejador.df
+                    if clave_sesion is not None:
+                        set_key_ss_st(
+                            "catalogo_memo", {"clave": clave_sesion, "manejador": manejador}
+                        )
+
+            self.estado_catalogo = {
+                "origen": origen,
+                "segundos": time.perf_counter() - inicio,
+            }
+            logger.info(
+                f"Catálogo de productos ({origen}) en {self.estado_catalogo['segundos']:.3f} s"
             )
-            if k != v
-        }
-
-        df_fil_final = utils.reemplazar_columna_en_funcion_de_otra(
-            df_fil_final,
-            nom_columna_a_reemplazar="Cod. SAP Unificado",
-            nom_columna_de_referencia="EAN Unificado",
-            mapeo=dict_sap_ean_diferentes,
-        )
-
-        df_fil_final_group = utils.group_by_and_operate(
-            df=df_fil_final,
-            group_col=group_cols,
-            operation_cols=["Ventas_COP", "Ventas_Un"],
-            operation="mean",
-        )
-        
-        df_fil_final_group = utils.Cambiar_tipo_dato_multiples_columnas_pd(
-            base=df_fil_final_group,
-            list_columns=["Ventas_COP", "Ventas_Un"],
-            type_data=int,
-        )
-
-        df_fil_final_group = utils.left_merge_on_columns(
-            df1=df_fil_final_group,
-            df2=self.df_prec_copy[
-                ["PLU", "SUBLINEA", "P. LISTA", "P. SUGERIDO"]
-            ],
-            key_columns=["PLU"],
-        )
-        df_fil_final_group[["P. LISTA", "P. SUGERIDO"]] = df_fil_final_group[
-            ["P. LISTA", "P. SUGERIDO"]
-        ].fillna(0)
-
-        df_fil_final_group_re = utils.renombrar_columnas_con_diccionario(
-            df=df_fil_final_group,
-            cols_to_rename={
-                "Ventas_COP": "Venta $$ Promedio Mes",
-                "Ventas_Un": "Promedio Mes Und",
-                "Producto Unificado": "producto",
-                "P. SUGERIDO": "Precio de venta",
-                "SUBLINEA": "Sub",
-                "PLU": "plu",
-            },
-        )
-
-        self.df_prec_vtas_procesado  = utils.concatenar_columnas_pd(
-            dataframe=df_fil_final_group_re,
-            cols_elegidas=["plu", "producto"],
-            nueva_columna="concat_plu_producto",
-            usar_separador=True,
-            separador=" : ",
+
+    def _construir_catalogo(
+        self,
+        df_precios: DataFrame,
+        df_vtas: DataFrame,
+        particiones_vtas: Optional[Sequence[Tuple[str, int]]],
+        digests_insumos: Optional[Dict[str, List[str]]],
+    ) -> str:
+        """
+        Obtiene `df_prec_vtas_procesado` desde el cache en disco o ejecutando el procesamiento.
+
+        Returns:
+            str: "disco" si se recuperó del cache en disco, "reconstruido" en otro caso.
+        """
+        cache_catalogo = self._obtener_cache_catalogo()
+        clave_catalogo = self.clave_catalogo(digests_insumos or {})
+        if cache_catalogo is not None and clave_catalogo is not None:
+            df_catalogo = cache_catalogo.leer(clave_catalogo)
+            if df_catalogo is not None:
+                # Parquet devuelve None en los nulos de texto; el procesamiento deja NaN.
+                cols_texto = df_catalogo.select_dtypes("object").columns
+                df_catalogo[cols_texto] = df_catalogo[cols_texto].where(
+                    df_catalogo[cols_texto].notna(), np.nan
+                )
+                logger.info("Catálogo de productos recuperado del cache en disco.")
+                self.df_prec_vtas_procesado = df_catalogo
+                return "disco"
+
+        #self.df_copy = df.copy()
+        # Los lectores ya aplican el esquema; aquí solo se garantiza para
+        # DataFrames que lleguen sin tipar (no se reconvierte lo ya tipado).
+        # No se copian los insumos: ninguna etapa modifica el DataFrame que recibe,
+        # las columnas convertidas se reemplazan en una copia superficial.
+        cnf_ingesta = self.config.get("cnf_ingesta", {})
+        self.bytes_por_etapa = {}
+        self.pipeline_vtas.reporte = []
+        self._registrar_memoria("ventas_recibidas", df_vtas)
+        self.df_prec_copy = self._compactar(
+            utils.aplicar_esquema(
+                df_precios, cnf_ingesta.get("precios", {}).get("esquema")
+            )
+        )
+        self.df_vtas_copy = self._compactar(
+            utils.aplicar_esquema(
+                df_vtas, cnf_ingesta.get("ventas", {}).get("esquema")
+            )
+        )
+        self._registrar_memoria("ventas_compactadas", self.df_vtas_copy)
+
+        self._procesar_datos()
+        self._procesar_dfs_vtas_y_precios(particiones_vtas)
+
+        self._registrar_memoria("catalogo", self.df_prec_vtas_procesado)
+        if cache_catalogo is not None and clave_catalogo is not None:
+            cache_catalogo.guardar(clave_catalogo, self.df_prec_vtas_procesado)
+        return "reconstruido"
+
+    def _compactar(self, df: DataFrame) -> DataFrame:
+        """
+        Etapa de compactación (ver `utils.compactar_dataframe`). Los lectores de la
+        aplicación ya la aplican, así que aquí solo actúa sobre DataFrames sin compactar.
+        """
+        cnf_compactacion = self.config.get("cnf_ingesta", {}).get("compactacion", {})
+        if not cnf_compactacion.get("habilitado", False):
+            return df
+        return utils.compactar_dataframe(
+            df,
+            umbral_categoria=cnf_compactacion.get("umbral_categoria", 0.5),
+            excluir=cnf_compactacion.get("excluir"),
+        )
+
+    def _registrar_memoria(self, etapa: str, df: Optional[DataFrame]) -> None:
+        """Registra en `bytes_por_etapa` (y en el log) la memoria del DataFrame de una etapa."""
+        cnf_compactacion = self.config.get("cnf_ingesta", {}).get("compactacion", {})
+        if df is None or not cnf_compactacion.get("reportar_memoria", False):
+            return
+        self.bytes_por_etapa[etapa] = utils.memoria_dataframe(df)
+        logger.info(f"Memoria etapa '{etapa}': {self.bytes_por_etapa[etapa] / 1024**2:.2f} MB")
+
+    def _obtener_cache_catalogo(self) -> Optional[CacheSnapshots]:
+        """Retorna el cache en disco del catálogo procesado, o None si está deshabilitado."""
+        cnf_catalogo = self.config.get("cnf_ingesta", {}).get("catalogo", {})
+        if not cnf_catalogo.get("habilitado", False):
+            return None
+        return CacheSnapshots(cnf_catalogo["directorio"], max_mb=cnf_catalogo.get("max_mb"))
+
+    def clave_catalogo(self, digests_insumos: Dict[str, List[str]]) -> Optional[str]:
+        """
+        Clave del catálogo procesado para un conjunto de archivos de insumo.
+
+        Depende de los identificadores de los archivos y de la configuración de ingesta.
+        Con digests de contenido, la aplicación y el precalentamiento por línea de comandos
+        llegan a la misma clave; con huellas de carga sirve como clave dentro de la sesión.
+
+        Args:
+            digests_insumos (Dict[str, List[str]]): Digests (o huellas) de "precios" y "ventas".
+
+        Returns:
+            Optional[str]: Clave, o None si falta el identificador de algún archivo.
+        """
+        digests_precios = list(digests_insumos.get("precios") or [])
+        digests_ventas = list(digests_insumos.get("ventas") or [])
+        if (
+            not digests_precios
+            or not digests_ventas
+            or None in digests_precios + digests_ventas
+        ):
+            return None
+
+        cnf_ingesta = self.config.get("cnf_ingesta", {})
+        return construir_clave_snapshot(
+            "catalogo",
+            version=VERSION_CATALOGO,
+            precios=digests_precios,
+            ventas=digests_ventas,
+            cnf_precios=cnf_ingesta.get("precios"),
+            cnf_ventas=cnf_ingesta.get("ventas"),
+            cnf_compactacion=cnf_ingesta.get("compactacion"),
+            cnf_pipeline=self.config.get("cnf_pipeline"),
+        )
+
+    def _contexto_pipeline(self) -> dict:
+        """Insumos disponibles para las etapas `unir` del pipeline y sus índices."""
+        return {"precios": self.df_prec_copy, "indices": self._indices_unir()}
+
+    def _indices_unir(self) -> Dict[str, DataFrame]:
+        """
+        Índices de las etapas `unir` (ver `pipeline_service.construir_indice_unir`).
+
+        Se conservan en session_state mientras no cambie el archivo de precios ni la
+        configuración de esas etapas: un rerun con otras ventas reutiliza el índice de
+        precios ya construido. El diccionario se llena al ejecutar el pipeline.
+
+        Returns:
+            Dict[str, DataFrame]: Índices por nombre de etapa.
+        """
+        ids_precios = list(self.ids_insumos.get("precios") or [])
+        if not ids_precios or None in ids_precios:
+            return {}
+        cnf_ingesta = self.config.get("cnf_ingesta", {})
+        clave = construir_clave_snapshot(
+            "indices_unir",
+            precios=ids_precios,
+            etapas=[e for e in self.pipeline_vtas.etapas if e["operacion"] == "unir"],
+            cnf_precios=cnf_ingesta.get("precios"),
+            cnf_compactacion=cnf_ingesta.get("compactacion"),
+        )
+        memo = st.session_state.get("indices_unir_memo")
+        if memo is not None and memo["clave"] == clave:
+            return memo["indices"]
+        indices = {}
+        set_key_ss_st("indices_unir_memo", {"clave": clave, "indices": indices})
+        return indices
+
+    def _clave_estado_agregacion(self, huellas: Tuple[str, ...]) -> str:
+        """Clave en disco del estado agregado de un conjunto ordenado de archivos."""
+        previas, agregacion, _ = self.pipeline_vtas.dividir()
+        cnf_ventas = self.config.get("cnf_ingesta", {}).get("ventas", {})
+        return construir_clave_snapshot(
+            "agregado_vtas",
+            version=VERSION_ESTADO,
+            huellas=huellas,
+            etapas=previas + [agregacion],
+            esquema=cnf_ventas.get("esquema"),
+            compactacion=self.config.get("cnf_ingesta", {}).get("compactacion"),
+        )
+
+    def _obtener_agregado_vtas(
+        self,
+        particiones_vtas: Optional[Sequence[Tuple[str, int]]],
+        previas: List[dict],
+        agregacion: dict,
+    ) -> DataFrame:
+        """
+        Retorna el promedio por grupo de las ventas, incorporando solo los archivos nuevos.
+
+        El estado (sumas y conteos por grupo) se conserva en session_state y, si está
+        habilitado, en disco. Cuando los archivos actuales extienden a los ya agregados,
+        las etapas previas a la agregación se ejecutan solo sobre las filas de los
+        archivos agregados al final.
+
+        Args:
+            particiones_vtas (Sequence[Tuple[str, int]], opcional): Huella y filas por archivo.
+            previas (list[dict]): Etapas del pipeline previas a la agregación.
+            agregacion (dict): Etapa `agregar_media` del pipeline.
+
+        Returns:
+            DataFrame: Llaves de agrupación con las columnas de valor promediadas.
+        """
+        estado = nuevo_estado_agregacion(agregacion, self.pipeline_vtas.motor)
+        huellas = tuple(h for h, _ in particiones_vtas or ())
+        especificacion = self._clave_estado_agregacion(())
+        cnf_agregacion = self.config.get("cnf_ingesta", {}).get("agregacion", {})
+        cache = (
+            CacheSnapshots(cnf_agregacion["directorio"], max_mb=cnf_agregacion.get("max_mb"))
+            if huellas and cnf_agregacion.get("persistir", False)
+            else None
+        )
+
+        previo = st.session_state.get("estado_agregacion_vtas")
+        if (
+            huellas
+            and previo is not None
+            and previo["especificacion"] == especificacion
+            and previo["estado"].huellas == huellas[: len(previo["estado"].huellas)]
+        ):
+            estado = previo["estado"]
+        elif cache is not None:
+            # Mayor prefijo de archivos ya agregado en una sesión anterior
+            for n in range(len(huellas), 0, -1):
+                if estado.cargar(cache, self._clave_estado_agregacion(huellas[:n]), huellas[:n]):
+                    break
+
+        n_agregados = len(estado.huellas)
+        if not huellas or n_agregados < len(huellas):
+            desde = sum(filas for _, filas in (particiones_vtas or ())[:n_agregados])
+            df_lote = self.pipeline_vtas.ejecutar(
+                self.df_vtas_copy.iloc[desde:], previas, self._contexto_pipeline()
+            )
+            inicio = time.perf_counter()
+            estado.incorporar(df_lote, huellas[n_agregados:])
+            df_agregado = estado.medias()
+            self.pipeline_vtas.registrar(
+                agregacion, time.perf_counter() - inicio, len(df_lote), len(df_agregado)
+            )
+            if cache is not None:
+                estado.guardar(cache, self._clave_estado_agregacion(huellas))
+        else:
+            logger.info("Agregado de ventas reutilizado, sin archivos nuevos.")
+            df_agregado = estado.medias()
+
+        if huellas:
+            set_key_ss_st(
+                "estado_agregacion_vtas", {"especificacion": especificacion, "estado": estado}
+            )
+        self.estado_agregacion = estado
+        return df_agregado
+
+    def _procesar_dfs_vtas_y_precios(
+        self, particiones_vtas: Optional[Sequence[Tuple[str, int]]] = None
+    ):
+        """
+        Ejecuta sobre las ventas el pipeline declarado en `cnf_pipeline.ventas`.
+
+        Las etapas previas a la agregación y la agregación misma se resuelven de forma
+        incremental por archivo (ver `_obtener_agregado_vtas`); las posteriores (tipos,
+        cruce con precios, nombres y llave) se ejecutan sobre el agregado.
+        """
+        previas, agregacion, posteriores = self.pipeline_vtas.dividir()
+        if agregacion is None:
+            self.df_prec_vtas_procesado = self.pipeline_vtas.ejecutar(
+                self.df_vtas_copy, previas, self._contexto_pipeline()
+            )
+            return
+
+        df_agregado = self._obtener_agregado_vtas(particiones_vtas, previas, agregacion)
+        self._registrar_memoria("ventas_agregadas", df_agregado)
+        self.df_prec_vtas_procesado = self.pipeline_vtas.ejecutar(
+            df_agregado, posteriores, self._contexto_pipeline()
         )
 
     def _procesar_datos(self):
@@ -147,6 +409,185 @@ class GestorDatos:
             separador=" : ",
         )
 
+    def historial_demanda(self) -> Optional[HistorialDemanda]:
+        """
+        Unidades mensuales vendidas por material (ver `montecarlo_service.HistorialDemanda`).
+
+        Las ventas pasan por las mismas etapas de `cnf_pipeline.ventas` previas a la
+        agregación (filtros y rellenos) y por los renombres y la llave del material, pero
+        sin promediar. El historial se conserva en session_state mientras no cambien los
+        archivos de ventas ni el pipeline.
+
+        Returns:
+            Optional[HistorialDemanda]: Historial, o None si no hay ventas cargadas.
+        """
+        if self.df_vtas_recibidas is None or self.df_vtas_recibidas.empty:
+            return None
+        cnf_pipeline = self.config.get("cnf_pipeline", {})
+        cnf_ingesta = self.config.get("cnf_ingesta", {})
+        columna_unidades = self.config["df_insumo"]["dict_cols"]["Promedio Mes Und"]
+
+        # Etapas por filas: las previas a la agregación y, de las posteriores, las que
+        # solo renombran o arman la llave.
+        declaradas = self.pipeline_vtas.etapas_declaradas
+        operaciones = [e["operacion"] for e in declaradas]
+        corte = (
+            operaciones.index(OPERACION_AGREGACION)
+            if OPERACION_AGREGACION in operaciones
+            else len(declaradas)
+        )
+        etapas = declaradas[:corte] + [
+            e for e in declaradas[corte + 1 :] if e["operacion"] in ("renombrar", "concatenar")
+        ]
+        etapas.append(
+            {
+                "nombre": "historial_demanda",
+                "operacion": "seleccionar",
+                "columnas": ["concat_plu_producto", columna_unidades],
+            }
+        )
+
+        ids_ventas = list(self.ids_insumos.get("ventas") or [])
+        clave = None
+        if ids_ventas and None not in ids_ventas:
+            clave = construir_clave_snapshot(
+                "historial_demanda",
+                ventas=ids_ventas,
+                etapas=etapas,
+                esquema=cnf_ingesta.get("ventas", {}).get("esquema"),
+            )
+            memo = st.session_state.get("historial_demanda_memo")
+            if memo is not None and memo["clave"] == clave:
+                return memo["historial"]
+
+        pipeline = PipelineDatos(
+            etapas,
+            optimizar=cnf_pipeline.get("optimizar", True),
+            motor=cnf_pipeline.get("motor"),
+        )
+        df_vtas = utils.aplicar_esquema(
+            self.df_vtas_recibidas, cnf_ingesta.get("ventas", {}).get("esquema")
+        )
+        historial = HistorialDemanda(
+            pipeline.ejecutar(df_vtas),
+            llave="concat_plu_producto",
+            columna_unidades=columna_unidades,
+        )
+        if clave is not None:
+            set_key_ss_st("historial_demanda_memo", {"clave": clave, "historial": historial})
+        return historial
+
+    def _estado_agregacion(self) -> Optional[EstadoAgregacion]:
+        """
+        Estado de la agregación de ventas de los archivos actuales.
+
+        Si el catálogo se calculó en esta ejecución es el mismo estado; si se reutilizó
+        (de la sesión, de otra sesión o del disco) se toma de session_state o se vuelve a
+        obtener con `_obtener_agregado_vtas`, que lo lee del disco si está persistido.
+
+        Returns:
+            Optional[EstadoAgregacion]: Estado, o None si el pipeline no agrega las ventas.
+        """
+        if self.estado_agregacion is not None:
+            return self.estado_agregacion
+        previas, agregacion, _ = self.pipeline_vtas.dividir()
+        if agregacion is None:
+            return None
+        huellas = tuple(h for h, _ in self.particiones_vtas or ())
+        previo = st.session_state.get("estado_agregacion_vtas")
+        if (
+            huellas
+            and previo is not None
+            and previo["especificacion"] == self._clave_estado_agregacion(())
+            and previo["estado"].huellas == huellas
+        ):
+            self.estado_agregacion = previo["estado"]
+            return self.estado_agregacion
+
+        if self.df_vtas_copy is None:
+            self.df_vtas_copy = self._compactar(
+                utils.aplicar_esquema(
+                    self.df_vtas_recibidas,
+                    self.config.get("cnf_ingesta", {}).get("ventas", {}).get("esquema"),
+                )
+            )
+        self._obtener_agregado_vtas(self.particiones_vtas, previas, agregacion)
+        return self.estado_agregacion
+
+    def perfiles_estacionales(self) -> Optional[PerfilesEstacionales]:
+        """
+        Índices estacionales por material y mes (ver
+        `estacionalidad_service.PerfilesEstacionales`), si están habilitados en
+        `cnf_estacionalidad`.
+
+        Se construyen la primera vez que se piden, con las sumas por grupo y mes de la
+        agregación de ventas (una fila por grupo y mes, no por venta), a las que se
+        aplican los renombres y la llave del material del pipeline. Se conservan en
+        session_state mientras no cambien los archivos de ventas ni el pipeline.
+
+        Returns:
+            Optional[PerfilesEstacionales]: Perfiles, o None si están deshabilitados, no
+            hay ventas cargadas o la agregación no separa las sumas por mes.
+        """
+        cnf = self.config.get("cnf_estacionalidad", {})
+        if not cnf.get("habilitado", False):
+            return None
+        if self.df_vtas_recibidas is None or self.df_vtas_recibidas.empty:
+            return None
+        if self.perfiles is not None:
+            return self.perfiles
+        _, agregacion, posteriores = self.pipeline_vtas.dividir()
+        if agregacion is None or not agregacion.get("columna_periodo"):
+            logger.warning(
+                "Perfiles estacionales deshabilitados: la etapa agregar_media no define "
+                "columna_periodo."
+            )
+            return None
+
+        columna_grupo = cnf.get("columna_grupo", "Subcategoría")
+        columna_unidades = cnf.get("columna_unidades", "Ventas_Un")
+        minimo_observaciones = cnf.get("minimo_observaciones", 2)
+        ids_ventas = list(self.ids_insumos.get("ventas") or [])
+        clave = None
+        if ids_ventas and None not in ids_ventas:
+            clave = construir_clave_snapshot(
+                "perfiles_estacionales",
+                ventas=ids_ventas,
+                etapas=self.pipeline_vtas.etapas_declaradas,
+                esquema=self.config.get("cnf_ingesta", {}).get("ventas", {}).get("esquema"),
+                cnf_estacionalidad=cnf,
+            )
+            memo = st.session_state.get("perfiles_estacionales_memo")
+            if memo is not None and memo["clave"] == clave:
+                self.perfiles = memo["perfiles"]
+                return self.perfiles
+
+        estado = self._estado_agregacion()
+        # Llave del material con los mismos renombres y concatenación del catálogo
+        etapas_llave = [
+            e for e in posteriores if e["operacion"] in ("renombrar", "concatenar")
+        ]
+        df_periodos = PipelineDatos(etapas_llave, optimizar=False).ejecutar(
+            estado.por_periodo()
+        )
+        # Cada grupo de la agregación (una fila del catálogo) es un material
+        columnas_llave = list(agregacion["columnas_grupo"])
+        for etapa in etapas_llave:
+            if etapa["operacion"] == "renombrar":
+                columnas_llave = [etapa["columnas"].get(c, c) for c in columnas_llave]
+        self.perfiles = PerfilesEstacionales(
+            df_periodos,
+            columnas_llave=columnas_llave,
+            columna_grupo=columna_grupo,
+            columna_periodo=agregacion["columna_periodo"],
+            columna_suma=columna_unidades + SUFIJO_SUMA,
+            columna_conteo=columna_unidades + SUFIJO_CONTEO,
+            minimo_observaciones=minimo_observaciones,
+        )
+        if clave is not None:
+            set_key_ss_st("perfiles_estacionales_memo", {"clave": clave, "perfiles": self.perfiles})
+        return self.perfiles
+
     def validar_rango(self, texto_rango: str):
         """Valida y extrae rango numérico de un texto
 
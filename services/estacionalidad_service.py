@@ -0,0 +1,139 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+
+MESES = 12
+# Nivel del que proviene el índice de cada material y mes
+NIVEL_MATERIAL = 0
+NIVEL_GRUPO = 1
+NIVEL_SIN_PERFIL = 2
+
+
+def _por_mes(codigos: np.ndarray, meses: np.ndarray, valores: np.ndarray, n_codigos: int):
+    """Suma de `valores` por código y mes, de forma (código, mes)."""
+    celdas = codigos * MESES + meses
+    return np.bincount(celdas, valores, minlength=n_codigos * MESES).reshape(n_codigos, MESES)
+
+
+def _llaves(df: pd.DataFrame, columnas: List[str]) -> pd.MultiIndex:
+    """Llave de cada fila de `df` (sus `columnas` como texto)."""
+    return pd.MultiIndex.from_frame(df[columnas].astype(str))
+
+
+class PerfilesEstacionales:
+    """
+    Índice estacional de la demanda de cada material en cada mes del año, guardado en una
+    matriz material x mes.
+
+    Se calcula con las sumas y conteos de unidades por grupo y mes de la agregación de
+    ventas (ver `EstadoAgregacion.por_periodo`), sin volver a recorrer las filas. El
+    índice de un material en un mes es su promedio de unidades en ese mes dividido por su
+    promedio mensual (el mismo "Promedio Mes Und" plano del catálogo). Si el material
+    tiene menos de `minimo_observaciones` en un mes se usa el índice de su grupo
+    (subcategoría), el promedio en ese mes de las observaciones de sus materiales
+    divididas por el promedio de cada uno, y si tampoco alcanza, 1 (sin ajuste).
+
+    Un material es un grupo de la agregación (todas sus `columnas_grupo`, con los
+    renombres del pipeline), el mismo que da una fila del catálogo: dos grupos con la
+    misma "concat_plu_producto" (p. ej. el mismo PLU en dos marcas) tienen perfiles
+    distintos.
+
+    La consulta de un evento es una búsqueda del material en un índice hash y una
+    lectura de la matriz en el mes de su fecha de inicio, sin reagrupar las ventas.
+    """
+
+    def __init__(
+        self,
+        df_periodos: pd.DataFrame,
+        columnas_llave: List[str],
+        columna_grupo: str,
+        columna_periodo: str,
+        columna_suma: str,
+        columna_conteo: str,
+        minimo_observaciones: int = 2,
+    ):
+        """
+        Args:
+            df_periodos (pd.DataFrame): Sumas y conteos de unidades por grupo de ventas y
+                mes.
+            columnas_llave (list[str]): Columnas que identifican el material (las
+                columnas de grupo de la agregación).
+            columna_grupo (str): Columna del grupo de respaldo (p. ej. "Subcategoría").
+            columna_periodo (str): Columna con el número de mes (1 a 12).
+            columna_suma (str): Suma de unidades del grupo en el mes.
+            columna_conteo (str): Observaciones (filas de ventas) del grupo en el mes.
+            minimo_observaciones (int): Observaciones mínimas de un material (o grupo)
+                en un mes para usar su propio índice.
+        """
+        meses = df_periodos[columna_periodo].to_numpy(np.int64) - 1
+        validas = (meses >= 0) & (meses < MESES)
+        meses = meses[validas]
+        codigos, materiales = pd.factorize(
+            _llaves(df_periodos, columnas_llave)[validas], sort=True
+        )
+        codigos_grupo, grupos = pd.factorize(
+            df_periodos[columna_grupo].astype(str).to_numpy()[validas]
+        )
+        suma = df_periodos[columna_suma].to_numpy(np.float64)[validas]
+        conteo = df_periodos[columna_conteo].to_numpy(np.float64)[validas]
+        n_materiales = len(materiales)
+
+        # Promedio mensual de cada material
+        media = np.bincount(codigos, suma, minlength=n_materiales) / np.maximum(
+            np.bincount(codigos, conteo, minlength=n_materiales), 1
+        )
+        # Suma de las observaciones divididas por el promedio de su material
+        razon = np.divide(
+            suma, media[codigos], out=np.zeros_like(suma), where=media[codigos] > 0
+        )
+
+        observaciones = _por_mes(codigos, meses, conteo, n_materiales)
+        observaciones_grupo = _por_mes(codigos_grupo, meses, conteo, len(grupos))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            indices = _por_mes(codigos, meses, razon, n_materiales) / observaciones
+            indices_grupo = (
+                _por_mes(codigos_grupo, meses, razon, len(grupos)) / observaciones_grupo
+            )
+        # Grupo de cada material: el de su primera fila
+        grupo_material = np.zeros(n_materiales, dtype=np.int64)
+        grupo_material[codigos[::-1]] = codigos_grupo[::-1]
+
+        propio = observaciones >= minimo_observaciones
+        del_grupo = ~propio & (observaciones_grupo[grupo_material] >= minimo_observaciones)
+        self.indices = np.where(
+            propio, indices, np.where(del_grupo, indices_grupo[grupo_material], 1.0)
+        )
+        self.nivel = np.where(
+            propio, NIVEL_MATERIAL, np.where(del_grupo, NIVEL_GRUPO, NIVEL_SIN_PERFIL)
+        ).astype(np.int8)
+        self.columnas_llave = list(columnas_llave)
+        self.materiales = materiales
+        logger.info(
+            f"Perfiles estacionales: {n_materiales} materiales x {MESES} meses; "
+            f"{int(propio.sum())} celdas con perfil propio, {int(del_grupo.sum())} "
+            f"con el de su {columna_grupo} y {int((self.nivel == NIVEL_SIN_PERFIL).sum())} "
+            f"sin ajuste."
+        )
+
+    def indice(self, df_llaves: pd.DataFrame, fechas: np.ndarray) -> np.ndarray:
+        """
+        Índice estacional de cada material en el mes de su fecha (1 si el material no
+        está en la base de ventas).
+
+        Args:
+            df_llaves (pd.DataFrame): Eventos con las `columnas_llave` del material.
+            fechas (np.ndarray): Fechas datetime64 de los eventos.
+
+        Returns:
+            np.ndarray: Índices (float64).
+        """
+        if len(self.materiales) == 0:
+            return np.ones(len(df_llaves))
+        posiciones = self.materiales.get_indexer(_llaves(df_llaves, self.columnas_llave))
+        return np.where(
+            posiciones >= 0, self.indices[posiciones, utils.numero_mes(fechas)], 1.0
+        )
@@ -0,0 +1,167 @@
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from services.sensibilidad_service import MEDIDA_COSTO, MEDIDA_VENTA
+
+PERCENTILES = (10, 50, 90)
+
+
+class HistorialDemanda:
+    """
+    Unidades mensuales de la base de ventas por material: las mismas observaciones que
+    promedia el pipeline para obtener "Promedio Mes Und", guardadas en un arreglo
+    contiguo ordenado por material, con el desplazamiento y el número de observaciones
+    de cada uno, para muestrear la demanda de muchos materiales a la vez.
+    """
+
+    def __init__(self, df_ventas: pd.DataFrame, llave: str, columna_unidades: str):
+        """
+        Args:
+            df_ventas (pd.DataFrame): Ventas fila a fila (una por grupo y mes), ya
+                filtradas y con la llave del material.
+            llave (str): Columna que identifica el material (p. ej. "concat_plu_producto").
+            columna_unidades (str): Columna de unidades vendidas en el mes.
+        """
+        llaves = df_ventas[llave].astype(str).to_numpy()
+        orden = np.argsort(llaves, kind="stable")
+        llaves = llaves[orden]
+        inicio_material = np.flatnonzero(np.r_[True, llaves[1:] != llaves[:-1]])
+        if len(llaves) == 0:
+            inicio_material = inicio_material[:0]
+        self.materiales = pd.Index(llaves[inicio_material])
+        self.desplazamientos = inicio_material
+        self.observaciones = np.diff(np.r_[inicio_material, len(llaves)])
+        self.unidades = df_ventas[columna_unidades].to_numpy(np.float64)[orden]
+        logger.info(
+            f"Historial de demanda: {len(self.materiales)} materiales, "
+            f"{len(self.unidades)} observaciones mensuales."
+        )
+
+    def ubicar(self, llaves: Sequence[str]) -> tuple:
+        """
+        Desplazamiento y número de observaciones de cada material (0 si no tiene
+        historia).
+
+        Args:
+            llaves (Sequence[str]): Llaves de los materiales.
+
+        Returns:
+            tuple: Arreglos (desplazamientos, observaciones).
+        """
+        posiciones = self.materiales.get_indexer(pd.Index(llaves).astype(str))
+        if len(self.materiales) == 0:
+            ceros = np.zeros(len(posiciones), dtype=np.int64)
+            return ceros, ceros
+        encontrados = posiciones >= 0
+        desplazamientos = np.where(encontrados, self.desplazamientos[posiciones], 0)
+        observaciones = np.where(encontrados, self.observaciones[posiciones], 0)
+        return desplazamientos, observaciones
+
+
+class SimulacionMonteCarlo:
+    """
+    Simulación estocástica de la demanda de los materiales registrados.
+
+    En cada simulación el promedio mensual de unidades de cada material se reemplaza por
+    una observación mensual tomada al azar de su historia de ventas (remuestreo), de modo
+    que el valor esperado es el mismo promedio del catálogo; con ese valor se calcula
+    la venta y el costo del descuento con el mismo núcleo que el cálculo determinístico
+    (`utils.calcular_simulacion`). Los materiales sin historia conservan su promedio.
+
+    Si los eventos traen "Índice estacional" (promedio ajustado al mes del evento), cada
+    observación se multiplica por ese índice, de modo que el valor esperado es el
+    promedio ajustado y no el plano.
+
+    Las simulaciones se generan por bloques de materiales para acotar la memoria; de cada
+    bloque se guardan solo los percentiles por material y la suma por simulación, con la
+    que se obtienen los percentiles del total.
+    """
+
+    def __init__(
+        self,
+        df_eventos: pd.DataFrame,
+        historial: HistorialDemanda,
+        dict_cols: dict,
+        porcentaje_crecimiento: float,
+        n_simulaciones: int = 10000,
+        semilla: Optional[int] = None,
+        max_celdas_bloque: int = 2_000_000,
+    ):
+        """
+        Args:
+            df_eventos (pd.DataFrame): Materiales registrados ya cruzados con el
+                catálogo (una fila por evento y producto), con "concat_plu_producto",
+                fechas, rango, promedio y precio.
+            historial (HistorialDemanda): Historia de ventas por material.
+            dict_cols (dict): Dict de columnas necesarias.
+            porcentaje_crecimiento (float): Porcentaje de crecimiento para unidades.
+            n_simulaciones (int): Simulaciones por material.
+            semilla (int, opcional): Semilla del generador, para resultados reproducibles.
+            max_celdas_bloque (int): Máximo de celdas material x simulación por bloque.
+        """
+        arreglos = utils.arreglos_simulacion(df_eventos, dict_cols)
+        desplazamientos, observaciones = historial.ubicar(df_eventos["concat_plu_producto"])
+        indice_estacional = (
+            df_eventos[utils.COLUMNA_INDICE_ESTACIONAL].to_numpy(np.float64)
+            if utils.COLUMNA_INDICE_ESTACIONAL in df_eventos.columns
+            else None
+        )
+        generador = np.random.default_rng(semilla)
+        n_materiales = len(df_eventos)
+        bloque = max(1, max_celdas_bloque // max(n_simulaciones, 1))
+
+        medidas = (MEDIDA_VENTA, MEDIDA_COSTO)
+        percentiles = {m: np.empty((len(PERCENTILES), n_materiales)) for m in medidas}
+        totales = {m: np.zeros(n_simulaciones, dtype=np.int64) for m in medidas}
+        for inicio in range(0, n_materiales, bloque):
+            fin = min(inicio + bloque, n_materiales)
+            columna = {c: v[inicio:fin, np.newaxis] for c, v in arreglos.items()}
+            # Observación de la historia de cada material en cada simulación
+            sorteo = generador.random((fin - inicio, n_simulaciones))
+            sorteo *= observaciones[inicio:fin, np.newaxis]
+            indices = sorteo.astype(np.int64)
+            indices += desplazamientos[inicio:fin, np.newaxis]
+            sin_historia = observaciones[inicio:fin] == 0
+            if sin_historia.all():
+                promedio = np.repeat(columna["promedio_mes_und"], n_simulaciones, axis=1)
+            else:
+                promedio = historial.unidades[indices]
+                if indice_estacional is not None:
+                    promedio *= indice_estacional[inicio:fin, np.newaxis]
+                promedio[sin_historia] = columna["promedio_mes_und"][sin_historia]
+            columna["promedio_mes_und"] = promedio
+
+            resultado = utils.calcular_simulacion(
+                **columna, porcentaje_crecimiento=porcentaje_crecimiento
+            )
+            for medida, valores in (
+                (MEDIDA_VENTA, resultado["venta"]),
+                (MEDIDA_COSTO, resultado["costo_descuento"]),
+            ):
+                percentiles[medida][:, inicio:fin] = np.percentile(
+                    valores, PERCENTILES, axis=1
+                )
+                totales[medida] += valores.sum(axis=0)
+
+        self.n_simulaciones = n_simulaciones
+        self.sin_historia = int((observaciones == 0).sum())
+        self.por_evento = pd.DataFrame(
+            {
+                f"{medida} P{p}": percentiles[medida][i]
+                for medida in medidas
+                for i, p in enumerate(PERCENTILES)
+            },
+            index=df_eventos.index,
+        )
+        self.totales = pd.DataFrame(
+            {medida: np.percentile(totales[medida], PERCENTILES) for medida in totales},
+            index=pd.Index([f"P{p}" for p in PERCENTILES], name="Percentil"),
+        )
+        logger.info(
+            f"Simulación Monte Carlo: {n_materiales} materiales x {n_simulaciones} "
+            f"simulaciones en bloques de {bloque} materiales."
+        )
@@ -0,0 +1,287 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import ui_components.utils as utils
+
+# Columna auxiliar con la posición de cada fila, para devolver las uniones en el orden
+# de entrada cuando el motor no lo conserva.
+_COLUMNA_FILA = "__fila"
+
+
+def _restaurar_tipos(resultado: pd.DataFrame, tipos: Dict[str, object]) -> pd.DataFrame:
+    """
+    Devuelve a las columnas de un resultado los tipos de pandas de origen (p. ej. las
+    mismas categorías), para que cualquier motor entregue exactamente el mismo DataFrame.
+    """
+
+    def restaurar(serie: pd.Series, tipo) -> pd.Series:
+        # Dos categóricas con las mismas categorías en otro orden son del "mismo" tipo
+        # para pandas pero no idénticas: se reordenan las categorías.
+        if isinstance(tipo, pd.CategoricalDtype) and isinstance(serie.dtype, pd.CategoricalDtype):
+            return serie.cat.set_categories(tipo.categories, ordered=tipo.ordered)
+        return serie.astype(tipo)
+
+    return utils.asignar_columnas(
+        resultado,
+        {
+            c: restaurar(resultado[c], tipo)
+            for c, tipo in tipos.items()
+            if c in resultado.columns
+            and (resultado[c].dtype != tipo or isinstance(tipo, pd.CategoricalDtype))
+        },
+    )
+
+
+class MotorDatos:
+    """
+    Motor de cálculo de las etapas pesadas del pipeline: filtros, agrupaciones y uniones.
+
+    Todos los motores reciben y entregan DataFrames de pandas con el mismo contenido,
+    tipos y orden de filas; solo cambia dónde se ejecuta el cálculo. Esta clase es el
+    motor de pandas y la base de los demás.
+    """
+
+    nombre = "pandas"
+
+    def mascara(self, df: pd.DataFrame, filtros: List[dict]) -> np.ndarray:
+        """
+        Máscara de las filas que cumplen todos los predicados.
+
+        Args:
+            df (pd.DataFrame): DataFrame a evaluar.
+            filtros (list[dict]): Predicados con claves `columna`, `valores` e `incluir`.
+
+        Returns:
+            np.ndarray: Máscara booleana.
+        """
+        return utils.mascara_filtros(df, filtros)
+
+    def filtrar(
+        self, df: pd.DataFrame, filtros: Optional[List[dict]], columnas: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Aplica predicados y proyección de columnas en un solo recorte (ver
+        `utils.aplicar_filtros`).
+
+        Args:
+            df (pd.DataFrame): DataFrame a filtrar.
+            filtros (list[dict], opcional): Predicados.
+            columnas (list[str], opcional): Columnas a conservar.
+
+        Returns:
+            pd.DataFrame: DataFrame filtrado.
+        """
+        return utils.aplicar_filtros(df, filtros, columnas=columnas, evaluar=self.mascara)
+
+    def agrupar(
+        self,
+        df: pd.DataFrame,
+        columnas_grupo: List[str],
+        agregaciones: Dict[str, Tuple[str, str]],
+    ) -> pd.DataFrame:
+        """
+        Agrupa sin ordenar los grupos y descarta las llaves nulas, como
+        `groupby(columnas_grupo, observed=True, sort=False)`.
+
+        Args:
+            df (pd.DataFrame): DataFrame a agrupar.
+            columnas_grupo (list[str]): Llaves de agrupación.
+            agregaciones (dict): Columna de salida -> (columna, "sum" o "count").
+
+        Returns:
+            pd.DataFrame: Llaves y columnas agregadas. El orden de los grupos no está
+            garantizado entre motores.
+        """
+        return (
+            df.groupby(columnas_grupo, observed=True, sort=False)
+            .agg(**agregaciones)
+            .reset_index()
+        )
+
+    def buscar(self, df: pd.DataFrame, indice: pd.DataFrame, llaves: List[str]) -> pd.DataFrame:
+        """
+        Left join contra una tabla de llave única (ver `utils.buscar_en_indice`).
+
+        Args:
+            df (pd.DataFrame): DataFrame base.
+            indice (pd.DataFrame): Tabla de `utils.construir_indice_unico`.
+            llaves (list[str]): Columnas de `df` que forman la llave.
+
+        Returns:
+            pd.DataFrame: `df` con las columnas del índice agregadas, en el mismo orden.
+        """
+        return utils.buscar_en_indice(df, indice, llaves)
+
+
+class MotorArrow(MotorDatos):
+    """
+    Motor sobre pyarrow.compute. Las agrupaciones y uniones se ejecutan en el motor de
+    consultas de Arrow (Acero), que reparte el trabajo entre los núcleos disponibles.
+    """
+
+    nombre = "pyarrow"
+
+    def mascara(self, df: pd.DataFrame, filtros: List[dict]) -> np.ndarray:
+        mascara = np.ones(len(df), dtype=bool)
+        for filtro in filtros:
+            valores = filtro["valores"]
+            if isinstance(valores, (str, int)):
+                valores = [valores]
+            coincide = pc.is_in(
+                pa.array(df[filtro["columna"]]), value_set=pa.array(valores)
+            ).to_numpy(zero_copy_only=False)
+            mascara &= coincide if filtro.get("incluir", True) else ~coincide
+        return mascara
+
+    def agrupar(
+        self,
+        df: pd.DataFrame,
+        columnas_grupo: List[str],
+        agregaciones: Dict[str, Tuple[str, str]],
+    ) -> pd.DataFrame:
+        columnas_valor = list(dict.fromkeys(c for c, _ in agregaciones.values()))
+        # pandas descarta los grupos con alguna llave nula; Arrow los conserva.
+        df = df.loc[df[columnas_grupo].notna().all(axis=1).to_numpy(), columnas_grupo + columnas_valor]
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        # min_count=0: la suma de un grupo sin valores es 0, como en pandas.
+        agregado = tabla.group_by(columnas_grupo, use_threads=True).aggregate(
+            [
+                (columna, "sum", pc.ScalarAggregateOptions(min_count=0))
+                if funcion == "sum"
+                else (columna, funcion)
+                for columna, funcion in agregaciones.values()
+            ]
+        )
+        nombres = {f"{c}_{f}": destino for destino, (c, f) in agregaciones.items()}
+        resultado = agregado.to_pandas().rename(columns=nombres)[
+            columnas_grupo + list(agregaciones)
+        ]
+        return _restaurar_tipos(resultado, {c: df[c].dtype for c in columnas_grupo})
+
+    def buscar(self, df: pd.DataFrame, indice: pd.DataFrame, llaves: List[str]) -> pd.DataFrame:
+        # Las llaves se unen como texto: Arrow no une columnas diccionario de origen distinto.
+        izquierda = pa.table(
+            {
+                **{c: pc.cast(pa.array(df[c]), pa.string()) for c in llaves},
+                _COLUMNA_FILA: np.arange(len(df)),
+            }
+        )
+        derecha = pa.Table.from_pandas(indice.reset_index(), preserve_index=False)
+        derecha = derecha.select(llaves + list(indice.columns))
+        for c in llaves:
+            derecha = derecha.set_column(
+                derecha.schema.get_field_index(c), c, pc.cast(derecha[c], pa.string())
+            )
+        unido = izquierda.join(derecha, keys=llaves, join_type="left outer", use_threads=True)
+        unido = unido.sort_by(_COLUMNA_FILA).select(list(indice.columns)).to_pandas()
+        encontrados = _restaurar_tipos(unido, dict(indice.dtypes)).set_axis(df.index)
+        return utils.asignar_columnas(df, {c: encontrados[c] for c in indice.columns})
+
+
+class MotorPolars(MotorDatos):
+    """
+    Motor sobre polars (dependencia opcional, no incluida en requirements.txt).
+    Agrupaciones y uniones multihilo sobre los mismos DataFrames de pandas.
+    """
+
+    nombre = "polars"
+
+    def __init__(self):
+        try:
+            import polars
+        except ImportError as e:
+            raise ImportError(
+                "El motor 'polars' requiere el paquete polars (pip install polars)."
+            ) from e
+        self.pl = polars
+
+    def mascara(self, df: pd.DataFrame, filtros: List[dict]) -> np.ndarray:
+        mascara = np.ones(len(df), dtype=bool)
+        for filtro in filtros:
+            valores = filtro["valores"]
+            if isinstance(valores, (str, int)):
+                valores = [valores]
+            serie = self.pl.from_pandas(df[filtro["columna"]])
+            if isinstance(df[filtro["columna"]].dtype, pd.CategoricalDtype):
+                serie = serie.cast(self.pl.String)
+            coincide = serie.is_in(valores).fill_null(False).to_numpy()
+            mascara &= coincide if filtro.get("incluir", True) else ~coincide
+        return mascara
+
+    def agrupar(
+        self,
+        df: pd.DataFrame,
+        columnas_grupo: List[str],
+        agregaciones: Dict[str, Tuple[str, str]],
+    ) -> pd.DataFrame:
+        pl = self.pl
+        columnas_valor = list(dict.fromkeys(c for c, _ in agregaciones.values()))
+        df = df.loc[df[columnas_grupo].notna().all(axis=1).to_numpy(), columnas_grupo + columnas_valor]
+        tabla = pl.from_pandas(df)
+        expresiones = [
+            (pl.col(c).sum() if f == "sum" else pl.col(c).count()).alias(destino)
+            for destino, (c, f) in agregaciones.items()
+        ]
+        resultado = tabla.group_by(columnas_grupo).agg(expresiones).to_pandas()
+        # polars cuenta en u32; pandas en int64.
+        tipos = {c: df[c].dtype for c in columnas_grupo}
+        tipos.update({d: np.int64 for d, (_, f) in agregaciones.items() if f == "count"})
+        return _restaurar_tipos(resultado, tipos)
+
+    def buscar(self, df: pd.DataFrame, indice: pd.DataFrame, llaves: List[str]) -> pd.DataFrame:
+        pl = self.pl
+        izquierda = pl.DataFrame(
+            {
+                **{c: df[c].astype(str).to_numpy(dtype=object) for c in llaves},
+                _COLUMNA_FILA: np.arange(len(df)),
+            }
+        )
+        derecha = indice.reset_index()
+        derecha = pl.from_pandas(
+            utils.asignar_columnas(
+                derecha,
+                {
+                    **{c: derecha[c].astype(str) for c in llaves},
+                    **{
+                        c: derecha[c].astype(object)
+                        for c in indice.columns
+                        if isinstance(derecha[c].dtype, pd.CategoricalDtype)
+                    },
+                },
+            )
+        )
+        unido = (
+            izquierda.join(derecha, on=llaves, how="left")
+            .sort(_COLUMNA_FILA)
+            .select(list(indice.columns))
+            .to_pandas()
+        )
+        encontrados = _restaurar_tipos(unido, dict(indice.dtypes)).set_axis(df.index)
+        return utils.asignar_columnas(df, {c: encontrados[c] for c in indice.columns})
+
+
+MOTORES = {motor.nombre: motor for motor in (MotorDatos, MotorArrow, MotorPolars)}
+
+
+def obtener_motor(nombre: Optional[str] = None) -> MotorDatos:
+    """
+    Crea el motor de cálculo configurado en `cnf_pipeline.motor`.
+
+    Args:
+        nombre (str, opcional): "pandas" (por defecto), "pyarrow" o "polars".
+
+    Returns:
+        MotorDatos: Motor.
+
+    Raises:
+        ValueError: Si el motor no existe.
+        ImportError: Si falta la dependencia del motor.
+    """
+    nombre = nombre or MotorDatos.nombre
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor '{nombre}' no soportado. Disponibles: {', '.join(MOTORES)}.")
+    return MOTORES[nombre]()
@@ -0,0 +1,213 @@
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from services.sensibilidad_service import MEDIDA_COSTO, MEDIDA_VENTA
+
+
+def curvas_respuesta(
+    df_procesado: pd.DataFrame,
+    dict_cols: dict,
+    descuentos: Sequence[int],
+    porcentaje_crecimiento: float,
+    elasticidad: float,
+) -> tuple:
+    """
+    Venta y costo del descuento de cada material para cada descuento permitido, en una
+    sola operación vectorizada (ver `utils.calcular_simulacion`).
+
+    El crecimiento de las unidades con un descuento `d` es `porcentaje_crecimiento +
+    elasticidad * d`: la elasticidad son los puntos de crecimiento que aporta cada punto
+    de descuento.
+
+    Args:
+        df_procesado (pd.DataFrame): Materiales registrados ya procesados.
+        dict_cols (dict): Dict de columnas necesarias.
+        descuentos (Sequence[int]): Descuentos (%) permitidos, en orden creciente.
+        porcentaje_crecimiento (float): Crecimiento base de las unidades.
+        elasticidad (float): Puntos de crecimiento por punto de descuento.
+
+    Returns:
+        tuple: Arreglos (venta, costo) de forma (descuento, material).
+    """
+    descuentos = np.asarray(descuentos, dtype=np.int64)[:, np.newaxis]
+    arreglos = utils.arreglos_simulacion(df_procesado, dict_cols)
+    arreglos["rango"] = descuentos
+    crecimiento = porcentaje_crecimiento + elasticidad * descuentos
+    resultado = utils.calcular_simulacion(**arreglos, porcentaje_crecimiento=crecimiento)
+    return resultado["venta"], resultado["costo_descuento"]
+
+
+def proyectar_plan(
+    df_procesado: pd.DataFrame,
+    dict_cols: dict,
+    porcentaje_crecimiento: float,
+    elasticidad: float,
+) -> tuple:
+    """
+    Venta y costo del descuento de cada material con su descuento registrado ("rango"),
+    con la misma respuesta al descuento que `curvas_respuesta`.
+
+    Returns:
+        tuple: Arreglos (venta, costo) por material.
+    """
+    arreglos = utils.arreglos_simulacion(df_procesado, dict_cols)
+    crecimiento = porcentaje_crecimiento + elasticidad * arreglos["rango"]
+    resultado = utils.calcular_simulacion(**arreglos, porcentaje_crecimiento=crecimiento)
+    return resultado["venta"], resultado["costo_descuento"]
+
+
+def _razon(delta_venta: np.ndarray, delta_costo: np.ndarray) -> np.ndarray:
+    """Venta adicional por peso de costo adicional (infinita si el costo no aumenta)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            delta_costo > 0, delta_venta / delta_costo.astype(np.float64), np.inf
+        )
+
+
+class OptimizadorDescuentos:
+    """
+    Elige el descuento de cada material que maximiza la venta total sin superar un
+    presupuesto de costo del descuento (problema de mochila con una opción por material).
+
+    Al construirlo se calcula, para todos los materiales a la vez, la envolvente cóncava
+    superior de su curva costo -> venta: desde el descuento mínimo, cada tramo lleva al
+    descuento con mayor venta adicional por peso de costo. Resolver un presupuesto es
+    entonces ordenar todos los tramos por esa razón y tomarlos mientras alcance el
+    presupuesto (solución voraz), sin volver a calcular las curvas.
+    """
+
+    def __init__(self, venta: np.ndarray, costo: np.ndarray, descuentos: Sequence[int]):
+        """
+        Args:
+            venta (np.ndarray): Venta por descuento y material (ver `curvas_respuesta`).
+            costo (np.ndarray): Costo del descuento por descuento y material.
+            descuentos (Sequence[int]): Descuentos (%) de las filas de las curvas.
+        """
+        self.venta = venta
+        self.costo = costo
+        self.descuentos = np.asarray(descuentos, dtype=np.int64)
+        n_descuentos, n_materiales = venta.shape
+
+        # Desde cada descuento i, el descuento mayor con la mejor razón venta adicional /
+        # costo adicional (-1 si ninguno aumenta la venta). Un avance que aumenta la
+        # venta sin aumentar el costo tiene razón infinita.
+        siguiente = np.full((n_descuentos, n_materiales), -1, dtype=np.int64)
+        for i in range(n_descuentos - 1):
+            delta_venta = venta[i + 1 :] - venta[i]
+            razon = _razon(delta_venta, costo[i + 1 :] - costo[i])
+            razon[delta_venta <= 0] = -np.inf
+            # Ante razones iguales se prefiere el descuento más lejano (un solo tramo).
+            mejor = len(razon) - 1 - np.argmax(razon[::-1], axis=0)
+            siguiente[i] = np.where(np.isneginf(razon.max(axis=0)), -1, i + 1 + mejor)
+
+        tramos = {c: [] for c in ("material", "hasta", "delta_venta", "delta_costo", "razon")}
+        actual = np.zeros(n_materiales, dtype=np.int64)
+        activos = np.arange(n_materiales)
+        while len(activos):
+            destino = siguiente[actual[activos], activos]
+            activos = activos[destino >= 0]
+            destino = destino[destino >= 0]
+            origen = actual[activos]
+            tramos["material"].append(activos)
+            tramos["hasta"].append(destino)
+            tramos["delta_venta"].append(venta[destino, activos] - venta[origen, activos])
+            tramos["delta_costo"].append(costo[destino, activos] - costo[origen, activos])
+            tramos["razon"].append(
+                _razon(tramos["delta_venta"][-1], tramos["delta_costo"][-1])
+            )
+            actual[activos] = destino
+
+        tramos = {
+            c: np.concatenate(v) if v else np.array([], dtype=np.int64)
+            for c, v in tramos.items()
+        }
+        # Orden estable: los tramos de un material quedan en el orden de su envolvente.
+        orden = np.argsort(-tramos["razon"], kind="stable")
+        self._tramos = {c: v[orden] for c, v in tramos.items()}
+        self._costo_acumulado = np.cumsum(self._tramos["delta_costo"])
+        self.costo_minimo = int(costo[0].sum())
+        logger.info(
+            f"Optimizador de descuentos: {n_materiales} materiales, "
+            f"{len(orden)} tramos en {n_descuentos} descuentos."
+        )
+
+    def resolver(self, presupuesto: float) -> dict:
+        """
+        Descuento de cada material para un presupuesto de costo del descuento.
+
+        Args:
+            presupuesto (float): Costo total del descuento máximo.
+
+        Returns:
+            dict: "descuentos" (por material), "venta" y "costo" (por material y
+            totales en "venta_total" y "costo_total") y "factible" (False si ni con el
+            descuento mínimo en todos los materiales se cumple el presupuesto).
+        """
+        n_materiales = self.venta.shape[1]
+        eleccion = np.zeros(n_materiales, dtype=np.int64)
+        factible = presupuesto >= self.costo_minimo
+        if factible:
+            tomados = self._tramos_tomados(presupuesto - self.costo_minimo)
+            # Los tramos de cada material se toman en orden: el último tomado es su destino.
+            np.maximum.at(
+                eleccion, self._tramos["material"][tomados], self._tramos["hasta"][tomados]
+            )
+
+        materiales = np.arange(n_materiales)
+        venta = self.venta[eleccion, materiales]
+        costo = self.costo[eleccion, materiales]
+        return {
+            "descuentos": self.descuentos[eleccion],
+            "venta": venta,
+            "costo": costo,
+            "venta_total": int(venta.sum()),
+            "costo_total": int(costo.sum()),
+            "factible": bool(factible),
+        }
+
+    def _tramos_tomados(self, disponible: float) -> np.ndarray:
+        """
+        Posiciones (en orden de razón) de los tramos que se toman con el presupuesto
+        disponible sobre el costo mínimo.
+
+        Se toman de una vez todos los tramos hasta el primero que no cabe. Después se
+        recorre el resto: cada tramo que cabe se toma, y uno que no cabe descarta los
+        siguientes de su material, que solo pueden tomarse en orden.
+        """
+        excede = np.flatnonzero(self._costo_acumulado > disponible)
+        if len(excede) == 0:
+            return np.arange(len(self._costo_acumulado))
+
+        primero = int(excede[0])
+        restante = disponible - (self._costo_acumulado[primero - 1] if primero else 0)
+        tomados = list(range(primero))
+        bloqueados = {int(self._tramos["material"][primero])}
+        resto = slice(primero + 1, None)
+        for posicion, material, delta_costo in zip(
+            range(primero + 1, len(self._costo_acumulado)),
+            self._tramos["material"][resto].tolist(),
+            self._tramos["delta_costo"][resto].tolist(),
+        ):
+            if material in bloqueados:
+                continue
+            if delta_costo <= restante:
+                tomados.append(posicion)
+                restante -= delta_costo
+            else:
+                bloqueados.add(material)
+        return np.array(tomados, dtype=np.int64)
+
+    def tabla(self, solucion: dict, index: pd.Index) -> pd.DataFrame:
+        """Descuento, venta y costo elegidos por material, con el índice de los materiales."""
+        return pd.DataFrame(
+            {
+                "Descuento óptimo": solucion["descuentos"],
+                MEDIDA_VENTA: solucion["venta"],
+                MEDIDA_COSTO: solucion["costo"],
+            },
+            index=index,
+        )
@@ -0,0 +1,502 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from services.agregacion_service import EstadoAgregacion
+from services.motor_service import MotorDatos, obtener_motor
+
+OPERACION_AGREGACION = "agregar_media"
+
+# Tipos de `convertir_tipo` que se escriben como texto en config.yml
+_TIPOS = {"int": int, "float": float, "str": str}
+
+
+class Operacion:
+    """
+    Operación disponible para las etapas del pipeline.
+
+    Además de la función que la ejecuta, describe qué columnas lee y escribe, que es lo
+    que necesita el planificador para podar columnas y reordenar filtros sin cambiar el
+    resultado.
+    """
+
+    def __init__(
+        self,
+        aplicar: Callable[[pd.DataFrame, dict, dict, MotorDatos], pd.DataFrame],
+        lee: Callable[[dict], List[str]],
+        escribe: Callable[[dict], List[str]],
+        por_filas: bool = True,
+        requeridas: Optional[Callable[[dict, Optional[Set[str]]], Optional[Set[str]]]] = None,
+    ):
+        """
+        Args:
+            aplicar (Callable): Función (df, etapa, contexto, motor) -> df.
+            lee (Callable): Columnas que la etapa necesita en su entrada.
+            escribe (Callable): Columnas cuyo contenido crea o modifica la etapa.
+            por_filas (bool): True si cada fila de salida depende solo de su fila de
+                entrada (un filtro puede ejecutarse antes o después de la etapa).
+            requeridas (Callable, opcional): Columnas necesarias antes de la etapa dadas
+                las necesarias después (None = todas). Por defecto, las de después más
+                las que lee la etapa.
+        """
+        self.aplicar = aplicar
+        self.lee = lee
+        self.escribe = escribe
+        self.por_filas = por_filas
+        self._requeridas = requeridas
+
+    def requeridas(self, etapa: dict, necesarias: Optional[Set[str]]) -> Optional[Set[str]]:
+        if self._requeridas is not None:
+            return self._requeridas(etapa, necesarias)
+        if necesarias is None:
+            return None
+        return necesarias | set(self.lee(etapa))
+
+
+def predicados_filtro(etapa: dict) -> List[dict]:
+    """Predicados (`columna`, `valores`, `incluir`) de una etapa `filtrar`, simple o fusionada."""
+    if "filtros" in etapa:
+        return etapa["filtros"]
+    return [
+        {
+            "columna": etapa["columna"],
+            "valores": etapa["valores"],
+            "incluir": etapa.get("incluir", True),
+        }
+    ]
+
+
+def nuevo_estado_agregacion(
+    etapa: dict, motor: Optional[MotorDatos] = None
+) -> EstadoAgregacion:
+    """Estado incremental vacío para una etapa `agregar_media`."""
+    return EstadoAgregacion(
+        columnas_grupo=etapa["columnas_grupo"],
+        columnas_valor=etapa["columnas_valor"],
+        columna_destino=etapa["columna_destino"],
+        columna_referencia=etapa["columna_referencia"],
+        columnas_identidad=etapa.get("columnas_identidad"),
+        motor=motor,
+        columna_periodo=etapa.get("columna_periodo"),
+    )
+
+
+def _seleccionar(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    return motor.filtrar(df, None, columnas=etapa["columnas"])
+
+
+def _filtrar(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    return motor.filtrar(df, predicados_filtro(etapa), columnas=etapa.get("columnas"))
+
+
+def _rellenar_nulos(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    return utils.rellenar_nulos(df, columnas=etapa["columnas"], valor=etapa["valor"])
+
+
+def _convertir_tipo(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    return utils.Cambiar_tipo_dato_multiples_columnas_pd(
+        base=df,
+        list_columns=etapa["columnas"],
+        type_data=_TIPOS.get(etapa["tipo"], etapa["tipo"]),
+    )
+
+
+def construir_indice_unir(etapa: dict, contexto: dict) -> pd.DataFrame:
+    """
+    Tabla de búsqueda de una etapa `unir`: el insumo `con` indexado por `llaves`, con
+    una fila por llave según la política `duplicados`.
+
+    Args:
+        etapa (dict): Etapa `unir`.
+        contexto (dict): Insumos disponibles.
+
+    Returns:
+        pd.DataFrame: Índice de `utils.construir_indice_unico`.
+    """
+    if etapa["con"] not in contexto:
+        raise KeyError(f"Etapa '{etapa['nombre']}': no se recibió el insumo '{etapa['con']}'.")
+    return utils.construir_indice_unico(
+        contexto[etapa["con"]],
+        llaves=etapa["llaves"],
+        columnas=etapa["columnas"],
+        duplicados=etapa.get("duplicados", "error"),
+        columna_maximo=etapa.get("columna_maximo"),
+        claves_nulas=etapa.get("claves_nulas"),
+    )
+
+
+def _unir(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    # Los índices ya construidos (p. ej. en un rerun anterior) llegan en el contexto.
+    indices = contexto.setdefault("indices", {})
+    if etapa["nombre"] not in indices:
+        indices[etapa["nombre"]] = construir_indice_unir(etapa, contexto)
+    return motor.buscar(df, indices[etapa["nombre"]], etapa["llaves"])
+
+
+def _renombrar(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    return utils.renombrar_columnas_con_diccionario(df=df, cols_to_rename=etapa["columnas"])
+
+
+def _concatenar(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    separador = etapa.get("separador", "")
+    return utils.concatenar_columnas_pd(
+        dataframe=df,
+        cols_elegidas=etapa["columnas"],
+        nueva_columna=etapa["destino"],
+        usar_separador=bool(separador),
+        separador=separador,
+    )
+
+
+def _agregar_media(
+    df: pd.DataFrame, etapa: dict, contexto: dict, motor: MotorDatos
+) -> pd.DataFrame:
+    estado = nuevo_estado_agregacion(etapa, motor)
+    estado.incorporar(df)
+    return estado.medias()
+
+
+def _columnas_agregacion(etapa: dict) -> List[str]:
+    return list(
+        dict.fromkeys(
+            etapa["columnas_grupo"]
+            + etapa["columnas_valor"]
+            + (etapa.get("columnas_identidad") or [])
+            + ([etapa["columna_periodo"]] if etapa.get("columna_periodo") else [])
+        )
+    )
+
+
+def _requeridas_unir(etapa: dict, necesarias: Optional[Set[str]]) -> Optional[Set[str]]:
+    if necesarias is None:
+        return None
+    return (necesarias - set(etapa["columnas"])) | set(etapa["llaves"])
+
+
+def _requeridas_renombrar(etapa: dict, necesarias: Optional[Set[str]]) -> Optional[Set[str]]:
+    if necesarias is None:
+        return None
+    inverso = {nuevo: actual for actual, nuevo in etapa["columnas"].items()}
+    return {inverso.get(c, c) for c in necesarias}
+
+
+def _requeridas_concatenar(etapa: dict, necesarias: Optional[Set[str]]) -> Optional[Set[str]]:
+    if necesarias is None:
+        return None
+    return (necesarias - {etapa["destino"]}) | set(etapa["columnas"])
+
+
+OPERACIONES: Dict[str, Operacion] = {
+    "seleccionar": Operacion(
+        _seleccionar,
+        lee=lambda e: e["columnas"],
+        escribe=lambda e: [],
+        requeridas=lambda e, necesarias: set(e["columnas"]),
+    ),
+    "filtrar": Operacion(
+        _filtrar,
+        lee=lambda e: [p["columna"] for p in predicados_filtro(e)],
+        escribe=lambda e: [],
+    ),
+    "rellenar_nulos": Operacion(
+        _rellenar_nulos, lee=lambda e: e["columnas"], escribe=lambda e: e["columnas"]
+    ),
+    # Pasar a categoría no cambia los valores: un filtro puede ejecutarse antes.
+    "convertir_tipo": Operacion(
+        _convertir_tipo,
+        lee=lambda e: e["columnas"],
+        escribe=lambda e: [] if e["tipo"] == "category" else e["columnas"],
+    ),
+    # Left join contra una tabla de llave única: cada fila conserva sus columnas, así que
+    # los filtros sobre ellas conmutan.
+    "unir": Operacion(
+        _unir,
+        lee=lambda e: e["llaves"],
+        escribe=lambda e: [c for c in e["columnas"] if c not in e["llaves"]],
+        requeridas=_requeridas_unir,
+    ),
+    "renombrar": Operacion(
+        _renombrar,
+        lee=lambda e: list(e["columnas"]),
+        escribe=lambda e: list(e["columnas"]) + list(e["columnas"].values()),
+        requeridas=_requeridas_renombrar,
+    ),
+    "concatenar": Operacion(
+        _concatenar,
+        lee=lambda e: e["columnas"],
+        escribe=lambda e: [e["destino"]],
+        requeridas=_requeridas_concatenar,
+    ),
+    # Las identidades del remapeo se construyen con todas las filas: ningún filtro
+    # puede cruzar la agregación sin cambiar el resultado.
+    OPERACION_AGREGACION: Operacion(
+        _agregar_media,
+        lee=_columnas_agregacion,
+        escribe=lambda e: e["columnas_grupo"] + e["columnas_valor"],
+        por_filas=False,
+        requeridas=lambda e, necesarias: set(_columnas_agregacion(e)),
+    ),
+}
+
+
+def _adelantar_filtros(etapas: List[dict]) -> List[dict]:
+    """
+    Mueve cada filtro antes de las etapas por filas que no escriben sus columnas
+    (conversiones, uniones, rellenos de otras columnas...), para descartar filas lo
+    antes posible. Los filtros conservan su orden relativo.
+    """
+    plan = []
+    for etapa in etapas:
+        posicion = len(plan)
+        if etapa["operacion"] == "filtrar":
+            columnas = set(OPERACIONES["filtrar"].lee(etapa))
+            while posicion > 0:
+                previa = plan[posicion - 1]
+                operacion = OPERACIONES[previa["operacion"]]
+                if (
+                    previa["operacion"] == "filtrar"
+                    or not operacion.por_filas
+                    or columnas & set(operacion.escribe(previa))
+                ):
+                    break
+                posicion -= 1
+            if posicion < len(plan):
+                logger.debug(
+                    f"Planificador: filtro '{etapa['nombre']}' adelantado antes de "
+                    f"'{plan[posicion]['nombre']}'."
+                )
+        plan.insert(posicion, etapa)
+    return plan
+
+
+def _fusionar(anterior: dict, etapa: dict) -> Optional[dict]:
+    """Fusiona dos etapas consecutivas baratas en una sola, o retorna None si no aplica."""
+    operacion = etapa["operacion"]
+    if anterior["operacion"] != operacion:
+        return None
+    fusionada = {"nombre": f"{anterior['nombre']}+{etapa['nombre']}", "operacion": operacion}
+
+    if operacion == "filtrar" and "columnas" not in anterior:
+        fusionada["filtros"] = predicados_filtro(anterior) + predicados_filtro(etapa)
+    elif operacion in ("rellenar_nulos", "convertir_tipo"):
+        parametro = "valor" if operacion == "rellenar_nulos" else "tipo"
+        if anterior[parametro] != etapa[parametro]:
+            return None
+        fusionada[parametro] = etapa[parametro]
+        fusionada["columnas"] = list(dict.fromkeys(anterior["columnas"] + etapa["columnas"]))
+    elif operacion == "renombrar" and not set(anterior["columnas"]) & set(etapa["columnas"]):
+        fusionada["columnas"] = {
+            actual: etapa["columnas"].get(nuevo, nuevo)
+            for actual, nuevo in anterior["columnas"].items()
+        }
+        fusionada["columnas"].update(
+            {
+                actual: nuevo
+                for actual, nuevo in etapa["columnas"].items()
+                if actual not in anterior["columnas"].values()
+            }
+        )
+    else:
+        return None
+    return fusionada
+
+
+def _fusionar_etapas(etapas: List[dict]) -> List[dict]:
+    plan = []
+    for etapa in etapas:
+        fusionada = _fusionar(plan[-1], etapa) if plan else None
+        if fusionada is None:
+            plan.append(etapa)
+        else:
+            plan[-1] = fusionada
+    return plan
+
+
+def _podar_columnas(etapas: List[dict]) -> List[dict]:
+    """
+    Antepone una selección con solo las columnas que usa el pipeline. Si la primera
+    etapa es un filtro, la selección se hace en el mismo recorte del filtro.
+    """
+    necesarias: Optional[Set[str]] = None
+    for etapa in reversed(etapas):
+        necesarias = OPERACIONES[etapa["operacion"]].requeridas(etapa, necesarias)
+    if necesarias is None:
+        return etapas
+
+    columnas = sorted(necesarias)
+    if etapas and etapas[0]["operacion"] == "filtrar":
+        return [{**etapas[0], "columnas": columnas}] + etapas[1:]
+    return [
+        {"nombre": "podar_columnas", "operacion": "seleccionar", "columnas": columnas}
+    ] + etapas
+
+
+def planificar(etapas: List[dict]) -> List[dict]:
+    """
+    Calcula el orden de ejecución de las etapas declaradas.
+
+    1. Adelanta los filtros tanto como lo permiten las etapas previas.
+    2. Fusiona etapas consecutivas baratas del mismo tipo (filtros en una sola máscara,
+       renombres compuestos, rellenos y conversiones con el mismo valor o tipo).
+    3. Poda las columnas que ninguna etapa usa.
+
+    Args:
+        etapas (list[dict]): Etapas declaradas.
+
+    Returns:
+        list[dict]: Etapas en el orden en que se ejecutan.
+    """
+    return _podar_columnas(_fusionar_etapas(_adelantar_filtros(etapas)))
+
+
+class PipelineDatos:
+    """
+    Pipeline de preprocesamiento declarado como una lista de etapas con nombre
+    (sección `cnf_pipeline` de config.yml).
+
+    Cada etapa es un diccionario con `nombre`, `operacion` (ver `OPERACIONES`) y los
+    parámetros de la operación. Las etapas se ejecutan en el orden calculado por
+    `planificar`, y cada ejecución registra su duración y filas en `reporte`. Los
+    filtros, agrupaciones y uniones se calculan en el `motor` configurado.
+    """
+
+    def __init__(
+        self, etapas: List[dict], optimizar: bool = True, motor: Optional[str] = None
+    ):
+        """
+        Args:
+            etapas (list[dict]): Etapas declaradas, en orden.
+            optimizar (bool): Si es False las etapas se ejecutan tal como se declararon.
+            motor (str, opcional): Motor de cálculo (ver `motor_service.MOTORES`); por
+                defecto pandas.
+
+        Raises:
+            ValueError: Si alguna etapa no tiene una operación conocida o el motor no existe.
+        """
+        self.motor = obtener_motor(motor)
+        self.etapas_declaradas = []
+        for i, etapa in enumerate(etapas or []):
+            etapa = {"nombre": etapa.get("nombre") or f"etapa_{i + 1}", **etapa}
+            if etapa.get("operacion") not in OPERACIONES:
+                raise ValueError(
+                    f"Etapa '{etapa['nombre']}': operación desconocida "
+                    f"'{etapa.get('operacion')}'. Disponibles: {', '.join(OPERACIONES)}."
+                )
+            self.etapas_declaradas.append(etapa)
+
+        self.etapas = planificar(self.etapas_declaradas) if optimizar else self.etapas_declaradas
+        self.reporte: List[Dict[str, Any]] = []
+        logger.debug(
+            "Plan de ejecución: " + " -> ".join(etapa["nombre"] for etapa in self.etapas)
+        )
+
+    def dividir(self) -> Tuple[List[dict], Optional[dict], List[dict]]:
+        """
+        Separa el plan alrededor de la primera agregación.
+
+        Returns:
+            tuple: Etapas previas (por filas, pueden ejecutarse por lotes), la etapa de
+            agregación (o None si no hay) y las etapas posteriores.
+        """
+        for i, etapa in enumerate(self.etapas):
+            if etapa["operacion"] == OPERACION_AGREGACION:
+                return self.etapas[:i], etapa, self.etapas[i + 1 :]
+        return self.etapas, None, []
+
+    def filtros_lectura(self) -> List[dict]:
+        """
+        Filtros que pueden aplicarse ya durante la lectura del insumo: los que quedan al
+        inicio del plan, antes de cualquier etapa que modifique los datos.
+
+        Returns:
+            list[dict]: Predicados con claves `columna`, `valores` e `incluir`.
+        """
+        filtros = []
+        for etapa in self.etapas:
+            if etapa["operacion"] == "filtrar":
+                filtros.extend(predicados_filtro(etapa))
+            elif etapa["operacion"] != "seleccionar":
+                break
+        return filtros
+
+    def registrar(
+        self, etapa: dict, segundos: float, filas_entrada: int, filas_salida: int
+    ) -> None:
+        """Agrega al reporte (y al log) la ejecución de una etapa."""
+        self.reporte.append(
+            {
+                "etapa": etapa["nombre"],
+                "operacion": etapa["operacion"],
+                "segundos": segundos,
+                "filas_entrada": filas_entrada,
+                "filas_salida": filas_salida,
+            }
+        )
+        logger.info(
+            f"Etapa '{etapa['nombre']}' ({etapa['operacion']}): "
+            f"{filas_entrada} -> {filas_salida} filas en {segundos:.3f} s"
+        )
+
+    def ejecutar(
+        self,
+        df: pd.DataFrame,
+        etapas: Optional[List[dict]] = None,
+        contexto: Optional[Dict[str, pd.DataFrame]] = None,
+    ) -> pd.DataFrame:
+        """
+        Ejecuta etapas del plan sobre un DataFrame.
+
+        Args:
+            df (pd.DataFrame): DataFrame de entrada.
+            etapas (list[dict], opcional): Parte del plan a ejecutar (ver `dividir`); por
+                defecto el plan completo.
+            contexto (dict, opcional): Otros insumos disponibles para las etapas `unir` y,
+                en "indices", las tablas de búsqueda ya construidas por nombre de etapa
+                (las que falten se construyen y se agregan al diccionario).
+
+        Returns:
+            pd.DataFrame: Resultado de la última etapa.
+        """
+        for etapa in self.etapas if etapas is None else etapas:
+            inicio = time.perf_counter()
+            filas_entrada = len(df)
+            operacion = OPERACIONES[etapa["operacion"]]
+            df = operacion.aplicar(df, etapa, contexto or {}, self.motor)
+            self.registrar(etapa, time.perf_counter() - inicio, filas_entrada, len(df))
+        return df
+
+
+def filtros_lectura(cnf_pipeline: Optional[dict], insumo: str) -> List[dict]:
+    """
+    Filtros del pipeline de un insumo que el lector puede aplicar al cargar el archivo.
+
+    Args:
+        cnf_pipeline (dict): Sección `cnf_pipeline` de config.yml.
+        insumo (str): Nombre del insumo ("ventas" o "precios").
+
+    Returns:
+        list[dict]: Predicados con claves `columna`, `valores` e `incluir`.
+    """
+    cnf_pipeline = cnf_pipeline or {}
+    if not cnf_pipeline.get(insumo):
+        return []
+    return PipelineDatos(
+        cnf_pipeline[insumo], optimizar=cnf_pipeline.get("optimizar", True)
+    ).filtros_lectura()
@@ -0,0 +1,159 @@
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+from services.estacionalidad_service import PerfilesEstacionales
+
+COLUMNAS_TOTALES = ["Venta de la actividad", "Costo del descuento"]
+# Columna temporal con la fila de `df_final` de la que proviene cada fila del resultado
+_COLUMNA_ORIGEN = "__origen"
+
+
+class ResultadosSimulacion:
+    """
+    Resultado de la simulación de los materiales registrados (`df_final`), con sus
+    totales, que puede actualizarse solo en las filas editadas.
+
+    Cada material registrado produce un bloque contiguo de filas en el resultado (el
+    cruce con el catálogo puede devolver varias por material). El resultado guarda de
+    qué fila de `df_final` viene cada una, de modo que al editar algunas filas se
+    recalculan solo sus bloques y los totales se corrigen con la diferencia.
+    """
+
+    def __init__(
+        self,
+        df_final: pd.DataFrame,
+        df_catalogo: pd.DataFrame,
+        columnas_catalogo: List[str],
+        porcentaje_crecimiento: float,
+        dict_cols: dict,
+        perfiles: Optional[PerfilesEstacionales] = None,
+    ):
+        """
+        Calcula el resultado completo.
+
+        Args:
+            df_final (pd.DataFrame): Materiales registrados.
+            df_catalogo (pd.DataFrame): Catálogo de productos procesado.
+            columnas_catalogo (list[str]): Columnas del catálogo que se cruzan.
+            porcentaje_crecimiento (float): Porcentaje de crecimiento para unidades.
+            dict_cols (dict): Dict de columnas necesarias.
+            perfiles (PerfilesEstacionales, opcional): Índices estacionales con los que
+                se ajusta el promedio mensual al mes de cada evento.
+        """
+        self.df_final = df_final
+        self.df_catalogo = df_catalogo
+        self.columnas_catalogo = columnas_catalogo
+        self.porcentaje_crecimiento = porcentaje_crecimiento
+        self.dict_cols = dict_cols
+        self.perfiles = perfiles
+        self.resultado, self.origen = self._calcular(df_final)
+        self.totales = utils.calcular_vtas_totales(self.resultado, COLUMNAS_TOTALES)
+
+    def _calcular(self, df_materiales: pd.DataFrame) -> tuple:
+        """Cruza con el catálogo y procesa; retorna el resultado y el origen de cada fila."""
+        # Los perfiles identifican el material con todas las columnas de su grupo; las
+        # que no están entre las columnas cruzadas se agregan solo para el cálculo.
+        columnas_llave = []
+        if self.perfiles is not None:
+            columnas_llave = [
+                c
+                for c in self.perfiles.columnas_llave
+                if c not in self.columnas_catalogo and c not in df_materiales.columns
+            ]
+        df_merge = utils.left_merge_on_columns(
+            df1=df_materiales.rename_axis(_COLUMNA_ORIGEN).reset_index(),
+            df2=self.df_catalogo[self.columnas_catalogo + columnas_llave],
+            key_columns=["concat_plu_producto"],
+        )
+        origen = df_merge[_COLUMNA_ORIGEN].to_numpy()
+        df_procesado = utils.procesar_insumo(
+            df_insumo=df_merge.drop(columns=_COLUMNA_ORIGEN),
+            porcentaje_crecimiento=self.porcentaje_crecimiento,
+            dict_cols=self.dict_cols,
+            perfiles=self.perfiles,
+        )
+        return df_procesado.drop(columns=columnas_llave), origen
+
+    def vigente(
+        self,
+        df_catalogo: pd.DataFrame,
+        porcentaje_crecimiento: float,
+        perfiles: Optional[PerfilesEstacionales] = None,
+    ) -> bool:
+        """True si el resultado corresponde al catálogo, crecimiento y perfiles actuales."""
+        return (
+            self.df_catalogo is df_catalogo
+            and self.porcentaje_crecimiento == porcentaje_crecimiento
+            and self.perfiles is perfiles
+        )
+
+    def _sobrescribir(
+        self, columna: str, posiciones: np.ndarray, valores: pd.Series
+    ) -> pd.Series:
+        """Copia de una columna del resultado con `valores` en las `posiciones` dadas."""
+        serie = self.resultado[columna]
+        arreglo = serie.array.copy()
+        arreglo[posiciones] = valores.array
+        return pd.Series(arreglo, index=serie.index, name=columna)
+
+    def actualizar_filas(self, df_final: pd.DataFrame, filas: Iterable) -> bool:
+        """
+        Recalcula solo los materiales editados y corrige el resultado y los totales.
+
+        Args:
+            df_final (pd.DataFrame): Materiales registrados después de la edición; deben
+                tener las mismas filas y columnas que los del resultado actual.
+            filas (Iterable): Etiquetas (índice de `df_final`) de las filas editadas.
+
+        Returns:
+            bool: False si la estructura de `df_final` cambió y hace falta recalcular
+            todo; True si el resultado quedó actualizado.
+        """
+        if not (
+            df_final.index.equals(self.df_final.index)
+            and df_final.columns.equals(self.df_final.columns)
+        ):
+            return False
+
+        filas = df_final.index[df_final.index.isin(list(filas))]
+        self.df_final = df_final
+        if filas.empty:
+            return True
+
+        nuevo, origen_nuevo = self._calcular(df_final.loc[filas])
+        reemplazadas = np.isin(self.origen, filas)
+        anterior = self.resultado.loc[reemplazadas, COLUMNAS_TOTALES].sum()
+        posiciones = np.flatnonzero(reemplazadas)
+        if np.array_equal(self.origen[posiciones], origen_nuevo) and self.resultado.dtypes.equals(
+            nuevo.dtypes
+        ):
+            # Caso habitual (p. ej. cambia el descuento o las fechas): los bloques
+            # conservan su tamaño y se sobrescriben en su lugar.
+            self.resultado = utils.asignar_columnas(
+                self.resultado,
+                {c: self._sobrescribir(c, posiciones, nuevo[c]) for c in nuevo.columns},
+            )
+        else:
+            # Los bloques nuevos se ubican en el orden de `df_final`; dentro de cada
+            # bloque se conserva el orden del cruce, igual que en un cálculo completo.
+            combinado = pd.concat(
+                [self.resultado.loc[~reemplazadas], nuevo], ignore_index=True
+            )
+            origen = np.concatenate([self.origen[~reemplazadas], origen_nuevo])
+            orden = np.argsort(df_final.index.get_indexer(origen), kind="stable")
+            self.resultado = combinado.take(orden).reset_index(drop=True)
+            self.origen = origen[orden]
+
+        self.totales = (
+            self.totales
+            - anterior.astype(int)
+            + utils.calcular_vtas_totales(nuevo, COLUMNAS_TOTALES)
+        )
+        logger.info(
+            f"Resultado actualizado en {len(filas)} de {len(df_final)} materiales registrados."
+        )
+        return True
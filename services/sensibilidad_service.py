@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import ui_components.utils as utils
+
+MEDIDA_VENTA = "Venta de la actividad"
+MEDIDA_COSTO = "Costo del descuento"
+
+
+def descuentos_de_rangos(rangos: Sequence[str]) -> Dict[str, List[int]]:
+    """
+    Descuentos enteros que cubre cada rango de la barra lateral (p. ej. "5% - 10%"
+    -> 5, 6, ..., 10).
+
+    Args:
+        rangos (Sequence[str]): Textos de `list_rng_dctos`.
+
+    Returns:
+        Dict[str, List[int]]: Descuentos por rango, en el orden recibido.
+    """
+    descuentos = {}
+    for rango in rangos:
+        minimo, maximo = utils.obtener_rango_valido_desde_texto(rango)
+        descuentos[rango] = list(range(minimo, maximo + 1))
+    return descuentos
+
+
+class CuboSensibilidad:
+    """
+    Venta y costo del descuento de todos los materiales registrados para una grilla de
+    porcentajes de crecimiento y descuentos, calculados en una sola operación
+    vectorizada (ver `utils.calcular_simulacion`).
+
+    Cada celda es idéntica a la que entregaría `utils.procesar_insumo` aplicando ese
+    crecimiento y ese descuento a todos los materiales. Una vez construido, cualquier
+    escenario o total se obtiene indexando el cubo, sin recalcular.
+    """
+
+    def __init__(
+        self,
+        df_insumo: pd.DataFrame,
+        dict_cols: dict,
+        crecimientos: Sequence[float],
+        descuentos: Sequence[int],
+        max_celdas: Optional[int] = None,
+    ):
+        """
+        Args:
+            df_insumo (pd.DataFrame): Materiales registrados, con fechas, promedio y precio.
+            dict_cols (dict): Dict de columnas necesarias.
+            crecimientos (Sequence[float]): Porcentajes de crecimiento de la grilla.
+            descuentos (Sequence[int]): Descuentos (%) de la grilla.
+            max_celdas (int, opcional): Máximo de celdas crecimiento x descuento x
+                material que se permite construir.
+
+        Raises:
+            ValueError: Si el cubo supera `max_celdas`.
+        """
+        self.crecimientos = np.asarray(crecimientos)
+        self.descuentos = np.asarray(descuentos, dtype=np.int64)
+        self.materiales = df_insumo.index
+        celdas = len(self.crecimientos) * len(self.descuentos) * len(df_insumo)
+        if max_celdas is not None and celdas > max_celdas:
+            raise ValueError(
+                f"El cubo de sensibilidad tendría {celdas:,} celdas (máximo {max_celdas:,})."
+            )
+
+        arreglos = utils.arreglos_simulacion(df_insumo, dict_cols)
+        arreglos["rango"] = self.descuentos[:, np.newaxis]
+        resultado = utils.calcular_simulacion(
+            **arreglos,
+            porcentaje_crecimiento=self.crecimientos[:, np.newaxis, np.newaxis],
+        )
+        # venta: (crecimiento, material); costo: (crecimiento, descuento, material)
+        self.venta = resultado["venta"][:, 0, :]
+        self.costo = resultado["costo_descuento"]
+        logger.info(
+            f"Cubo de sensibilidad: {len(self.crecimientos)} crecimientos x "
+            f"{len(self.descuentos)} descuentos x {len(df_insumo)} materiales."
+        )
+
+    def _posicion(self, valores: np.ndarray, valor: float, eje: str) -> int:
+        posiciones = np.flatnonzero(valores == valor)
+        if len(posiciones) == 0:
+            raise KeyError(f"{eje} {valor} no está en la grilla de sensibilidad.")
+        return int(posiciones[0])
+
+    def corte(self, crecimiento: float, descuento: int) -> pd.DataFrame:
+        """
+        Venta y costo del descuento por material en un escenario de la grilla.
+
+        Args:
+            crecimiento (float): Porcentaje de crecimiento.
+            descuento (int): Descuento (%).
+
+        Returns:
+            pd.DataFrame: Columnas "Venta de la actividad" y "Costo del descuento",
+            con el índice de los materiales.
+        """
+        i = self._posicion(self.crecimientos, crecimiento, "Crecimiento")
+        j = self._posicion(self.descuentos, descuento, "Descuento")
+        return pd.DataFrame(
+            {MEDIDA_VENTA: self.venta[i], MEDIDA_COSTO: self.costo[i, j]},
+            index=self.materiales,
+        )
+
+    def totales(self, medida: str = MEDIDA_COSTO) -> pd.DataFrame:
+        """
+        Total de una medida sobre todos los materiales para cada escenario.
+
+        Args:
+            medida (str): "Venta de la actividad" o "Costo del descuento".
+
+        Returns:
+            pd.DataFrame: Crecimientos en las filas y descuentos en las columnas.
+        """
+        if medida == MEDIDA_COSTO:
+            valores = self.costo.sum(axis=2)
+        elif medida == MEDIDA_VENTA:
+            # La venta no depende del descuento: se repite en cada columna.
+            valores = np.repeat(
+                self.venta.sum(axis=1)[:, np.newaxis], len(self.descuentos), axis=1
+            )
+        else:
+            raise ValueError(f"Medida '{medida}' no soportada: {MEDIDA_VENTA}, {MEDIDA_COSTO}.")
+        return pd.DataFrame(
+            valores,
+            index=pd.Index(self.crecimientos, name="% crecimiento"),
+            columns=pd.Index(self.descuentos, name="% descuento"),
+        )
@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+
+from services.cache_service import CacheSnapshots, calcular_digest, calcular_huella_rapida
+
+
+def _csv(filas: int, valor: str) -> bytes:
+    """CSV de `filas` filas con `valor` en la fila del medio (mismo tamaño para cualquier valor)."""
+    lineas = ["PLU,Ventas_Un"] + [f"{i:06d},100" for i in range(filas)]
+    lineas[filas // 2] = f"{filas // 2:06d},{valor}"
+    return "\n".join(lineas).encode("utf-8")
+
+
+def test_huella_sin_id_cambia_con_edicion_en_el_medio():
+    # Más grande que las dos muestras de 64 KB: la fila editada queda fuera de ambas.
+    original = _csv(50_000, "100")
+    editado = _csv(50_000, "999")
+    assert len(original) == len(editado)
+    assert original[:65536] == editado[:65536]
+    assert original[-65536:] == editado[-65536:]
+
+    assert calcular_huella_rapida("ventas.csv", original) != calcular_huella_rapida(
+        "ventas.csv", editado
+    )
+
+
+def test_huella_sin_id_estable_para_el_mismo_contenido():
+    contenido = _csv(50_000, "100")
+    assert calcular_huella_rapida("ventas.csv", contenido) == calcular_huella_rapida(
+        "ventas.csv", bytes(contenido)
+    )
+
+
+def test_huella_con_id_distingue_cargas():
+    contenido = _csv(1_000, "100")
+    assert calcular_huella_rapida("ventas.csv", contenido, id_carga="a") != (
+        calcular_huella_rapida("ventas.csv", contenido, id_carga="b")
+    )
+
+
+def test_huella_sin_id_reutiliza_el_digest():
+    contenido = _csv(1_000, "100")
+    assert calcular_huella_rapida("ventas.csv", contenido) == calcular_huella_rapida(
+        "ventas.csv", contenido, digest=calcular_digest(contenido)
+    )
+
+
+def test_cache_elimina_los_snapshots_usados_hace_mas_tiempo(tmp_path):
+    cache = CacheSnapshots(str(tmp_path))
+    df = pd.DataFrame({"valor": range(10_000)})
+    for i, clave in enumerate(("a", "b", "c")):
+        cache.guardar(clave, df)
+        os.utime(cache.ruta(clave), (1_000 + i, 1_000 + i))
+    tamano_mb = os.path.getsize(cache.ruta("a")) / 1024**2
+    # Leer "a" la marca como la más reciente
+    assert cache.leer("a") is not None
+
+    # Cabe el nuevo snapshot y uno más: se eliminan los dos menos usados ("b" y "c")
+    cache.max_mb = 2.5 * tamano_mb
+    cache.guardar("d", df)
+    assert sorted(os.listdir(tmp_path)) == ["a.parquet", "d.parquet"]
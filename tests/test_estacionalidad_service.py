@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+import ui_components.utils as utils
+from services.estacionalidad_service import PerfilesEstacionales
+from services.resultados_service import ResultadosSimulacion
+
+DICT_COLS = {
+    "Promedio Mes Und": "Promedio Mes Und",
+    "Precio de venta": "Precio de venta",
+    "Dias de la actividad": "Dias de la actividad",
+}
+MATERIAL = "1 : Producto"
+COLUMNAS_LLAVE = ["Marca", "concat_plu_producto"]
+
+
+def _periodos() -> pd.DataFrame:
+    """El mismo material en dos marcas: una vende en diciembre y la otra en febrero."""
+    filas = []
+    for marca, mes_alto in (("Jet", 12), ("Jumbo", 2)):
+        for mes in range(1, 13):
+            filas.append(
+                {
+                    "Marca": marca,
+                    "concat_plu_producto": MATERIAL,
+                    "Subcategoría": "Sub",
+                    "Mes": mes,
+                    "Ventas_Un__suma": 600.0 if mes == mes_alto else 200.0,
+                    "Ventas_Un__conteo": 2,
+                }
+            )
+    return pd.DataFrame(filas)
+
+
+def _perfiles() -> PerfilesEstacionales:
+    return PerfilesEstacionales(
+        _periodos(),
+        columnas_llave=COLUMNAS_LLAVE,
+        columna_grupo="Subcategoría",
+        columna_periodo="Mes",
+        columna_suma="Ventas_Un__suma",
+        columna_conteo="Ventas_Un__conteo",
+    )
+
+
+def test_dos_grupos_con_la_misma_llave_tienen_perfiles_distintos():
+    perfiles = _perfiles()
+    df_llaves = pd.DataFrame({"Marca": ["Jet", "Jumbo"], "concat_plu_producto": MATERIAL})
+    diciembre = np.array(["2025-12-01"] * 2, dtype="datetime64[ns]")
+    febrero = np.array(["2025-02-01"] * 2, dtype="datetime64[ns]")
+
+    indice_diciembre = perfiles.indice(df_llaves, diciembre)
+    indice_febrero = perfiles.indice(df_llaves, febrero)
+    assert indice_diciembre[0] > 2 * indice_diciembre[1]
+    assert indice_febrero[1] > 2 * indice_febrero[0]
+
+
+def test_material_desconocido_no_se_ajusta():
+    perfiles = _perfiles()
+    df_llaves = pd.DataFrame({"Marca": ["Otra"], "concat_plu_producto": MATERIAL})
+    fechas = np.array(["2025-12-01"], dtype="datetime64[ns]")
+    assert perfiles.indice(df_llaves, fechas).tolist() == [1.0]
+
+
+def test_resultado_ajusta_cada_fila_del_catalogo_con_su_grupo():
+    df_catalogo = pd.DataFrame(
+        {
+            "concat_plu_producto": [MATERIAL, MATERIAL],
+            "Marca": ["Jet", "Jumbo"],
+            "Promedio Mes Und": [300.0, 300.0],
+            "Precio de venta": [1000.0, 1000.0],
+        }
+    )
+    df_final = pd.DataFrame(
+        {
+            "concat_plu_producto": [MATERIAL],
+            "rango": ["10"],
+            "fecha_inicio": [pd.Timestamp("2025-12-01")],
+            "fecha_fin": [pd.Timestamp("2025-12-31")],
+        }
+    )
+    resultados = ResultadosSimulacion(
+        df_final,
+        df_catalogo,
+        columnas_catalogo=["concat_plu_producto", "Promedio Mes Und", "Precio de venta"],
+        porcentaje_crecimiento=0,
+        dict_cols=DICT_COLS,
+        perfiles=_perfiles(),
+    )
+
+    resultado = resultados.resultado
+    # Las columnas de la llave que no se cruzan no quedan en el resultado
+    assert "Marca" not in resultado.columns
+    indices = resultado[utils.COLUMNA_INDICE_ESTACIONAL].to_numpy()
+    assert indices[0] > 2 * indices[1]
+    assert resultado["Promedio Mes Und"].tolist() == [300.0, 300.0]
@@ -0,0 +1,50 @@
+import ui_components.utils as utils
+
+
+class _HojaFalsa:
+    def __init__(self, filas):
+        self._filas = filas
+
+    def iter_rows(self, values_only=True):
+        return iter(self._filas)
+
+
+class _LibroFalso:
+    def __init__(self, filas):
+        self.worksheets = [_HojaFalsa(filas)]
+
+    def close(self):
+        pass
+
+
+def _leer(monkeypatch, filas, **kwargs):
+    monkeypatch.setattr(utils.openpyxl, "load_workbook", lambda *a, **k: _LibroFalso(filas))
+    return utils.lectura_excel_streaming("ventas.xlsx", **kwargs)
+
+
+def test_fila_corta_con_filtro_en_la_ultima_columna(monkeypatch):
+    # openpyxl en modo solo lectura omite las celdas vacías al final de la fila.
+    filas = [
+        ("PLU", "Ventas_Un", "Fabricante"),
+        ("1", 10, "Otros Oper Cciales"),
+        ("2", 20),
+        ("3", 30, "Propio"),
+    ]
+    df = _leer(
+        monkeypatch,
+        filas,
+        columnas=["PLU", "Ventas_Un", "Fabricante"],
+        filtros=[{"columna": "Fabricante", "valores": ["Otros Oper Cciales"], "incluir": False}],
+    )
+    assert df["PLU"].tolist() == ["2", "3"]
+    assert df["Fabricante"].tolist() == [None, "Propio"]
+
+
+def test_fila_corta_no_cumple_filtro_de_inclusion(monkeypatch):
+    filas = [("PLU", "Año"), ("1", 2024), ("2",)]
+    df = _leer(
+        monkeypatch,
+        filas,
+        filtros=[{"columna": "Año", "valores": ["2024"], "incluir": True}],
+    )
+    assert df["PLU"].tolist() == ["1"]
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+import ui_components.utils as utils
+from services.estacionalidad_service import PerfilesEstacionales
+from services.montecarlo_service import HistorialDemanda, SimulacionMonteCarlo
+from services.sensibilidad_service import MEDIDA_VENTA
+
+DICT_COLS = {
+    "Promedio Mes Und": "Promedio Mes Und",
+    "Precio de venta": "Precio de venta",
+    "Dias de la actividad": "Dias de la actividad",
+}
+MATERIAL = "1 : Producto"
+
+
+def _ventas() -> pd.DataFrame:
+    """Dos años de ventas mensuales: diciembre vende el triple que febrero."""
+    unidades = {mes: 100.0 for mes in range(1, 13)}
+    unidades[2] = 50.0
+    unidades[12] = 150.0
+    return pd.DataFrame(
+        [
+            {"concat_plu_producto": MATERIAL, "Subcategoría": "Sub", "Mes": mes, "Ventas_Un": u}
+            for _ in range(2)
+            for mes, u in unidades.items()
+        ]
+    )
+
+
+def _perfiles(df_ventas: pd.DataFrame) -> PerfilesEstacionales:
+    df_periodos = (
+        df_ventas.groupby(["concat_plu_producto", "Subcategoría", "Mes"])
+        .agg(Ventas_Un__suma=("Ventas_Un", "sum"), Ventas_Un__conteo=("Ventas_Un", "count"))
+        .reset_index()
+    )
+    return PerfilesEstacionales(
+        df_periodos,
+        columnas_llave=["concat_plu_producto"],
+        columna_grupo="Subcategoría",
+        columna_periodo="Mes",
+        columna_suma="Ventas_Un__suma",
+        columna_conteo="Ventas_Un__conteo",
+    )
+
+
+def _evento(inicio: str, promedio: float, perfiles: PerfilesEstacionales) -> pd.DataFrame:
+    df_evento = pd.DataFrame(
+        {
+            "concat_plu_producto": [MATERIAL],
+            "rango": ["10"],
+            "fecha_inicio": [pd.Timestamp(inicio)],
+            "fecha_fin": [pd.Timestamp(inicio) + pd.Timedelta(days=30)],
+            "Promedio Mes Und": [promedio],
+            "Precio de venta": [1000.0],
+        }
+    )
+    return utils.procesar_insumo(df_evento, 0, DICT_COLS, perfiles=perfiles)
+
+
+def test_p50_depende_del_mes_del_evento():
+    df_ventas = _ventas()
+    historial = HistorialDemanda(df_ventas, "concat_plu_producto", "Ventas_Un")
+    perfiles = _perfiles(df_ventas)
+    promedio = df_ventas["Ventas_Un"].mean()
+
+    p50 = {}
+    for mes, inicio in (("febrero", "2025-02-01"), ("diciembre", "2025-12-01")):
+        df_evento = _evento(inicio, promedio, perfiles)
+        simulacion = SimulacionMonteCarlo(
+            df_evento, historial, DICT_COLS, 0, n_simulaciones=20000, semilla=0
+        )
+        p50[mes] = simulacion.totales.loc["P50", MEDIDA_VENTA]
+        # El promedio histórico se conserva; el ajustado va en su propia columna
+        assert df_evento["Promedio Mes Und"].iloc[0] == promedio
+        assert np.isclose(
+            df_evento[utils.COLUMNA_PROMEDIO_ESTACIONAL].iloc[0],
+            promedio * df_evento[utils.COLUMNA_INDICE_ESTACIONAL].iloc[0],
+        )
+        # La media de las simulaciones es el promedio ajustado al mes, no el plano
+        esperado = df_evento["Venta de la actividad"].iloc[0]
+        assert abs(simulacion.por_evento[f"{MEDIDA_VENTA} P50"].iloc[0] - esperado) < (
+            0.25 * esperado
+        )
+
+    assert p50["diciembre"] > 2 * p50["febrero"]
+
+
+def test_sin_indice_estacional_usa_la_historia_plana():
+    df_ventas = _ventas()
+    historial = HistorialDemanda(df_ventas, "concat_plu_producto", "Ventas_Un")
+    promedio = df_ventas["Ventas_Un"].mean()
+
+    p50 = []
+    for inicio in ("2025-02-01", "2025-12-01"):
+        df_evento = _evento(inicio, promedio, perfiles=None)
+        simulacion = SimulacionMonteCarlo(
+            df_evento, historial, DICT_COLS, 0, n_simulaciones=2000, semilla=0
+        )
+        p50.append(simulacion.totales.loc["P50", MEDIDA_VENTA])
+
+    assert np.isclose(p50[0], p50[1])
@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ui_components.utils as utils
+from Controllers.config_loader import ConfigLoader
+from Controllers.sidebar_controller import ControladorBarraLateral
+from precalentar_cache import preparar_insumo
+from services.data_service import GestorDatos
+from services.motor_service import MOTORES, MotorDatos, obtener_motor
+
+# Motores que se comparan con el de referencia (pandas)
+OTROS_MOTORES = [nombre for nombre in MOTORES if nombre != MotorDatos.nombre]
+# Dependencia opcional de cada motor que no viene en requirements.txt
+DEPENDENCIAS_OPCIONALES = {"polars": "polars"}
+DIR_INSUMOS = os.path.join(os.path.dirname(__file__), "..", "Insumos", "")
+
+
+@pytest.fixture(params=OTROS_MOTORES)
+def nombre_motor(request) -> str:
+    dependencia = DEPENDENCIAS_OPCIONALES.get(request.param)
+    if dependencia is not None:
+        pytest.importorskip(dependencia)
+    return request.param
+
+
+@pytest.fixture
+def motor(nombre_motor) -> MotorDatos:
+    return obtener_motor(nombre_motor)
+
+
+# Casos que suelen separar a los motores: llaves nulas, grupos sin valores, llaves sin
+# precio, llaves nulas declaradas y llaves repetidas en el orden de entrada.
+DF_VENTAS = pd.DataFrame(
+    {
+        "grupo": pd.Categorical(["a", "b", None, "a", "c", "b", "c"]),
+        "codigo": ["1", "2", "3", "-", "9", "1", "2"],
+        "valor": [1.5, np.nan, 2.0, 3.25, np.nan, 4.0, np.nan],
+    },
+    index=[10, 11, 12, 13, 14, 15, 16],
+)
+DF_PRECIOS = pd.DataFrame(
+    {
+        "codigo": ["1", "2", "3", "-"],
+        "precio": [100.0, np.nan, 300.0, 0.0],
+        "linea": pd.Categorical(["x", "y", None, "z"]),
+    }
+)
+FILTROS = [
+    {"columna": "grupo", "valores": ["a", "c"], "incluir": True},
+    {"columna": "codigo", "valores": "9", "incluir": False},
+]
+AGREGACIONES = {"valor__suma": ("valor", "sum"), "valor__conteo": ("valor", "count")}
+
+
+def _igual_a_pandas(operacion, motor: MotorDatos) -> None:
+    pd.testing.assert_frame_equal(operacion(MotorDatos()), operacion(motor), check_exact=True)
+
+
+def test_filtrar_igual_a_pandas(motor):
+    _igual_a_pandas(lambda m: m.filtrar(DF_VENTAS, FILTROS, columnas=["grupo", "valor"]), motor)
+
+
+def test_agrupar_igual_a_pandas(motor):
+    # El orden de los grupos no forma parte del contrato de `agrupar`.
+    _igual_a_pandas(
+        lambda m: m.agrupar(DF_VENTAS, ["grupo"], AGREGACIONES).sort_values(
+            "grupo", ignore_index=True
+        ),
+        motor,
+    )
+
+
+def test_buscar_igual_a_pandas(motor):
+    indice = utils.construir_indice_unico(
+        DF_PRECIOS, ["codigo"], ["codigo", "precio", "linea"], claves_nulas=["-"]
+    )
+    _igual_a_pandas(lambda m: m.buscar(DF_VENTAS, indice, ["codigo"]), motor)
+
+
+@pytest.fixture(scope="module")
+def insumos() -> dict:
+    """Insumos de `Insumos/` con las mismas opciones de lectura de la app."""
+    cargador_config = ConfigLoader(utils=utils)
+    barra_lateral = ControladorBarraLateral(
+        cargador_config.cnf_lateral_var,
+        cargador_config.cnf_ingesta,
+        cargador_config.cnf_pipeline,
+    )
+    resultado = {}
+    for insumo, nom_archivo in (("precios", "Precios.xlsx"), ("ventas", "Base_vtas.xlsx")):
+        df = utils.lectura_simple_excel(DIR_INSUMOS, nom_archivo, nom_hoja=0)
+        resultado[insumo] = preparar_insumo(df, barra_lateral._obtener_opciones_lectura(insumo))
+    return resultado
+
+
+def _catalogo(insumos: dict, motor: str) -> pd.DataFrame:
+    cargador_config = ConfigLoader(utils=utils)
+    cargador_config.cnf_ingesta.get("catalogo", {})["habilitado"] = False
+    cargador_config.cnf_ingesta.get("agregacion", {})["persistir"] = False
+    cargador_config.cnf_pipeline["motor"] = motor
+    gestor_datos = GestorDatos(cargador_config)
+    gestor_datos.procesar_dfs_insumos(insumos["precios"], insumos["ventas"])
+    return gestor_datos.df_prec_vtas_procesado
+
+
+def test_catalogo_igual_a_pandas(insumos, nombre_motor):
+    pd.testing.assert_frame_equal(
+        _catalogo(insumos, MotorDatos.nombre), _catalogo(insumos, nombre_motor), check_exact=True
+    )
@@ -1,10 +1,29 @@
 from datetime import datetime
 from io import BytesIO
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+import os
+import time
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import st_file_uploader as stf
 import pandas as pd
 from datetime import datetime
+from loguru import logger
 from typing import Any, Optional, Tuple, List, Union
+import ui_components.utils as utils
+from services.almacen_service import AlmacenDataFrames
+from services.cache_service import (
+    CacheSnapshots,
+    calcular_digest,
+    calcular_huella_rapida,
+    construir_clave_snapshot,
+)
 
 
 def add_key_ss_st(clave: str, valor_inicial: Any) -> None:
@@ -282,19 +301,224 @@ class MultiVisibilityController:
         return st.session_state.get(vis_key, False)
 
 
-@st.cache_data
-def leer_archivo_cacheado(
-    nombre: str, bytes_archivo: bytes, tipo: str, usecols=None
+def clave_snapshot_lectura(
+    digest: str,
+    tipo: str,
+    usecols=None,
+    filtros: Optional[List[dict]] = None,
+    esquema: Optional[dict] = None,
+    opciones_csv: Optional[dict] = None,
+    compactacion: Optional[dict] = None,
+) -> str:
+    """
+    Clave del snapshot en disco de un archivo leído con una especificación dada.
+
+    Se expone para que procesos externos (ver `precalentar_cache.py`) puedan dejar
+    listo el snapshot que la aplicación buscará al cargar el mismo archivo.
+    """
+    return construir_clave_snapshot(
+        digest,
+        tipo=tipo,
+        usecols=usecols,
+        dtype=esquema or "str",
+        filtros=filtros,
+        csv=opciones_csv if tipo == "csv" else None,
+        compactacion=compactacion,
+    )
+
+
+def _leer_archivo(
+    bytes_archivo: bytes,
+    tipo: str,
+    usecols=None,
+    dir_cache: Optional[str] = None,
+    filtros: Optional[List[dict]] = None,
+    streaming: bool = False,
+    esquema: Optional[dict] = None,
+    digest: Optional[str] = None,
+    opciones_csv: Optional[dict] = None,
+    compactacion: Optional[dict] = None,
+    max_mb_cache: Optional[float] = None,
 ) -> pd.DataFrame:
-    """Lee un archivo como DataFrame con cache de Streamlit."""
+    """
+    Interpreta el contenido de un archivo como DataFrame (sin cache en memoria).
+
+    Si se indica `dir_cache`, se consulta primero un snapshot Parquet en disco
+    direccionado por el contenido del archivo y la especificación de lectura, de modo
+    que el archivo no se vuelve a interpretar tras un reinicio. Con `max_mb_cache` la
+    carpeta se poda al guardar (ver `CacheSnapshots.podar`).
+
+    Con `streaming=True` los .xlsx se recorren fila a fila en modo solo lectura,
+    conservando solo `usecols` y aplicando `filtros` durante la lectura.
+
+    Los .csv se leen con pyarrow respetando las mismas columnas, filtros y esquema que
+    los .xlsx (ver `utils.lectura_csv_arrow`), con `opciones_csv` para el separador y
+    la lectura por bloques de archivos grandes.
+
+    El `esquema` de tipos se aplica una única vez aquí; el snapshot en disco
+    guarda el DataFrame ya tipado. Con `compactacion` (argumentos de
+    `utils.compactar_dataframe`) las columnas no declaradas en el esquema se reducen
+    a categorías y tipos numéricos más angostos antes de guardar el snapshot.
+    """
+    cache_disco = CacheSnapshots(dir_cache, max_mb=max_mb_cache) if dir_cache else None
+    if cache_disco is not None:
+        clave = clave_snapshot_lectura(
+            digest or calcular_digest(bytes_archivo),
+            tipo,
+            usecols,
+            filtros,
+            esquema,
+            opciones_csv,
+            compactacion,
+        )
+        df_snapshot = cache_disco.leer(clave)
+        if df_snapshot is not None:
+            return df_snapshot
+
     buffer = BytesIO(bytes_archivo)
     if tipo == "csv":
-        return pd.read_csv(buffer)
+        opciones_csv = opciones_csv or {}
+        umbral = opciones_csv.get("umbral_bloques_mb", 0) * 1024 * 1024
+        df = utils.lectura_csv_arrow(
+            buffer,
+            columnas=usecols,
+            filtros=filtros,
+            esquema=esquema,
+            separador=opciones_csv.get("separador", ","),
+            tamano_bloque=(
+                opciones_csv.get("tamano_bloque_mb", 16) * 1024 * 1024
+                if umbral and len(bytes_archivo) > umbral
+                else None
+            ),
+        )
+    elif tipo == "xlsx" and streaming:
+        df = utils.lectura_excel_streaming(buffer, columnas=usecols, filtros=filtros)
     elif tipo == "xlsx":
-        return pd.read_excel(buffer, dtype=str, engine="openpyxl", usecols=usecols)
+        df = pd.read_excel(buffer, dtype=str, engine="openpyxl", usecols=usecols)
+        df = utils.aplicar_filtros(df, filtros)
     else:
         return pd.DataFrame()
 
+    df = utils.aplicar_esquema(df, esquema)
+    if compactacion is not None:
+        df = utils.compactar_dataframe(df, **compactacion)
+    if cache_disco is not None:
+        cache_disco.guardar(clave, df)
+    return df
+
+
+@st.cache_data
+def leer_archivo_cacheado(
+    nombre: str,
+    bytes_archivo: bytes,
+    tipo: str,
+    usecols=None,
+    dir_cache: Optional[str] = None,
+    filtros: Optional[List[dict]] = None,
+    streaming: bool = False,
+    esquema: Optional[dict] = None,
+    opciones_csv: Optional[dict] = None,
+    compactacion: Optional[dict] = None,
+    max_mb_cache: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Lee un archivo como DataFrame con cache de Streamlit.
+
+    La entrada del cache se resuelve hasheando `bytes_archivo` completo; para archivos
+    cargados en la interfaz es preferible `leer_archivo_por_huella`.
+    """
+    return _leer_archivo(
+        bytes_archivo,
+        tipo,
+        usecols,
+        dir_cache,
+        filtros,
+        streaming,
+        esquema,
+        opciones_csv=opciones_csv,
+        compactacion=compactacion,
+        max_mb_cache=max_mb_cache,
+    )
+
+
+def leer_archivo_por_huella(
+    huella: str,
+    nombre: str,
+    tipo: str,
+    _bytes_archivo: bytes,
+    usecols=None,
+    dir_cache: Optional[str] = None,
+    filtros: Optional[List[dict]] = None,
+    streaming: bool = False,
+    esquema: Optional[dict] = None,
+    digest: Optional[str] = None,
+    opciones_csv: Optional[dict] = None,
+    compactacion: Optional[dict] = None,
+    max_mb_cache: Optional[float] = None,
+    _ejecutor: Optional[Executor] = None,
+) -> pd.DataFrame:
+    """
+    Lee un archivo cargado como DataFrame.
+
+    No hay cache de Streamlit en esta lectura: los DataFrames ya leídos se comparten
+    entre reruns y sesiones a través del almacén de DataFrames (ver
+    `obtener_almacen_dataframes`), que los libera cuando ninguna sesión los usa. Aquí
+    solo se consulta el snapshot en disco antes de interpretar el archivo.
+
+    Args:
+        huella (str): Huella de la carga (ver `calcular_huella_rapida`) o digest del contenido.
+        nombre (str): Nombre del archivo.
+        tipo (str): Extensión del archivo ("csv" o "xlsx").
+        _bytes_archivo (bytes): Contenido del archivo.
+        digest (str, opcional): Digest del contenido ya calculado, reutilizado por el
+            cache en disco.
+        _ejecutor (Executor, opcional): Pool de procesos donde se interpretan los formatos
+            cuyo lector no libera el GIL (openpyxl). Si falla, se lee en el hilo actual.
+    """
+    argumentos = (
+        _bytes_archivo,
+        tipo,
+        usecols,
+        dir_cache,
+        filtros,
+        streaming,
+        esquema,
+        digest,
+        opciones_csv,
+        compactacion,
+        max_mb_cache,
+    )
+    if _ejecutor is not None and tipo not in TIPOS_LIBERAN_GIL:
+        try:
+            return _ejecutor.submit(_leer_archivo, *argumentos).result()
+        except BrokenExecutor as e:
+            logger.warning(f"Pool de procesos no disponible, lectura en hilo: {e}")
+            _obtener_pool_procesos.clear()
+    return _leer_archivo(*argumentos)
+
+
+# Formatos cuyo lector libera el GIL (pyarrow) y por tanto se paralelizan con hilos;
+# el resto (openpyxl, Python puro) se interpreta en un pool de procesos.
+TIPOS_LIBERAN_GIL = {"csv"}
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_almacen_dataframes() -> AlmacenDataFrames:
+    """Almacén de DataFrames compartido por todas las sesiones del proceso."""
+    return AlmacenDataFrames()
+
+
+@st.cache_resource(show_spinner=False)
+def _obtener_pool_procesos(max_procesos: int) -> ProcessPoolExecutor:
+    """Pool de procesos compartido por todas las sesiones para interpretar archivos."""
+    return ProcessPoolExecutor(max_workers=max_procesos)
+
+
+def _contenido_archivo(archivo) -> bytes:
+    """Retorna el contenido de un archivo cargado evitando copias cuando es posible."""
+    datos = getattr(archivo, "data", None)
+    return datos if isinstance(datos, bytes) else archivo.getvalue()
+
 
 class FileUploaderManager:
     """
@@ -313,12 +537,28 @@ class FileUploaderManager:
         icon: str = "MdFileUpload",
         usar_sidebar: bool = False,
         use_cols: Optional[List[str]] = None,
+        dir_cache: Optional[str] = None,
+        filtros: Optional[List[dict]] = None,
+        streaming: bool = False,
+        esquema: Optional[dict] = None,
+        usar_digest: bool = True,
+        opciones_csv: Optional[dict] = None,
+        compactacion: Optional[dict] = None,
+        max_mb_cache: Optional[float] = None,
     ):
         self.clave = clave
         self.tipo_archivos = tipo_archivos
         self.usar_sidebar = usar_sidebar
         self.titulo = titulo
         self.use_cols = use_cols
+        self.dir_cache = dir_cache
+        self.filtros = filtros
+        self.streaming = streaming
+        self.esquema = esquema
+        self.usar_digest = usar_digest
+        self.opciones_csv = opciones_csv
+        self.compactacion = compactacion
+        self.max_mb_cache = max_mb_cache
 
         # NO eliminar: componente personalizado de uploader
         self.uploader = stf.create_custom_uploader(
@@ -329,6 +569,11 @@ class FileUploaderManager:
         )
 
         self.archivos = self._mostrar_uploader()
+        self.huellas_actuales = []
+        self.nombres_actuales = []
+        self.digests_actuales = []
+        # Claves en el almacén de DataFrames de los archivos cargados actualmente
+        self.claves_almacen_actuales = []
 
     def _mostrar_uploader(self) -> List[st.runtime.uploaded_file_manager.UploadedFile]:
         """
@@ -370,40 +615,295 @@ class FileUploaderManager:
     def uploaded_files(self) -> bool:
         return bool(self.archivos)
 
-    def leer_archivos(self) -> List[pd.DataFrame]:
+    def _preparar_lecturas(self) -> List[dict]:
         """
-        Lee los archivos cargados como DataFrames si son .csv o .xlsx (con cache).
+        Identifica cada archivo cargado y resuelve los que ya fueron leídos en la sesión.
+
+        Cada archivo se identifica por una huella rápida (id de carga, nombre, tamaño y
+        una muestra de los bytes). Si el uploader no asigna id de carga la huella se
+        deriva del digest de todo el contenido, que se calcula una sola vez por rerun y
+        se reutiliza como digest. Si `usar_digest` está activo, el digest completo del
+        contenido se calcula una sola vez por huella y se conserva en session_state.
+
+        Los DataFrames viven en el almacén compartido del proceso; la sesión solo guarda
+        en `<clave>_dfs` un manejador por huella. En los reruns se reutiliza el
+        manejador, y si otra sesión ya leyó el mismo contenido con la misma
+        especificación se comparte su DataFrame sin volver a leerlo.
 
         Returns:
-            List[pd.DataFrame]
+            List[dict]: Una tarea por archivo con `nombre`, `huella`, `df` (si ya está
+            resuelto), `manejador`, `clave_almacen`, `error` y los `argumentos` para
+            `leer_archivo_por_huella`.
         """
-        dataframes = []
+        digests = st.session_state.setdefault(f"{self.clave}_digests", {})
+        manejadores = st.session_state.get(f"{self.clave}_dfs", {})
+        almacen = obtener_almacen_dataframes()
+
+        tareas = []
         for archivo in self.archivos:
+            nombre = getattr(archivo, "name", None)
+            tarea = {
+                "nombre": nombre or "Archivo desconocido",
+                "huella": None,
+                "df": None,
+                "manejador": None,
+                "clave_almacen": None,
+                "error": None,
+            }
+            tareas.append(tarea)
             try:
-                nombre = getattr(archivo, "name", None)
                 if nombre is None:
                     raise ValueError("Archivo sin nombre válido")
 
-                tipo = nombre.split(".")[-1].lower()
-                bytes_archivo = archivo.read()
+                bytes_archivo = _contenido_archivo(archivo)
+                id_carga = getattr(archivo, "file_id", None)
+                # Sin id de carga la huella recorre todo el contenido: se parte del
+                # digest, que sirve también como digest de la carga.
+                digest_contenido = calcular_digest(bytes_archivo) if id_carga is None else None
+                huella = calcular_huella_rapida(
+                    nombre=nombre,
+                    contenido=bytes_archivo,
+                    id_carga=id_carga,
+                    digest=digest_contenido,
+                )
+                tarea["huella"] = huella
+
+                if huella in manejadores:
+                    tarea["manejador"] = manejadores[huella]
+                    tarea["clave_almacen"] = tarea["manejador"].clave
+                    tarea["df"] = tarea["manejador"].df
+                    continue
 
-                df = leer_archivo_cacheado(
+                digest = None
+                if self.usar_digest:
+                    if huella not in digests:
+                        digests[huella] = digest_contenido or calcular_digest(bytes_archivo)
+                    digest = digests[huella]
+
+                tipo = nombre.split(".")[-1].lower()
+                tarea["clave_almacen"] = clave_snapshot_lectura(
+                    digest or huella,
+                    tipo,
+                    self.use_cols,
+                    self.filtros,
+                    self.esquema,
+                    self.opciones_csv,
+                    self.compactacion,
+                )
+                manejador = almacen.obtener(tarea["clave_almacen"])
+                if manejador is not None:
+                    # Otra sesión ya leyó este mismo contenido
+                    tarea["manejador"] = manejador
+                    tarea["df"] = manejador.df
+                    continue
+
+                tarea["argumentos"] = dict(
+                    huella=digest or huella,
                     nombre=nombre,
-                    bytes_archivo=bytes_archivo,
                     tipo=tipo,
+                    _bytes_archivo=bytes_archivo,
                     usecols=self.use_cols,
+                    dir_cache=self.dir_cache,
+                    filtros=self.filtros,
+                    streaming=self.streaming,
+                    esquema=self.esquema,
+                    digest=digest,
+                    opciones_csv=self.opciones_csv,
+                    compactacion=self.compactacion,
+                    max_mb_cache=self.max_mb_cache,
                 )
-                dataframes.append(df)
-
             except Exception as e:
-                nombre = getattr(archivo, "name", "Archivo desconocido")
-                st.error(f"❌ Error leyendo {nombre}: {e}")
+                tarea["error"] = e
+        return tareas
+
+    def _registrar_resultados(self, tareas: List[dict], inicio: float) -> List[pd.DataFrame]:
+        """
+        Conserva en session_state los DataFrames resueltos, informa los errores y
+        registra el tiempo total de resolución en `st.session_state["<clave>_ms_lectura"]`.
+
+        Args:
+            tareas (List[dict]): Tareas devueltas por `_preparar_lecturas` ya ejecutadas.
+            inicio (float): Marca de tiempo (perf_counter) del inicio de la lectura.
+
+        Returns:
+            List[pd.DataFrame]
+        """
+        almacen = obtener_almacen_dataframes()
+        dataframes = []
+        manejadores_actuales = {}
+        self.nombres_actuales = []
+        for tarea in tareas:
+            if tarea["error"] is not None:
+                st.error(f"❌ Error leyendo {tarea['nombre']}: {tarea['error']}")
+                continue
+            if tarea["manejador"] is None:
+                tarea["manejador"] = almacen.registrar(tarea["clave_almacen"], tarea["df"])
+                tarea["df"] = tarea["manejador"].df
+            manejadores_actuales[tarea["huella"]] = tarea["manejador"]
+            dataframes.append(tarea["df"])
+            self.nombres_actuales.append(tarea["nombre"])
+        self.huellas_actuales = list(manejadores_actuales)
+        self.claves_almacen_actuales = [m.clave for m in manejadores_actuales.values()]
+        digests = st.session_state.get(f"{self.clave}_digests", {})
+        self.digests_actuales = [digests.get(huella) for huella in self.huellas_actuales]
+
+        # Solo se conservan los manejadores de los archivos cargados actualmente; los
+        # DataFrames que ya no use ninguna sesión se liberan del almacén.
+        st.session_state[f"{self.clave}_dfs"] = manejadores_actuales
+
+        ms_lectura = (time.perf_counter() - inicio) * 1000
+        st.session_state[f"{self.clave}_ms_lectura"] = ms_lectura
+        logger.debug(f"Resolución de archivos '{self.clave}': {ms_lectura:.2f} ms")
         return dataframes
 
+    def leer_archivos(self) -> List[pd.DataFrame]:
+        """
+        Lee los archivos cargados como DataFrames si son .csv o .xlsx (con cache).
+
+        Returns:
+            List[pd.DataFrame]
+        """
+        inicio = time.perf_counter()
+        tareas = self._preparar_lecturas()
+        for tarea in tareas:
+            if tarea["df"] is None and tarea["error"] is None:
+                _ejecutar_tarea_lectura(tarea)
+        return self._registrar_resultados(tareas, inicio)
+
+    def combinar_dataframes(self, dataframes: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """
+        Combina en un solo DataFrame los archivos cargados, validando que compartan esquema.
+
+        La combinación se guarda en el almacén compartido (otra sesión con los mismos
+        archivos la reutiliza) y la sesión conserva su manejador junto con las huellas de
+        sus archivos: si en un rerun solo se agregaron archivos nuevos al final, estos se
+        anexan al resultado previo sin volver a leer ni concatenar los ya cargados.
+
+        Args:
+            dataframes (List[pd.DataFrame]): Resultado de `leer_archivos` o
+                `leer_archivos_concurrentes` para este cargador.
+
+        Returns:
+            Optional[pd.DataFrame]: DataFrame combinado, o None si no hay archivos válidos.
+        """
+        if not dataframes:
+            return None
+        if len(dataframes) == 1:
+            return dataframes[0]
+
+        huellas = tuple(self.huellas_actuales)
+        clave_combinado = f"{self.clave}_combinado"
+        previo = st.session_state.get(clave_combinado)
+
+        if previo is not None and previo["huellas"] == huellas:
+            return previo["manejador"].df
+
+        almacen = obtener_almacen_dataframes()
+        clave_almacen = construir_clave_snapshot(
+            "combinado", partes=self.claves_almacen_actuales
+        )
+        manejador = almacen.obtener(clave_almacen)
+        if manejador is None:
+            nombres = self.nombres_actuales
+            if previo is not None and huellas[: len(previo["huellas"])] == previo["huellas"]:
+                n_previos = len(previo["huellas"])
+                partes = [previo["manejador"].df] + dataframes[n_previos:]
+                nombres = ["archivos ya cargados"] + nombres[n_previos:]
+            else:
+                partes = dataframes
+
+            try:
+                combinado = utils.concatenar_mismo_esquema(partes, nombres)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return None
+            manejador = almacen.registrar(clave_almacen, combinado)
+
+        st.session_state[clave_combinado] = {"huellas": huellas, "manejador": manejador}
+        return manejador.df
+
     def reset(self) -> None:
         st.session_state[f"{self.clave}_reset"] = True
 
 
+def _ejecutar_tarea_lectura(tarea: dict, ejecutor: Optional[Executor] = None) -> dict:
+    """Ejecuta la lectura pendiente de una tarea, registrando resultado, error y duración."""
+    inicio = time.perf_counter()
+    try:
+        tarea["df"] = leer_archivo_por_huella(**tarea["argumentos"], _ejecutor=ejecutor)
+    except Exception as e:
+        tarea["error"] = e
+    tarea["segundos"] = time.perf_counter() - inicio
+    return tarea
+
+
+def leer_archivos_concurrentes(
+    gestores: List[FileUploaderManager],
+    usar_procesos: bool = True,
+    max_procesos: int = 2,
+) -> List[List[pd.DataFrame]]:
+    """
+    Lee en paralelo los archivos pendientes de varios cargadores, de modo que la primera
+    carga tarde lo que el archivo más lento y no la suma de todos.
+
+    Cada lectura pendiente se lanza en un hilo; los .xlsx (openpyxl no libera el GIL) se
+    interpretan además en un pool de procesos, mientras que los .csv (pyarrow) se leen
+    directamente en el hilo. El avance de cada archivo se muestra en la barra lateral.
+
+    Args:
+        gestores (List[FileUploaderManager]): Cargadores cuyos archivos se leerán.
+        usar_procesos (bool): Si False, todo se interpreta con hilos.
+        max_procesos (int): Tamaño del pool de procesos compartido.
+
+    Returns:
+        List[List[pd.DataFrame]]: DataFrames de cada cargador, en el mismo orden.
+    """
+    inicio = time.perf_counter()
+    tareas_por_gestor = [gestor._preparar_lecturas() for gestor in gestores]
+    pendientes = [
+        tarea
+        for tareas in tareas_por_gestor
+        for tarea in tareas
+        if tarea["df"] is None and tarea["error"] is None
+    ]
+
+    if pendientes:
+        # Con un solo núcleo el pool de procesos solo agregaría costo de serialización
+        usar_procesos = usar_procesos and (os.cpu_count() or 1) > 1
+        ejecutor = _obtener_pool_procesos(max_procesos) if usar_procesos else None
+        avisos = []
+        for tarea in pendientes:
+            aviso = st.sidebar.empty()
+            aviso.info(f"⏳ Leyendo {tarea['nombre']}...")
+            avisos.append(aviso)
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(pendientes), 8),
+            initializer=add_script_run_ctx,
+            initargs=(None, get_script_run_ctx()),
+        ) as hilos:
+            futuros = {
+                hilos.submit(_ejecutar_tarea_lectura, tarea, ejecutor): aviso
+                for tarea, aviso in zip(pendientes, avisos)
+            }
+            for futuro in as_completed(futuros):
+                tarea, aviso = futuro.result(), futuros[futuro]
+                if tarea["error"] is None:
+                    aviso.success(f"✅ {tarea['nombre']} leído en {tarea['segundos']:.1f} s")
+                else:
+                    aviso.empty()
+
+        logger.info(
+            f"Lectura concurrente de {len(pendientes)} archivos: "
+            f"{time.perf_counter() - inicio:.2f} s"
+        )
+
+    return [
+        gestor._registrar_resultados(tareas, inicio)
+        for gestor, tareas in zip(gestores, tareas_por_gestor)
+    ]
+
+
 class SelectBoxManager:
     """
     Maneja un selectbox en Streamlit con soporte para placeholder,
@@ -654,7 +1154,7 @@ class SelectorFechasEvento:
         fecha_inicio (date): Fecha seleccionada de inicio.
         fecha_fin (date): Fecha seleccionada de fin.
         dias (int): Número de días entre inicio y fin, ambos inclusive.
-        mes (str): Mes capitalizado de la fecha de inicio.
+        mes (str): Mes de la fecha de inicio, en español.
         es_valido (bool): Si el rango de fechas es válido.
         confirmado (bool): Si el usuario confirmó el rango de fechas.
     """
@@ -687,7 +1187,7 @@ class SelectorFechasEvento:
             return
 
         self.dias = (self.fecha_fin - self.fecha_inicio).days + 1
-        self.mes = self.fecha_inicio.strftime("%B").capitalize()
+        self.mes = utils.MESES_ES[self.fecha_inicio.month - 1]
         self.es_valido = True
 
     def obtener_resultado(self):
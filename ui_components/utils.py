@@ -3,8 +3,12 @@ import os
 import numpy as np
 import streamlit as st
 from loguru import logger
-from typing import List, Union, Literal
+from typing import Callable, List, Union, Literal
 import yaml
+import openpyxl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 import requests
 from io import BytesIO
 from datetime import date
@@ -34,7 +38,7 @@ def procesar_configuracion(nom_archivo_configuracion: str) -> dict:
 
 
 def lectura_simple_excel(
-    dir_insumo: str, nom_insumo: str, nom_hoja: str = None
+    dir_insumo: str, nom_insumo: str, nom_hoja: str = None, esquema: dict = None
 ) -> pd.DataFrame:
     """
     Lee un archivo de Excel y devuelve su contenido en un DataFrame.
@@ -43,6 +47,7 @@ def lectura_simple_excel(
         dir_insumo (str): Ruta del directorio donde se encuentra el archivo.
         nom_insumo (str): Nombre del archivo de Excel (incluyendo la extensión).
         nom_hoja (str): Nombre de la hoja a leer dentro del archivo de Excel.
+        esquema (dict, opcional): Tipos por columna a aplicar tras la lectura (ver `aplicar_esquema`).
 
     Returns:
         pd.DataFrame: Contenido de la hoja de Excel como un DataFrame.
@@ -58,6 +63,8 @@ def lectura_simple_excel(
             sheet_name=nom_hoja,
             dtype=str,
         )
+        if esquema and isinstance(base_leida, pd.DataFrame):
+            base_leida = aplicar_esquema(base_leida, esquema)
         logger.success(f"Lectura simple de {nom_insumo} realizada con éxito")
         return base_leida
     except Exception as e:
@@ -65,6 +72,499 @@ def lectura_simple_excel(
         raise Exception(f"Error al leer el archivo: {e}")
 
 
+# Textos que pandas interpreta como nulos por defecto al leer un Excel.
+VALORES_NULOS_EXCEL = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+}
+
+
+def _celda_a_texto(valor) -> str | None:
+    """Convierte el valor de una celda de openpyxl al texto que produciría `dtype=str`."""
+    if valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    texto = str(valor)
+    return None if texto in VALORES_NULOS_EXCEL else texto
+
+
+def lectura_excel_streaming(
+    origen,
+    columnas: List[str] | None = None,
+    filtros: List[dict] | None = None,
+    nom_hoja: str | None = None,
+) -> pd.DataFrame:
+    """
+    Lee una hoja de Excel fila a fila en modo solo lectura, conservando únicamente las
+    columnas indicadas y descartando durante la lectura las filas que no cumplen los filtros.
+
+    Las filas rechazadas nunca llegan a construirse en el DataFrame, por lo que el consumo
+    de memoria depende de las filas y columnas conservadas y no del tamaño del archivo.
+    El resultado es equivalente a `pd.read_excel(..., dtype=str)` seguido de los filtros.
+
+    Args:
+        origen (str | BytesIO): Ruta o buffer del archivo .xlsx.
+        columnas (list[str], opcional): Columnas a conservar. Si es None se conservan todas.
+        filtros (list[dict], opcional): Predicados con claves `columna`, `valores` e `incluir`
+            (True para conservar los valores indicados, False para excluirlos).
+        nom_hoja (str, opcional): Hoja a leer. Por defecto la primera.
+
+    Returns:
+        pd.DataFrame: Filas y columnas seleccionadas como texto.
+
+    Raises:
+        KeyError: Si alguna columna de `columnas` o de `filtros` no existe en la hoja.
+    """
+    libro = openpyxl.load_workbook(origen, read_only=True, data_only=True)
+    try:
+        hoja = libro[nom_hoja] if nom_hoja else libro.worksheets[0]
+        filas = hoja.iter_rows(values_only=True)
+
+        encabezado = next(filas, None) or ()
+        encabezado = [
+            str(c) if c is not None else f"Unnamed: {i}"
+            for i, c in enumerate(encabezado)
+        ]
+        columnas = list(columnas) if columnas else encabezado
+
+        faltantes = [
+            c
+            for c in columnas + [f["columna"] for f in filtros or []]
+            if c not in encabezado
+        ]
+        if faltantes:
+            raise KeyError(f"Columnas no encontradas en la hoja: {faltantes}")
+
+        indices = [encabezado.index(c) for c in columnas]
+        predicados = [
+            (
+                encabezado.index(f["columna"]),
+                {str(v) for v in f["valores"]},
+                f.get("incluir", True),
+            )
+            for f in filtros or []
+        ]
+        datos = [[] for _ in columnas]
+        descartadas = 0
+
+        for fila in filas:
+            if all(v is None for v in fila):
+                continue
+            # openpyxl omite las celdas vacías al final de la fila: faltan como None.
+            if not all(
+                (_celda_a_texto(fila[i] if i < len(fila) else None) in valores) == incluir
+                for i, valores, incluir in predicados
+            ):
+                descartadas += 1
+                continue
+            for lista, i in zip(datos, indices):
+                lista.append(_celda_a_texto(fila[i]) if i < len(fila) else None)
+    finally:
+        libro.close()
+
+    df = pd.DataFrame(dict(zip(columnas, datos)), columns=columnas, dtype=object)
+    logger.info(
+        f"Lectura streaming: {len(df)} filas conservadas, {descartadas} descartadas por filtros."
+    )
+    return df
+
+
+def lectura_csv_arrow(
+    origen,
+    columnas: List[str] | None = None,
+    filtros: List[dict] | None = None,
+    esquema: dict | None = None,
+    separador: str = ",",
+    tamano_bloque: int | None = None,
+) -> pd.DataFrame:
+    """
+    Lee un CSV con el lector multihilo de pyarrow, con la misma selección de columnas,
+    filtros y esquema de tipos que la lectura de Excel, de modo que ambos formatos
+    producen DataFrames idénticos.
+
+    Las columnas se leen como texto (igual que `dtype=str` en Excel), salvo las declaradas
+    como float en el esquema, que pyarrow interpreta directamente. Con `tamano_bloque`
+    el archivo se procesa por bloques y los filtros se aplican a cada bloque antes de
+    acumularlo, acotando la memoria en exportaciones muy grandes.
+
+    Args:
+        origen (str | BytesIO): Ruta o buffer del archivo .csv.
+        columnas (list[str], opcional): Columnas a conservar. Si es None se conservan todas.
+        filtros (list[dict], opcional): Predicados con claves `columna`, `valores` e `incluir`.
+        esquema (dict, opcional): Tipos por columna (ver `aplicar_esquema`).
+        separador (str): Delimitador de campos.
+        tamano_bloque (int, opcional): Tamaño en bytes de cada bloque para lectura por partes.
+
+    Returns:
+        pd.DataFrame: DataFrame tipado según el esquema.
+    """
+    if columnas is None:
+        # Solo se interpreta el primer bloque para conocer los encabezados
+        columnas = pa_csv.open_csv(
+            origen, parse_options=pa_csv.ParseOptions(delimiter=separador)
+        ).schema.names
+        if hasattr(origen, "seek"):
+            origen.seek(0)
+
+    tipos = {columna: pa.string() for columna in columnas}
+    for columna, tipo in (esquema or {}).items():
+        if columna in tipos and tipo.startswith("float"):
+            tipos[columna] = pa.float64()
+
+    opciones = dict(
+        read_options=pa_csv.ReadOptions(block_size=tamano_bloque)
+        if tamano_bloque
+        else None,
+        parse_options=pa_csv.ParseOptions(delimiter=separador),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(columnas),
+            column_types=tipos,
+            null_values=sorted(VALORES_NULOS_EXCEL),
+            strings_can_be_null=True,
+        ),
+    )
+
+    if tamano_bloque:
+        lotes = [
+            aplicar_filtros(lote.to_pandas(), filtros)
+            for lote in pa_csv.open_csv(origen, **opciones)
+        ]
+        df = pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame(columns=columnas)
+        logger.info(f"Lectura CSV por bloques: {len(lotes)} bloques, {len(df)} filas.")
+    else:
+        df = aplicar_filtros(pa_csv.read_csv(origen, **opciones).to_pandas(), filtros)
+
+    return aplicar_esquema(df.reset_index(drop=True), esquema)
+
+
+def mascara_filtros(df: pd.DataFrame, filtros: List[dict]) -> np.ndarray:
+    """
+    Evalúa una lista de filtros declarados en configuración como una sola máscara.
+
+    Args:
+        df (pd.DataFrame): DataFrame a evaluar.
+        filtros (list[dict]): Predicados con claves `columna`, `valores` e `incluir`.
+
+    Returns:
+        np.ndarray: Máscara booleana con las filas que cumplen todos los predicados.
+    """
+    mascara = np.ones(len(df), dtype=bool)
+    for filtro in filtros:
+        valores = filtro["valores"]
+        if isinstance(valores, (str, int)):
+            valores = [valores]
+        coincide = df[filtro["columna"]].isin(valores).to_numpy()
+        mascara &= coincide if filtro.get("incluir", True) else ~coincide
+    return mascara
+
+
+def aplicar_filtros(
+    df: pd.DataFrame,
+    filtros: List[dict] | None,
+    columnas: List[str] | None = None,
+    evaluar: Callable[[pd.DataFrame, List[dict]], np.ndarray] = mascara_filtros,
+) -> pd.DataFrame:
+    """
+    Aplica una lista de filtros declarados en configuración.
+
+    Los predicados se combinan en una sola máscara, de modo que el DataFrame se recorta
+    una única vez sin importar cuántos filtros haya.
+
+    Args:
+        df (pd.DataFrame): DataFrame a filtrar.
+        filtros (list[dict]): Predicados con claves `columna`, `valores` e `incluir`.
+        columnas (list[str], opcional): Columnas a conservar en el mismo recorte.
+        evaluar (Callable, opcional): Función que calcula la máscara (ver
+            `motor_service.MotorDatos.mascara`); por defecto `mascara_filtros`.
+
+    Returns:
+        pd.DataFrame: DataFrame filtrado.
+    """
+    if columnas is not None:
+        conservar = set(columnas)
+        columnas = [c for c in df.columns if c in conservar]
+        if len(columnas) == len(df.columns):
+            columnas = None
+    if not filtros:
+        return df if columnas is None else df[columnas]
+
+    mascara = evaluar(df, filtros)
+    if mascara.all():
+        # Nada que descartar (p. ej. filtros ya aplicados en la lectura): sin recorte.
+        return df if columnas is None else df[columnas]
+    if columnas is None:
+        return df.loc[mascara]
+    return df.loc[mascara, columnas]
+
+
+def configurar_copy_on_write(habilitado: bool) -> None:
+    """
+    Activa o desactiva el modo copy-on-write de pandas para todo el proceso.
+
+    Con el modo activo, las selecciones de columnas, los `assign` y las copias
+    superficiales comparten memoria con el DataFrame de origen hasta que alguno de los
+    dos se modifica, en lugar de copiar los datos de inmediato.
+
+    Args:
+        habilitado (bool): Estado del modo.
+    """
+    pd.set_option("mode.copy_on_write", bool(habilitado))
+
+
+def asignar_columnas(df: pd.DataFrame, columnas: dict) -> pd.DataFrame:
+    """
+    Equivalente a `df.assign(**columnas)` sin copiar las columnas que no cambian.
+
+    Sin copy-on-write, `assign` copia todo el DataFrame antes de asignar. Aquí se parte
+    de una copia superficial y cada asignación reemplaza la columna solo en la copia,
+    así que el DataFrame original no se modifica en ningún modo.
+
+    Args:
+        df (pd.DataFrame): DataFrame de origen.
+        columnas (dict): Columnas nuevas o reemplazadas {nombre: valores}.
+
+    Returns:
+        pd.DataFrame: DataFrame con las columnas asignadas.
+    """
+    if not columnas:
+        return df
+    resultado = df.copy(deep=False)
+    for columna, valores in columnas.items():
+        resultado[columna] = valores
+    return resultado
+
+
+def _tiene_tipo(serie: pd.Series, tipo: str) -> bool:
+    """
+    Indica si una serie ya tiene el tipo de dato declarado en el esquema.
+
+    Un tipo numérico más angosto de la misma clase (p. ej. int8 para "int64", resultado
+    de `compactar_dataframe`) también cumple el esquema.
+    """
+    if tipo == "category":
+        return isinstance(serie.dtype, pd.CategoricalDtype)
+    if str(serie.dtype) == tipo:
+        return True
+    declarado = pd.api.types.pandas_dtype(tipo)
+    return (
+        isinstance(serie.dtype, np.dtype)
+        and isinstance(declarado, np.dtype)
+        and serie.dtype.kind == declarado.kind
+        and serie.dtype.kind in "iuf"
+        and serie.dtype.itemsize <= declarado.itemsize
+    )
+
+
+def aplicar_esquema(df: pd.DataFrame, esquema: dict | None) -> pd.DataFrame:
+    """
+    Convierte las columnas de un DataFrame a los tipos declarados en un esquema de configuración.
+
+    Las columnas que ya tienen el tipo declarado no se tocan, por lo que aplicar el mismo
+    esquema varias veces no vuelve a convertir los datos. Las columnas del esquema que no
+    existen en el DataFrame se ignoran.
+
+    Args:
+        df (pd.DataFrame): DataFrame leído (normalmente como texto).
+        esquema (dict): Diccionario {columna: tipo}, por ejemplo "float64", "category"
+            o "datetime64[s]".
+
+    Returns:
+        pd.DataFrame: DataFrame con las columnas tipadas.
+    """
+    conversiones = {}
+    for columna, tipo in (esquema or {}).items():
+        if columna not in df.columns or _tiene_tipo(df[columna], tipo):
+            continue
+
+        serie = df[columna]
+        if tipo.startswith("datetime64"):
+            try:
+                conversiones[columna] = serie.astype(tipo)
+            except (ValueError, TypeError):
+                conversiones[columna] = pd.to_datetime(serie, errors="coerce")
+        elif tipo.startswith(("float", "int", "uint")):
+            # astype interpreta el texto con precisión exacta; to_numeric solo se usa
+            # como respaldo para convertir a nulo los valores no numéricos ("-", etc.).
+            try:
+                numerica = serie.astype("float64")
+            except (ValueError, TypeError):
+                numerica = pd.to_numeric(serie, errors="coerce").astype("float64")
+            if tipo.startswith(("int", "uint")) and numerica.isna().any():
+                tipo = tipo.capitalize()  # entero con nulos (Int64, UInt8, ...)
+            conversiones[columna] = numerica.astype(tipo)
+        else:
+            conversiones[columna] = serie.astype(tipo)
+
+    if not conversiones:
+        return df
+
+    logger.info(f"Esquema aplicado a las columnas: {', '.join(conversiones)}")
+    return asignar_columnas(df, conversiones)
+
+
+def compactar_dataframe(
+    df: pd.DataFrame, umbral_categoria: float = 0.5, excluir: List[str] | None = None
+) -> pd.DataFrame:
+    """
+    Reduce la memoria de un DataFrame sin alterar sus valores.
+
+    - Las columnas de texto con pocos valores distintos (proporción de valores únicos
+      menor o igual a `umbral_categoria`) se convierten a categóricas.
+    - Los enteros se reducen al menor tipo que contiene su rango.
+    - Los flotantes pasan a float32 solo si todos sus valores se representan exactamente.
+
+    Args:
+        df (pd.DataFrame): DataFrame a compactar.
+        umbral_categoria (float): Proporción máxima de valores únicos para usar categoría.
+        excluir (list[str], opcional): Columnas que no se modifican.
+
+    Returns:
+        pd.DataFrame: DataFrame compactado (el original no se modifica).
+    """
+    excluir = set(excluir or [])
+    conversiones = {}
+    for columna in df.columns:
+        if columna in excluir or len(df) == 0:
+            continue
+        serie = df[columna]
+        tipo = serie.dtype
+
+        if tipo == object:
+            if serie.nunique(dropna=True) / len(serie) <= umbral_categoria:
+                conversiones[columna] = serie.astype("category")
+        elif isinstance(tipo, np.dtype) and tipo.kind in "iu":
+            reducida = pd.to_numeric(serie, downcast="integer" if tipo.kind == "i" else "unsigned")
+            if reducida.dtype != tipo:
+                conversiones[columna] = reducida
+        elif tipo == np.float64:
+            reducida = serie.astype(np.float32)
+            if np.array_equal(
+                reducida.to_numpy(dtype=np.float64), serie.to_numpy(), equal_nan=True
+            ):
+                conversiones[columna] = reducida
+
+    if not conversiones:
+        return df
+
+    logger.info(f"Columnas compactadas: {', '.join(conversiones)}")
+    return asignar_columnas(df, conversiones)
+
+
+def memoria_dataframe(df: pd.DataFrame) -> int:
+    """Retorna los bytes que ocupa un DataFrame, incluyendo el contenido de los textos."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def rellenar_nulos(df: pd.DataFrame, columnas: List[str], valor: str) -> pd.DataFrame:
+    """
+    Reemplaza los nulos de las columnas indicadas, incluyendo columnas categóricas
+    (a las que se agrega `valor` como categoría cuando hace falta).
+
+    Args:
+        df (pd.DataFrame): DataFrame a tratar.
+        columnas (list[str]): Columnas en las que se reemplazan los nulos.
+        valor (str): Valor de reemplazo.
+
+    Returns:
+        pd.DataFrame: DataFrame con los nulos reemplazados.
+    """
+    rellenas = {}
+    for columna in columnas:
+        serie = df[columna]
+        if not serie.isna().any():
+            continue
+        if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+            serie = serie.cat.add_categories([valor])
+        rellenas[columna] = serie.fillna(valor)
+
+    return asignar_columnas(df, rellenas)
+
+
+def _tipo_comun(tipos: List) -> object:
+    """
+    Tipo con el que pueden concatenarse columnas de distintos DataFrames, o None si
+    no son compatibles.
+
+    Una mezcla de categóricas y texto se concatena como categoría (la compactación
+    decide por archivo según su cardinalidad) y los números de la misma clase con
+    distinto ancho se llevan al más amplio.
+    """
+    if all(isinstance(t, pd.CategoricalDtype) or t == object for t in tipos):
+        if any(isinstance(t, pd.CategoricalDtype) for t in tipos):
+            return "category"
+        return tipos[0]
+    if all(isinstance(t, np.dtype) for t in tipos):
+        clases = {t.kind for t in tipos}
+        if len(clases) == 1 and clases <= set("iuf"):
+            return np.result_type(*tipos)
+    if all(t == tipos[0] for t in tipos):
+        return tipos[0]
+    return None
+
+
+def concatenar_mismo_esquema(
+    dfs: List[pd.DataFrame], nombres: List[str] | None = None
+) -> pd.DataFrame:
+    """
+    Valida que varios DataFrames compartan el mismo esquema y los concatena en una sola pasada.
+
+    Las columnas categóricas se unifican a la unión de sus categorías antes de concatenar,
+    para que el resultado conserve el tipo categórico en lugar de degradarse a object.
+
+    Args:
+        dfs (list[pd.DataFrame]): DataFrames a concatenar (al menos uno).
+        nombres (list[str], opcional): Nombre de cada DataFrame, usado en los mensajes de error.
+
+    Returns:
+        pd.DataFrame: DataFrame concatenado con índice continuo.
+
+    Raises:
+        ValueError: Si algún DataFrame difiere en columnas o tipos del primero.
+    """
+    nombres = nombres or [f"archivo {i + 1}" for i in range(len(dfs))]
+    base = dfs[0]
+
+    for df, nombre in zip(dfs[1:], nombres[1:]):
+        faltantes = [c for c in base.columns if c not in df.columns]
+        sobrantes = [c for c in df.columns if c not in base.columns]
+        if faltantes or sobrantes:
+            raise ValueError(
+                f"'{nombre}' no coincide con el esquema de '{nombres[0]}'. "
+                f"Faltan: {faltantes}. Sobran: {sobrantes}."
+            )
+        distintos = [
+            c for c in base.columns if _tipo_comun([base[c].dtype, df[c].dtype]) is None
+        ]
+        if distintos:
+            raise ValueError(
+                f"'{nombre}' tiene tipos distintos a '{nombres[0]}' en: {distintos}."
+            )
+
+    unificadas = {}
+    for columna in base.columns:
+        tipos = [df[columna].dtype for df in dfs]
+        tipo = _tipo_comun(tipos)
+        if tipo is None:
+            raise ValueError(f"La columna '{columna}' tiene tipos incompatibles: {tipos}.")
+        if tipo == "category":
+            categorias = pd.api.types.union_categoricals(
+                [df[columna].astype("category") for df in dfs]
+            ).categories
+            unificadas[columna] = pd.CategoricalDtype(categorias)
+        elif any(t != tipo for t in tipos):
+            unificadas[columna] = tipo
+
+    partes = [
+        df.astype(unificadas)[list(base.columns)] if unificadas else df[list(base.columns)]
+        for df in dfs
+    ]
+    combinado = pd.concat(partes, ignore_index=True)
+    logger.info(f"{len(dfs)} DataFrames concatenados: {len(combinado)} filas.")
+    return combinado
+
+
 def crear_boton_exportar(df, filename="selecciones.xlsx", key=None):
     """
     Crea un botón interactivo en Streamlit para exportar un DataFrame como archivo Excel descargable.
@@ -149,6 +649,55 @@ def eliminar_espacios_cols(df, columnas: str | list):
     return df
 
 
+def _columna_a_texto_arrow(serie: pd.Series) -> pa.Array:
+    """
+    Convierte una columna a un arreglo de texto de Arrow con los nulos como "".
+
+    Las categóricas se convierten a partir de sus categorías (un valor por categoría,
+    no por fila) y luego se expanden con sus códigos.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = pa.array(
+            serie.cat.categories.astype(str).to_numpy(dtype=object), type=pa.string()
+        )
+        codigos = pa.array(serie.cat.codes.to_numpy(), mask=serie.cat.codes.to_numpy() < 0)
+        arreglo = pc.take(categorias, codigos)
+    else:
+        try:
+            arreglo = pa.array(serie.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arreglo = pa.array(
+                serie.where(serie.isna(), serie.astype(str)).to_numpy(dtype=object),
+                type=pa.string(),
+                from_pandas=True,
+            )
+    return pc.fill_null(arreglo, "")
+
+
+def construir_llave_texto(
+    df: pd.DataFrame, columnas: List[str], separador: str = ""
+) -> pd.Series:
+    """
+    Construye una llave de texto uniendo varias columnas por fila, de forma vectorizada.
+
+    Equivale a `df[columnas].fillna("").agg(separador.join, axis=1)` pero opera columna a
+    columna con los kernels de texto de Arrow, sin llamadas de Python por fila.
+
+    Args:
+        df (pd.DataFrame): DataFrame de origen (no se modifica).
+        columnas (list[str]): Columnas a unir, en orden.
+        separador (str): Texto entre columnas.
+
+    Returns:
+        pd.Series: Llave por fila (dtype object) con el mismo índice que `df`.
+    """
+    arreglos = [_columna_a_texto_arrow(df[columna]) for columna in columnas]
+    llave = pc.binary_join_element_wise(*arreglos, separador)
+    return pd.Series(
+        llave.to_numpy(zero_copy_only=False), index=df.index, dtype=object
+    )
+
+
 def concatenar_columnas_pd(
     dataframe: pd.DataFrame,
     cols_elegidas: List[str],
@@ -179,17 +728,14 @@ def concatenar_columnas_pd(
             if col not in dataframe.columns:
                 raise KeyError(f"La columna '{col}' no existe en el DataFrame.")
 
-        df_copy = dataframe.copy()
+        # Copia superficial: las columnas existentes se comparten con `dataframe`,
+        # solo la nueva columna ocupa memoria adicional.
+        df_copy = dataframe.copy(deep=False)
 
-        # 🔹 Si usar_separador es True, concatenar con separador. Si no, concatenar normal.
-        if usar_separador:
-            df_copy.loc[:, nueva_columna] = (
-                df_copy[cols_elegidas].fillna("").agg(separador.join, axis=1)
-            )
-        else:
-            df_copy.loc[:, nueva_columna] = (
-                df_copy[cols_elegidas].fillna("").agg("".join, axis=1)
-            )
+        # 🔹 Si usar_separador es True, se une con 'separador'; si no, sin separador.
+        df_copy[nueva_columna] = construir_llave_texto(
+            dataframe, cols_elegidas, separador if usar_separador else ""
+        )
 
         # Registrar el proceso
         logger.info(
@@ -442,8 +988,8 @@ def calcular_unidades(
         pd.DataFrame: DataFrame con columna 'Unidades' añadida.
     """
     df["Unidades"] = np.ceil(
-        (df[dict_cols["Promedio Mes Und"]].astype(float) / DIAS_MES
-    ) * df[dict_cols["Dias de la actividad"]].astype(float))
+        (df[dict_cols["Promedio Mes Und"]] / DIAS_MES
+    ) * df[dict_cols["Dias de la actividad"]])
     return df
 
 
@@ -478,7 +1024,7 @@ def calcular_venta(df, dict_cols):
     """
     df["Venta de la actividad"] = df["unidades_totales"] * df[
         dict_cols["Precio de venta"]
-    ].astype(float)
+    ]
     
     df["Venta de la actividad"] = df["Venta de la actividad"].astype(int)
     
@@ -568,26 +1114,234 @@ def reemplazar_mes(df):
     df["mes"] = df["mes"].map(DICT_MESES)
     return df
 
-def procesar_insumo(df_insumo, porcentaje_crecimiento, dict_cols):
+
+# Dimensión calendario: nombre en español de cada mes, indexado por su número - 1.
+MESES_ES = np.array(
+    [
+        "Enero",
+        "Febrero",
+        "Marzo",
+        "Abril",
+        "Mayo",
+        "Junio",
+        "Julio",
+        "Agosto",
+        "Septiembre",
+        "Octubre",
+        "Noviembre",
+        "Diciembre",
+    ],
+    dtype=object,
+)
+
+
+def a_fechas(valores) -> np.ndarray:
+    """
+    Fechas de eventos como `datetime64[ns]`. Si ya son fechas (columna datetime64,
+    `date` o `np.datetime64`) solo se convierte la unidad; los textos se interpretan
+    una única vez (materiales registrados en versiones anteriores).
+
+    Args:
+        valores (pd.Series | np.ndarray): Fechas.
+
+    Returns:
+        np.ndarray: Fechas en datetime64[ns].
+    """
+    if pd.api.types.is_datetime64_dtype(valores):
+        return np.asarray(valores).astype("datetime64[ns]", copy=False)
+    return pd.to_datetime(valores).to_numpy("datetime64[ns]")
+
+
+def numero_mes(fechas: np.ndarray) -> np.ndarray:
+    """
+    Mes de cada fecha como posición de 0 (enero) a 11 (diciembre).
+
+    Args:
+        fechas (np.ndarray): Fechas datetime64.
+
+    Returns:
+        np.ndarray: Posiciones de mes (int64).
+    """
+    return fechas.astype("datetime64[M]").astype(np.int64) % 12
+
+
+def mes_de_fechas(fechas: np.ndarray) -> np.ndarray:
+    """
+    Nombre en español del mes de cada fecha, tomado de `MESES_ES` sin formatear textos.
+
+    Args:
+        fechas (np.ndarray): Fechas datetime64.
+
+    Returns:
+        np.ndarray: Nombres de mes (object).
+    """
+    return MESES_ES[numero_mes(fechas)]
+
+def _a_entero(valores: np.ndarray) -> np.ndarray:
+    """`astype(int)` de pandas: trunca y falla con valores no finitos en lugar de
+    producir enteros arbitrarios."""
+    if not np.isfinite(valores).all():
+        raise pd.errors.IntCastingNaNError(
+            "Cannot convert non-finite values (NA or inf) to integer"
+        )
+    return valores.astype(np.int64)
+
+
+def calcular_simulacion(
+    fecha_inicio: np.ndarray,
+    fecha_fin: np.ndarray,
+    promedio_mes_und: np.ndarray,
+    precio_venta: np.ndarray,
+    rango: np.ndarray,
+    porcentaje_crecimiento: float | np.ndarray,
+) -> dict:
+    """
+    Núcleo numérico de `procesar_insumo`: días, unidades, crecimiento, unidades
+    totales, venta y costo del descuento de cada material, sobre arreglos contiguos.
+
+    Hace las mismas operaciones, en el mismo orden, que la cadena `actualizar_dias` ->
+    `calcular_unidades` -> `calcular_totales` -> `calcular_venta` ->
+    `preparar_df_materiales` -> `calcular_descuento`, por lo que el resultado es
+    idéntico bit a bit, pero sin DataFrames intermedios y reutilizando los buffers de
+    los resultados parciales.
+
+    El crecimiento y el rango admiten arreglos que se difunden (broadcasting) contra
+    los materiales: con `porcentaje_crecimiento` de forma (g, 1, 1) y `rango` de forma
+    (d, 1), la venta resulta de forma (g, 1, m) y el costo de forma (g, d, m), cada
+    celda igual a la de una ejecución con ese crecimiento y ese rango.
+
+    Args:
+        fecha_inicio (np.ndarray): Fechas de inicio (datetime64[ns]).
+        fecha_fin (np.ndarray): Fechas de fin (datetime64[ns]).
+        promedio_mes_und (np.ndarray): Promedio mensual de unidades (float64).
+        precio_venta (np.ndarray): Precio de venta (float64).
+        rango (np.ndarray): Porcentaje de descuento como entero (int64).
+        porcentaje_crecimiento (float | np.ndarray): Porcentaje de crecimiento para
+            unidades.
+
+    Returns:
+        dict: Arreglos "dias", "unidades", "crecimiento", "unidades_totales",
+        "venta", "rango" (fracción) y "costo_descuento".
+    """
+    DIAS_MES = 30
+    if np.isnat(fecha_inicio).any() or np.isnat(fecha_fin).any():
+        raise pd.errors.IntCastingNaNError(
+            "Cannot convert non-finite values (NA or inf) to integer"
+        )
+    dias = np.abs(fecha_fin - fecha_inicio) // np.timedelta64(1, "D")
+
+    unidades = promedio_mes_und / DIAS_MES
+    unidades *= dias
+    np.ceil(unidades, out=unidades)
+
+    crecimiento = unidades * porcentaje_crecimiento
+    crecimiento /= 100
+    unidades_totales = unidades + crecimiento
+    np.ceil(unidades_totales, out=unidades_totales)
+
+    venta = unidades_totales * precio_venta
+    venta = _a_entero(venta)
+    fraccion_rango = rango / 100
+    costo = venta * fraccion_rango
+    np.round(costo, out=costo)
+
+    return {
+        "dias": dias,
+        "unidades": unidades,
+        "crecimiento": _a_entero(crecimiento),
+        "unidades_totales": unidades_totales,
+        "venta": venta,
+        "rango": fraccion_rango,
+        "costo_descuento": _a_entero(costo),
+    }
+
+
+# Columnas que agrega `procesar_insumo` cuando ajusta por estacionalidad
+COLUMNA_INDICE_ESTACIONAL = "Índice estacional"
+COLUMNA_PROMEDIO_ESTACIONAL = "Promedio Mes Und estacional"
+
+
+def arreglos_simulacion(
+    df_insumo: pd.DataFrame, dict_cols: dict, estacional: bool = True
+) -> dict:
+    """
+    Extrae de los materiales registrados los arreglos de entrada de `calcular_simulacion`.
+
+    Args:
+        df_insumo (pd.DataFrame): Materiales con fechas, rango, promedio y precio.
+        dict_cols (dict): Dict de columnas necesarias.
+        estacional (bool): Si `df_insumo` ya trae el promedio ajustado por
+            estacionalidad ("Promedio Mes Und estacional"), usarlo en lugar del
+            promedio histórico.
+
+    Returns:
+        dict: "fecha_inicio", "fecha_fin", "promedio_mes_und", "precio_venta" y "rango".
+    """
+    columna_promedio = dict_cols["Promedio Mes Und"]
+    if estacional and COLUMNA_PROMEDIO_ESTACIONAL in df_insumo.columns:
+        columna_promedio = COLUMNA_PROMEDIO_ESTACIONAL
+    return {
+        "fecha_inicio": a_fechas(df_insumo["fecha_inicio"]),
+        "fecha_fin": a_fechas(df_insumo["fecha_fin"]),
+        "promedio_mes_und": df_insumo[columna_promedio].to_numpy(np.float64),
+        "precio_venta": df_insumo[dict_cols["Precio de venta"]].to_numpy(np.float64),
+        "rango": df_insumo["rango"].astype(int).to_numpy(),
+    }
+
+
+def procesar_insumo(df_insumo, porcentaje_crecimiento, dict_cols, perfiles=None):
     """
     Ejecuta todo el flujo de procesamiento de insumos con crecimiento y descuentos.
 
+    Las columnas necesarias se extraen una sola vez como arreglos y se calculan con
+    `calcular_simulacion`; el resultado tiene las mismas columnas, en el mismo orden y
+    con los mismos tipos que la cadena de pasos `actualizar_dias` ... `calcular_descuento`.
+    Las fechas se usan como datetime64 sin volver a interpretar textos y el "mes" se
+    deriva de la fecha de inicio con `MESES_ES`.
+
+    Con `perfiles` el promedio mensual de unidades de cada material se multiplica por
+    su índice estacional en el mes de la fecha de inicio. "Promedio Mes Und" conserva el
+    promedio histórico; el índice y el promedio ajustado se agregan en "Índice
+    estacional" y "Promedio Mes Und estacional".
+
     Args:
         df_insumo (pd.DataFrame): DataFrame de insumos original.
         porcentaje_crecimiento (float): Porcentaje de crecimiento para unidades.
         dict_cols (dict): Dict de columnas necesarias.
+        perfiles (PerfilesEstacionales, opcional): Índices estacionales por material y
+            mes (ver `estacionalidad_service`); `df_insumo` debe traer sus
+            `columnas_llave`.
 
     Returns:
         pd.DataFrame: DataFrame procesado con todas las columnas calculadas.
     """
-    df = df_insumo.copy()
-    df = actualizar_dias(df, dict_cols)
-    df = calcular_unidades(df, dict_cols)
-    df = calcular_totales(df, porcentaje_crecimiento)
-    df = calcular_venta(df, dict_cols)
-    df = preparar_df_materiales(df)
-    df = reemplazar_mes(df)
-    df["Costo del descuento"] = calcular_descuento(df)
+    arreglos = arreglos_simulacion(df_insumo, dict_cols, estacional=False)
+    ajuste = {}
+    if perfiles is not None:
+        indice = perfiles.indice(df_insumo, arreglos["fecha_inicio"])
+        arreglos["promedio_mes_und"] = arreglos["promedio_mes_und"] * indice
+        ajuste = {
+            COLUMNA_INDICE_ESTACIONAL: indice,
+            COLUMNA_PROMEDIO_ESTACIONAL: arreglos["promedio_mes_und"],
+        }
+    resultado = calcular_simulacion(
+        **arreglos, porcentaje_crecimiento=porcentaje_crecimiento
+    )
+    # `df_insumo` no se modifica: las columnas se agregan a una copia superficial.
+    df = asignar_columnas(
+        df_insumo,
+        {
+            **ajuste,
+            dict_cols["Dias de la actividad"]: resultado["dias"],
+            "Unidades": resultado["unidades"],
+            "Crec actividad": resultado["crecimiento"],
+            "unidades_totales": resultado["unidades_totales"],
+            "Venta de la actividad": resultado["venta"],
+            "rango%": resultado["rango"],
+            "Costo del descuento": resultado["costo_descuento"],
+            "mes": mes_de_fechas(arreglos["fecha_inicio"]),
+        },
+    )
     return df
 
 
@@ -657,11 +1411,16 @@ def reemplazar_columna_en_funcion_de_otra(
         # logger.info(
         #    f"Inicio de remplazamiento de datos en {nom_columna_a_reemplazar}"
         # )
-        df.loc[:, nom_columna_a_reemplazar] = np.where(
+        reemplazados = np.where(
             df[nom_columna_de_referencia].isin(mapeo.keys()),
             df[nom_columna_de_referencia].map(mapeo),
             df[nom_columna_a_reemplazar],
         )
+        if isinstance(df[nom_columna_a_reemplazar].dtype, pd.CategoricalDtype):
+            # Los valores nuevos pueden no estar entre las categorías actuales.
+            df[nom_columna_a_reemplazar] = pd.Categorical(reemplazados)
+        else:
+            df.loc[:, nom_columna_a_reemplazar] = reemplazados
         logger.success(
             f"Proceso de remplazamiento en {nom_columna_a_reemplazar} exitoso"
         )
@@ -674,6 +1433,182 @@ def reemplazar_columna_en_funcion_de_otra(
     return df
 
 
+def construir_tabla_identidad(df: pd.DataFrame, columnas: List[str]) -> pd.DataFrame:
+    """
+    Tabla de identidades: combinaciones distintas de códigos (p. ej. EAN, SAP y PLU).
+
+    Cada combinación queda en la posición de su última aparición, de modo que el orden
+    de la tabla conserva la regla "la última fila gana" del DataFrame de origen.
+
+    Args:
+        df (pd.DataFrame): DataFrame de origen.
+        columnas (list[str]): Columnas de códigos.
+
+    Returns:
+        pd.DataFrame: Combinaciones distintas, en orden de última aparición.
+    """
+    return df[columnas].drop_duplicates(keep="last", ignore_index=True)
+
+
+def mapeo_desde_identidades(
+    tabla: pd.DataFrame, col_referencia: str, col_destino: str
+) -> pd.Series:
+    """
+    Obtiene de una tabla de identidades el mapeo referencia -> destino para los códigos
+    que difieren, tomando para cada referencia el destino de su última aparición.
+
+    Equivale a `{k: v for k, v in zip(df[col_referencia], df[col_destino]) if k != v}`
+    sobre el DataFrame completo, pero su costo depende de los códigos distintos.
+
+    Args:
+        tabla (pd.DataFrame): Tabla de `construir_tabla_identidad`.
+        col_referencia (str): Columna de referencia (llave del mapeo).
+        col_destino (str): Columna de destino (valor del mapeo).
+
+    Returns:
+        pd.Series: Destino indexado por referencia.
+    """
+    referencia = tabla[col_referencia].astype(object)
+    destino = tabla[col_destino].astype(object)
+    pares = pd.DataFrame({"ref": referencia, "dest": destino})[referencia != destino]
+    pares = pares.drop_duplicates(subset="ref", keep="last")
+    return pd.Series(pares["dest"].to_numpy(), index=pd.Index(pares["ref"]), dtype=object)
+
+
+def resolver_columna_por_mapeo(
+    df: pd.DataFrame, mapeo: pd.Series, col_referencia: str, col_destino: str
+) -> pd.DataFrame:
+    """
+    Reemplaza `col_destino` por `mapeo[col_referencia]` donde la referencia está mapeada,
+    con una sola unión indexada (equivalente a `reemplazar_columna_en_funcion_de_otra`).
+
+    Si la referencia es categórica, el mapeo se resuelve por categoría y se expande con
+    los códigos, sin buscar cada fila.
+
+    Args:
+        df (pd.DataFrame): DataFrame a resolver (no se modifica).
+        mapeo (pd.Series): Destino indexado por referencia (ver `mapeo_desde_identidades`).
+        col_referencia (str): Columna de referencia.
+        col_destino (str): Columna a reemplazar.
+
+    Returns:
+        pd.DataFrame: DataFrame con `col_destino` resuelta.
+    """
+    referencia = df[col_referencia]
+    if isinstance(referencia.dtype, pd.CategoricalDtype):
+        # El NaN final atiende el código -1 (nulo) de las categóricas.
+        por_categoria = np.append(
+            mapeo.reindex(referencia.cat.categories).to_numpy(dtype=object), np.nan
+        )
+        resueltos = por_categoria[referencia.cat.codes.to_numpy()]
+    else:
+        resueltos = mapeo.reindex(referencia.to_numpy()).to_numpy(dtype=object)
+
+    destino = df[col_destino]
+    nuevos = np.where(pd.isna(resueltos), destino.to_numpy(dtype=object), resueltos)
+    if isinstance(destino.dtype, pd.CategoricalDtype):
+        nuevos = pd.Categorical(nuevos)
+    return asignar_columnas(df, {col_destino: nuevos})
+
+
+POLITICAS_DUPLICADOS = ("primero", "ultimo", "maximo", "error")
+
+
+def construir_indice_unico(
+    df: pd.DataFrame,
+    llaves: List[str],
+    columnas: List[str],
+    duplicados: str = "error",
+    columna_maximo: str | None = None,
+    claves_nulas: List[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Construye una tabla de búsqueda indexada por `llaves`, con una sola fila por llave.
+
+    Las filas con llave nula o con un valor de `claves_nulas` (p. ej. "-") no se indexan:
+    representan productos sin código y no deben cruzar con nada.
+
+    Args:
+        df (pd.DataFrame): Tabla de origen (p. ej. precios).
+        llaves (list[str]): Columnas que forman la llave.
+        columnas (list[str]): Columnas a conservar (pueden incluir las llaves).
+        duplicados (str): Política para llaves repetidas: "primero" o "ultimo" (fila
+            que se conserva según el orden del archivo), "maximo" (fila con el mayor
+            valor de `columna_maximo`) o "error".
+        columna_maximo (str, opcional): Columna que decide la política "maximo".
+        claves_nulas (list[str], opcional): Valores de llave que equivalen a nulo.
+
+    Returns:
+        pd.DataFrame: Tabla con índice único de llaves y las columnas no llave.
+
+    Raises:
+        ValueError: Si la política no existe, o si es "error" y hay llaves repetidas.
+    """
+    if duplicados not in POLITICAS_DUPLICADOS:
+        raise ValueError(
+            f"Política de duplicados '{duplicados}' no soportada: "
+            f"{', '.join(POLITICAS_DUPLICADOS)}."
+        )
+    if duplicados == "maximo" and columna_maximo is None:
+        raise ValueError("La política 'maximo' requiere `columna_maximo`.")
+
+    valores = [c for c in columnas if c not in llaves]
+    tabla = df[list(dict.fromkeys(llaves + valores + ([columna_maximo] if columna_maximo else [])))]
+    validas = tabla[llaves].notna().all(axis=1).to_numpy()
+    for llave in llaves:
+        validas = validas & ~tabla[llave].isin(claves_nulas or []).to_numpy()
+    tabla = tabla.loc[validas]
+
+    repetidas = tabla.duplicated(subset=llaves, keep=False)
+    if repetidas.any():
+        n_llaves = tabla.loc[repetidas, llaves].drop_duplicates().shape[0]
+        if duplicados == "error":
+            ejemplos = tabla.loc[repetidas, llaves].drop_duplicates().head(5)
+            raise ValueError(
+                f"{n_llaves} llaves repetidas en {', '.join(llaves)} "
+                f"(p. ej. {ejemplos.to_dict(orient='records')})."
+            )
+        if duplicados == "maximo":
+            tabla = tabla.sort_values(columna_maximo, kind="stable", na_position="first")
+        tabla = tabla.drop_duplicates(
+            subset=llaves, keep="first" if duplicados == "primero" else "last"
+        )
+        logger.warning(
+            f"{n_llaves} llaves repetidas en {', '.join(llaves)} resueltas con la "
+            f"política '{duplicados}'."
+        )
+
+    return tabla.set_index(llaves)[valores]
+
+
+def buscar_en_indice(
+    df: pd.DataFrame, indice: pd.DataFrame, llaves: List[str]
+) -> pd.DataFrame:
+    """
+    Agrega a `df` las columnas de `indice` correspondientes a su llave (left join
+    contra una tabla de llave única).
+
+    Equivale a `left_merge_on_columns` con una tabla sin llaves repetidas: conserva el
+    número, el orden y el índice de las filas de `df`, y las llaves sin coincidencia
+    quedan nulas. La tabla hash del índice se construye en la primera búsqueda y se
+    reutiliza mientras se conserve `indice`.
+
+    Args:
+        df (pd.DataFrame): DataFrame base.
+        indice (pd.DataFrame): Tabla de `construir_indice_unico`.
+        llaves (list[str]): Columnas de `df` que forman la llave.
+
+    Returns:
+        pd.DataFrame: `df` con las columnas del índice agregadas.
+    """
+    if len(llaves) == 1:
+        objetivo = pd.Index(df[llaves[0]])
+    else:
+        objetivo = pd.MultiIndex.from_frame(df[llaves])
+    encontrados = indice.reindex(objetivo).set_axis(df.index, copy=False)
+    return asignar_columnas(df, {c: encontrados[c] for c in encontrados.columns})
+
+
 @staticmethod
 def Seleccionar_columnas_pd(
     df: pd.DataFrame, cols_elegidas: List[str]
@@ -742,11 +1677,11 @@ def group_by_and_operate(
         )
 
         if operation == "sum":
-            result_df = df.groupby(group_keys)[target_cols].sum().reset_index()
+            result_df = df.groupby(group_keys, observed=True)[target_cols].sum().reset_index()
         elif operation == "mean":
-            result_df = df.groupby(group_keys)[target_cols].mean().reset_index()
+            result_df = df.groupby(group_keys, observed=True)[target_cols].mean().reset_index()
         elif operation == "count":
-            result_df = df.groupby(group_keys)[target_cols].count().reset_index()
+            result_df = df.groupby(group_keys, observed=True)[target_cols].count().reset_index()
         else:
             raise ValueError(f"Operación no soportada: '{operation}'")
 
@@ -808,7 +1743,7 @@ def Cambiar_tipo_dato_multiples_columnas_pd(
         type_data (type): Tipo de dato al que se cambiarán las columnas (ejemplo: str, int, float).
 
     Returns:
-        pd.DataFrame: Copia del DataFrame con los cambios.
+        pd.DataFrame: DataFrame con los cambios (el original no se modifica).
     """
     try:
         # Verificar que el DataFrame tenga las columnas especificadas
@@ -816,31 +1751,33 @@ def Cambiar_tipo_dato_multiples_columnas_pd(
             if columna not in base.columns:
                 raise KeyError(f"La columna '{columna}' no existe en el DataFrame.")
 
-        # Cambiar el tipo de dato de las columnas
-        base_copy = (
-            base.copy()
-        )  # Crear una copia para evitar problemas de SettingWithCopyWarning
-        base_copy[list_columns] = base_copy[list_columns].astype(type_data)
-
-        return base_copy
+        # Cambiar el tipo de dato de las columnas (sin copiar las demás)
+        return asignar_columnas(
+            base, {columna: base[columna].astype(type_data) for columna in list_columns}
+        )
 
     except Exception as e:
         logger.critical(f"Error en Cambiar_tipo_dato_multiples_columnas: {e}")
 
 
 def formatear_fecha(fecha_dict):
+    """
+    Fechas confirmadas del evento para `list_materiales`, como `np.datetime64` de
+    resolución diaria (NaT si falta alguna), de modo que `df_final` las tenga como
+    columnas datetime64 y no haga falta interpretarlas en cada cálculo.
+    """
     if not isinstance(fecha_dict, dict):
         return {}
     return {
         "fecha_inicio": (
-            fecha_dict.get("fecha_inicio").strftime("%Y-%m-%d")
+            np.datetime64(fecha_dict.get("fecha_inicio"), "D")
             if isinstance(fecha_dict.get("fecha_inicio"), date)
-            else ""
+            else np.datetime64("NaT", "D")
         ),
         "fecha_fin": (
-            fecha_dict.get("fecha_fin").strftime("%Y-%m-%d")
+            np.datetime64(fecha_dict.get("fecha_fin"), "D")
             if isinstance(fecha_dict.get("fecha_fin"), date)
-            else ""
+            else np.datetime64("NaT", "D")
         ),
         "mes": fecha_dict.get("mes", ""),
     }